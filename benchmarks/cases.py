@@ -0,0 +1,351 @@
+import json
+import random
+import subprocess
+import sys
+from collections.abc import Sequence
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from suite import benchmark
+
+from rebel_rhythms import (
+    AlbumObject,
+    ArtistObject,
+    AudioFeaturesObject,
+    ContentType,
+    Deduplicate,
+    DuplicateIndex,
+    LibraryIndex,
+    MemoryTokenStore,
+    PlaylistEntry,
+    PlaylistTrackObject,
+    RemoveUnplayable,
+    SavedTrackObject,
+    Shuffle,
+    SimplifiedPlaylistObject,
+    SortBy,
+    SpotifyClient,
+    SpotifyClientCredentialsAuth,
+    Track,
+    Transport,
+    check_list_limit,
+    parse_spotify_ids,
+    validate_id_or_url,
+)
+from rebel_rhythms.playlist_sync import plan_playlist_changes
+from rebel_rhythms.testing import SyntheticCatalog, page, spotify_id
+
+PLAYLIST_ID = spotify_id("playlist", 1)
+
+
+def _size(base: int, scale: float) -> int:
+    return max(1, int(base * scale))
+
+
+class StubResponse:
+    status_code = 200
+    headers: Dict[str, str] = {}
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class StubApi(Transport):
+    """Serves pre-encoded catalog pages in place of the network.
+
+    Responses are cached per URL so the benchmarks measure the client's own
+    work (request plumbing, JSON decoding, model parsing), not the stub's.
+    """
+
+    def __init__(self, catalog: SyntheticCatalog):
+        self.catalog = catalog
+        self._cache: Dict[Tuple, StubResponse] = {}
+
+    def send(self, method, url, params=None, **kwargs):
+        key = (url, tuple(sorted((params or {}).items())))
+        if key not in self._cache:
+            self._cache[key] = StubResponse(
+                json.dumps(self.route(url, params or {})).encode()
+            )
+        return self._cache[key]
+
+    def route(self, url, params):
+        path = urlparse(url).path
+        limit = int(params.get("limit", 20))
+        offset = int(params.get("offset", 0))
+        catalog = self.catalog
+        if path == "/v1/me/tracks":
+            items = _LazyItems(
+                catalog.track_count, lambda i: catalog.saved_item("track", i)
+            )
+            return page(items, url, limit, offset)
+        if path == f"/v1/playlists/{PLAYLIST_ID}/tracks":
+            items = _LazyItems(
+                catalog.track_count, lambda i: catalog.playlist_item(catalog.track(i))
+            )
+            return page(items, url, limit, offset)
+        ids = params.get("ids", "").split(",")
+        indexes = [int(i[1:]) for i in ids]
+        if path == "/v1/tracks":
+            return {"tracks": [catalog.track(i) for i in indexes]}
+        if path == "/v1/albums":
+            return {"albums": [catalog.album(i) for i in indexes]}
+        if path == "/v1/artists":
+            return {"artists": [catalog.artist(i) for i in indexes]}
+        raise AssertionError(f"Unexpected {url}")
+
+
+class _LazyItems(Sequence):
+    # Only slices are supported, which is all `page()` takes.
+    def __init__(self, length, factory):
+        self.length = length
+        self.factory = factory
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        return [self.factory(i) for i in range(*index.indices(self.length))]
+
+
+def stub_client(catalog: SyntheticCatalog) -> SpotifyClient:
+    auth = SpotifyClientCredentialsAuth(
+        "client_id",
+        "client_secret",
+        MemoryTokenStore({"access_token": "token", "expires_at": 1e12}),
+    )
+    return SpotifyClient(
+        "client_id", "client_secret", auth=auth, transport=StubApi(catalog)
+    )
+
+
+def _python(code: str):
+    return lambda: subprocess.run([sys.executable, "-c", code], check=True)
+
+
+# --- import and construction ---------------------------------------------
+
+
+@benchmark("import.interpreter", repeat=5)
+def interpreter_startup(scale):
+    return _python("pass")
+
+
+@benchmark("import.package", repeat=5)
+def import_package(scale):
+    return _python("import rebel_rhythms")
+
+
+@benchmark("import.client", repeat=5)
+def import_client(scale):
+    return _python("from rebel_rhythms import SpotifyClient")
+
+
+@benchmark("client.construct", number=1000)
+def construct_client(scale):
+    return lambda: SpotifyClient("client_id", "client_secret")
+
+
+# --- pagination ------------------------------------------------------------
+
+
+@benchmark("pagination.saved_tracks", repeat=3)
+def paginate_saved_tracks(scale):
+    client = stub_client(SyntheticCatalog(tracks=_size(2000, scale)))
+    return lambda: sum(1 for _ in client.get_user_saved_tracks())
+
+
+@benchmark("pagination.playlist_items_raw", repeat=3)
+def paginate_playlist_raw(scale):
+    client = stub_client(SyntheticCatalog(tracks=_size(5000, scale)))
+    return lambda: sum(1 for _ in client.get_raw_playlist_items(PLAYLIST_ID))
+
+
+@benchmark("pagination.playlist_items", repeat=3)
+def paginate_playlist(scale):
+    client = stub_client(SyntheticCatalog(tracks=_size(5000, scale)))
+    return lambda: sum(1 for _ in client.get_all_playlist_tracks(PLAYLIST_ID))
+
+
+@benchmark("pagination.playlist_items_interned", repeat=3)
+def paginate_playlist_interned(scale):
+    client = stub_client(SyntheticCatalog(tracks=_size(5000, scale)))
+
+    def run():
+        with client.interning():
+            return sum(1 for _ in client.get_all_playlist_tracks(PLAYLIST_ID))
+
+    return run
+
+
+# --- bulk getters ----------------------------------------------------------
+
+
+@benchmark("bulk.get_tracks_50", number=20)
+def bulk_tracks(scale):
+    client = stub_client(SyntheticCatalog(tracks=50))
+    ids = [spotify_id("track", i) for i in range(50)]
+    return lambda: client.get_tracks(ids)
+
+
+@benchmark("bulk.get_albums_20", number=20)
+def bulk_albums(scale):
+    client = stub_client(SyntheticCatalog(tracks=200, albums=20))
+    ids = [spotify_id("album", i) for i in range(20)]
+    return lambda: client.get_albums(ids)
+
+
+@benchmark("bulk.get_artists_50", number=20)
+def bulk_artists(scale):
+    client = stub_client(SyntheticCatalog(tracks=500, albums=100, artists=50))
+    ids = [spotify_id("artist", i) for i in range(50)]
+    return lambda: client.get_artists(ids)
+
+
+# --- model parsing -----------------------------------------------------------
+
+
+def _model_benchmark(name, model, factory, count=1000):
+    @benchmark(f"models.{name}", repeat=5)
+    def parse(scale):
+        catalog = SyntheticCatalog(tracks=1000)
+        payloads = [factory(catalog, i) for i in range(_size(count, scale))]
+        return lambda: [model(**payload) for payload in payloads]
+
+    return parse
+
+
+_model_benchmark("Track", Track, lambda c, i: c.track(i))
+_model_benchmark("AlbumObject", AlbumObject, lambda c, i: c.album(i % c.album_count))
+_model_benchmark(
+    "ArtistObject", ArtistObject, lambda c, i: c.artist(i % c.artist_count)
+)
+_model_benchmark(
+    "SavedTrackObject", SavedTrackObject, lambda c, i: c.saved_item("track", i)
+)
+_model_benchmark(
+    "PlaylistTrackObject", PlaylistTrackObject, lambda c, i: c.playlist_item(c.track(i))
+)
+_model_benchmark(
+    "AudioFeaturesObject", AudioFeaturesObject, lambda c, i: c.audio_features(i)
+)
+_model_benchmark(
+    "SimplifiedPlaylistObject",
+    SimplifiedPlaylistObject,
+    lambda c, i: c.simplified_playlist(
+        spotify_id("playlist", i), f"Playlist {i}", 10, f"snap{i}"
+    ),
+)
+
+
+# --- validators --------------------------------------------------------------
+
+
+@benchmark("validators.parse_100k", repeat=5)
+def parse_ids(scale):
+    refs = [spotify_id("track", i) for i in range(_size(100_000, scale))]
+    return lambda: parse_spotify_ids(refs, ContentType.TRACK)
+
+
+@benchmark("validators.decorated_call_50", number=1000)
+def decorated_call(scale):
+    @check_list_limit("ids", 50)
+    @validate_id_or_url(ContentType.TRACK, multiple=True)
+    def decorated(self, ids):
+        return ids
+
+    ids = [spotify_id("track", i) for i in range(50)]
+    return lambda: decorated(None, ids)
+
+
+# --- playlist maintenance ----------------------------------------------------
+
+
+@benchmark("maintenance.plan_shuffle_10k", repeat=3)
+def plan_shuffle(scale):
+    current = [
+        f"spotify:track:{spotify_id('track', i)}" for i in range(_size(10_000, scale))
+    ]
+    desired = list(current)
+    random.Random(0).shuffle(desired)
+    return lambda: plan_playlist_changes(current, desired)
+
+
+@benchmark("maintenance.plan_small_edit_10k", repeat=5)
+def plan_small_edit(scale):
+    current = [
+        f"spotify:track:{spotify_id('track', i)}" for i in range(_size(10_000, scale))
+    ]
+    desired = current[1:] + [current[0]]
+    del desired[len(desired) // 2]
+    return lambda: plan_playlist_changes(current, desired)
+
+
+@benchmark("maintenance.passes_5k", repeat=3)
+def maintenance_passes(scale):
+    catalog = SyntheticCatalog(tracks=_size(5000, scale))
+    items = [
+        catalog.playlist_item(catalog.track(i % (catalog.track_count // 2 + 1)))
+        for i in range(catalog.track_count)
+    ]
+    passes = [RemoveUnplayable(), Deduplicate(), SortBy("popularity"), Shuffle(seed=1)]
+
+    def run():
+        entries = [PlaylistEntry(position, item) for position, item in enumerate(items)]
+        for maintenance_pass in passes:
+            entries = maintenance_pass(entries)
+        return entries
+
+    return run
+
+
+@benchmark("maintenance.duplicate_index_10k", repeat=5)
+def duplicate_index(scale):
+    catalog = SyntheticCatalog(tracks=_size(10_000, scale))
+    tracks = [catalog.track(i) for i in range(catalog.track_count)]
+
+    def run():
+        index = DuplicateIndex()
+        return sum(index.add(track) for track in tracks)
+
+    return run
+
+
+# --- library index -------------------------------------------------------------
+
+
+@benchmark("library_index.build_20k", repeat=3)
+def build_library_index(scale):
+    catalog = SyntheticCatalog(tracks=_size(20_000, scale))
+    items = [catalog.saved_item("track", i) for i in range(catalog.track_count)]
+
+    def run():
+        index = LibraryIndex()
+        for item in items:
+            index.add(item)
+        return index
+
+    return run
+
+
+@benchmark("library_index.search_100k", number=200)
+def search_library_index(scale):
+    catalog = SyntheticCatalog(tracks=_size(100_000, scale))
+    index = LibraryIndex()
+    for i in range(catalog.track_count):
+        index.add(catalog.track(i))
+    track = catalog.track(catalog.track_count // 2)
+    queries = [
+        f"{track['name']} {track['artists'][0]['name']}",
+        "golden",
+        "sigu",
+        "velvte wild",
+    ]
+
+    def run():
+        return [index.search(query) for query in queries]
+
+    return run
@@ -0,0 +1,65 @@
+"""Offline benchmark suite.
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --output after.json --compare before.json
+
+Nothing talks to the real Web API: requests are answered by a stub serving
+a synthetic catalog (see rebel_rhythms.testing).
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cases  # noqa: E402,F401  (registers the benchmarks)
+import suite  # noqa: E402
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "names", nargs="*", help="only run benchmarks whose name contains one of these"
+    )
+    parser.add_argument("--output", "-o", help="write results as JSON to this file")
+    parser.add_argument("--compare", "-c", help="baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="current/baseline ratio above which a benchmark counts as a regression",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="small workloads, fewer repeats"
+    )
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(sorted(suite.BENCHMARKS)))
+        return 0
+
+    report = suite.run(
+        args.names, scale=0.1 if args.quick else 1.0, repeat=2 if args.quick else None
+    )
+    if args.output:
+        suite.save(report, args.output)
+
+    if not args.compare:
+        print(suite.format_report(report))
+        return 0
+
+    baseline = suite.load(args.compare)
+    if baseline["meta"].get("scale") != report["meta"]["scale"]:
+        print(
+            "warning: baseline was recorded with a different --quick setting",
+            file=sys.stderr,
+        )
+    comparisons = suite.compare(baseline, report)
+    print(suite.format_comparison(comparisons, args.threshold))
+    return 1 if suite.regressions(comparisons, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+SCHEMA_VERSION = 1
+
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: Callable[[float], Callable[[], object]]
+    number: int
+    repeat: int
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, number: int = 1, repeat: int = 5):
+    """Register `setup(scale)`, which builds fixtures and returns the callable to time.
+
+    Only the returned callable is timed; `scale` shrinks the workload for
+    quick runs.
+    """
+
+    def decorator(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, number, repeat)
+        return setup
+
+    return decorator
+
+
+def run(
+    names: Optional[List[str]] = None, scale: float = 1.0, repeat: Optional[int] = None
+) -> Dict:
+    results = {}
+    for bench in BENCHMARKS.values():
+        if names and not any(part in bench.name for part in names):
+            continue
+        func = bench.setup(scale)
+        func()  # warm caches, lazy imports and deferred model builds
+        timings = timeit.repeat(
+            func, number=bench.number, repeat=repeat or bench.repeat
+        )
+        per_call = [t / bench.number for t in timings]
+        results[bench.name] = {
+            "min": min(per_call),
+            "median": statistics.median(per_call),
+            "number": bench.number,
+            "repeat": len(per_call),
+        }
+    return {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+
+def save(report: Dict, path: str) -> None:
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+
+
+def load(path: str) -> Dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+class Comparison(NamedTuple):
+    name: str
+    baseline: Optional[float]
+    current: Optional[float]
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if not self.baseline or self.current is None:
+            return None
+        return self.current / self.baseline
+
+
+def compare(baseline: Dict, current: Dict) -> List[Comparison]:
+    """Pair up the `min` timings of the benchmarks in `current` with the baseline."""
+    names = sorted(current["results"])
+    return [
+        Comparison(
+            name,
+            baseline["results"].get(name, {}).get("min"),
+            current["results"].get(name, {}).get("min"),
+        )
+        for name in names
+    ]
+
+
+def regressions(comparisons: List[Comparison], threshold: float) -> List[Comparison]:
+    return [c for c in comparisons if c.ratio is not None and c.ratio > threshold]
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    for unit, factor in (("s", 1), ("ms", 1e3), ("us", 1e6)):
+        if seconds * factor >= 1:
+            return f"{seconds * factor:.2f}{unit}"
+    return f"{seconds * 1e9:.0f}ns"
+
+
+def format_report(report: Dict) -> str:
+    width = max((len(name) for name in report["results"]), default=10)
+    lines = [f"{'benchmark':<{width}}  {'min':>10}  {'median':>10}"]
+    for name, result in sorted(report["results"].items()):
+        lines.append(
+            f"{name:<{width}}  {_format_seconds(result['min']):>10}  "
+            f"{_format_seconds(result['median']):>10}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(comparisons: List[Comparison], threshold: float) -> str:
+    width = max((len(c.name) for c in comparisons), default=10)
+    lines = [f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'ratio':>7}"]
+    for c in comparisons:
+        ratio = "-" if c.ratio is None else f"{c.ratio:.2f}x"
+        flag = "  REGRESSION" if c.ratio is not None and c.ratio > threshold else ""
+        lines.append(
+            f"{c.name:<{width}}  {_format_seconds(c.baseline):>10}  "
+            f"{_format_seconds(c.current):>10}  {ratio:>7}{flag}"
+        )
+    return "\n".join(lines)
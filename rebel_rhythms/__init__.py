@@ -1,2 +1,130 @@
-from .spotify_client import *
-from .custom_exceptions import *
+import importlib
+
+# Public names are resolved on first access so that `import rebel_rhythms`
+# stays cheap: requests, pydantic and the models are only loaded by the parts
+# of the package that need them.
+_EXPORTS = {
+    "models": [
+        "AlbumObject",
+        "ArtistObject",
+        "AudioAnalysisObject",
+        "AudioFeaturesObject",
+        "BrowseCategory",
+        "CurrentUser",
+        "ImageObject",
+        "Playlist",
+        "PlaylistTrackObject",
+        "Recommendations",
+        "SavedAlbumObject",
+        "SavedTrackObject",
+        "SimplifiedAlbumObject",
+        "SimplifiedPlaylistObject",
+        "SimplifiedTrackObject",
+        "Track",
+        "User",
+    ],
+    "custom_exceptions": [
+        "BadRequestException",
+        "CassetteMissException",
+        "ForbiddenException",
+        "InternalServerErrorException",
+        "PlaylistChangedException",
+        "RateLimitException",
+        "RequestTimeoutException",
+        "ResourceNotFoundException",
+        "SpotifyClientException",
+        "UnauthorizedException",
+    ],
+    "spotify_client": ["IncludeGroups", "ItemsType", "SpotifyClient"],
+    "spotify_auth": ["SpotifyAuth", "SpotifyClientCredentialsAuth", "SpotifyScope"],
+    "spotify_request_manager": ["SpotifyRequestManager"],
+    "rate_limiter": ["RateLimiter"],
+    "validators": [
+        "ContentType",
+        "check_list_limit",
+        "parse_spotify_ids",
+        "split_spotify_ids",
+        "validate_and_extract_single_id",
+        "validate_boolean_param",
+        "validate_id_or_url",
+        "validate_playlist_params",
+        "validate_track_uris",
+    ],
+    "bulk": ["BulkReport", "run_bulk"],
+    "playlist_dedupe": [
+        "DedupeReport",
+        "DuplicateIndex",
+        "PlaylistDeduplicator",
+        "identity_keys",
+        "playlist_item_uri",
+    ],
+    "playlist_sync": ["PlaylistSynchronizer", "SyncPlan", "build_sync_plan"],
+    "playlist_mirror": ["MirroredPlaylist", "PlaylistMirror"],
+    "playlist_maintenance": [
+        "MAINTENANCE_FIELDS",
+        "Deduplicate",
+        "MaintenancePass",
+        "MaintenanceReport",
+        "PlaylistEntry",
+        "PlaylistMaintenance",
+        "RemoveUnplayable",
+        "Shuffle",
+        "SortBy",
+        "TrimToLength",
+    ],
+    "resolver": ["TrackQuery", "TrackResolution", "TrackResolver", "score_candidate"],
+    "search": ["MultiSearch"],
+    "state_store": ["JsonFileStateStore", "MemoryStateStore", "StateStore"],
+    "library_sync": ["LibraryDelta", "LibraryKind", "LibrarySync"],
+    "library_index": ["IndexMatch", "IndexedTrack", "LibraryIndex"],
+    "write_behind": ["MutationTarget", "WriteBehindQueue"],
+    "token_store": [
+        "EnvTokenStore",
+        "FileTokenStore",
+        "MemoryTokenStore",
+        "SQLiteTokenStore",
+        "TokenStore",
+        "file_lock",
+    ],
+    "columnar": ["ParquetWriter", "arrow_schema", "record_batch"],
+    "export": [
+        "ExportReport",
+        "ExportWriter",
+        "LibraryExporter",
+        "fields_filter",
+        "lookup",
+        "open_writer",
+    ],
+    "hooks": ["RequestHook", "RequestInfo", "endpoint_template"],
+    "interning": ["Interner"],
+    "metrics": ["MetricsRegistry", "MetricsServer", "RequestMetrics"],
+    "profiling": ["CallProfiler", "ProfileNode"],
+    "transport": [
+        "RecordedResponse",
+        "RecordingTransport",
+        "ReplayTransport",
+        "RequestsTransport",
+        "Transport",
+    ],
+}
+
+_LAZY_ATTRIBUTES = {
+    name: module for module, names in _EXPORTS.items() for name in names
+}
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(f".{module}", __name__), name)
+        globals()[name] = value
+        return value
+    if name in _EXPORTS or name == "normalization":
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
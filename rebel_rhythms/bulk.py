@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from rebel_rhythms.custom_exceptions import (
+    InternalServerErrorException,
+    RateLimitException,
+    RequestTimeoutException,
+)
+from rebel_rhythms.validators import ContentType, split_spotify_ids
+
+RETRIABLE_EXCEPTIONS = (
+    RateLimitException,
+    RequestTimeoutException,
+    InternalServerErrorException,
+)
+
+
+class BulkReport(BaseModel):
+    succeeded: List[str] = []
+    failed: Dict[str, str] = {}
+    retriable: Dict[str, str] = {}
+    cancelled: List[str] = []
+    # One `mutate` call per chunk; retries inside the request manager can add
+    # HTTP sends on top of these.
+    chunks: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed and not self.retriable
+
+    def merge(self, other: "BulkReport") -> "BulkReport":
+        return BulkReport(
+            succeeded=self.succeeded + other.succeeded,
+            failed={**self.failed, **other.failed},
+            retriable={**self.retriable, **other.retriable},
+            cancelled=self.cancelled + other.cancelled,
+            chunks=self.chunks + other.chunks,
+        )
+
+
+def run_bulk(
+    ids: Iterable[str],
+    content_type: ContentType,
+    mutate: Callable[[List[str]], object],
+    chunk_size: int,
+    max_workers: int = 4,
+) -> BulkReport:
+    """Validate, dedupe and chunk `ids`, then call `mutate` per chunk concurrently.
+
+    Concurrency is bounded by `max_workers`; pacing and 429 back-off come from
+    the request manager's rate limiter shared by all worker threads.
+    """
+    report = BulkReport()
+    parsed, invalid = split_spotify_ids(ids, content_type)
+    for ref in invalid:
+        report.failed[str(ref)] = f"Invalid ID or URL: {ref}"
+    valid_ids = list(dict.fromkeys(parsed))
+
+    chunks = [
+        valid_ids[i : i + chunk_size] for i in range(0, len(valid_ids), chunk_size)
+    ]
+    report.chunks = len(chunks)
+
+    def send(chunk: List[str]) -> Tuple[List[str], Optional[Exception]]:
+        try:
+            mutate(chunk)
+        except Exception as e:
+            return chunk, e
+        return chunk, None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for chunk, error in executor.map(send, chunks):
+            if error is None:
+                report.succeeded.extend(chunk)
+            elif isinstance(error, RETRIABLE_EXCEPTIONS):
+                report.retriable.update({item_id: str(error) for item_id in chunk})
+            else:
+                report.failed.update({item_id: str(error) for item_id in chunk})
+
+    return report
@@ -0,0 +1,362 @@
+"""Arrow record batches and Parquet files built from page payloads (needs pyarrow)."""
+
+import os
+import types
+from functools import lru_cache
+from inspect import isclass
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from pydantic import BaseModel
+
+from rebel_rhythms.export import Destination, lookup, temporary_file
+
+ROW_GROUP_SIZE = 65536
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError(
+            "Arrow and Parquet export need pyarrow: pip install rebel_rhythms[parquet]"
+        ) from exc
+    return pyarrow, pyarrow.parquet
+
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _is_list(annotation) -> bool:
+    return get_origin(annotation) in (list, List)
+
+
+def _is_model(annotation) -> bool:
+    return isclass(annotation) and issubclass(annotation, BaseModel)
+
+
+def arrow_type(annotation):
+    """The Arrow type for a field annotation from `models.py`."""
+    pa, _ = _pyarrow()
+    annotation = _unwrap_optional(annotation)
+    if _is_list(annotation):
+        return pa.list_(arrow_type(get_args(annotation)[0]))
+    if _is_model(annotation):
+        return pa.struct(
+            [
+                pa.field(name, arrow_type(field.annotation))
+                for name, field in annotation.model_fields.items()
+            ]
+        )
+    scalars = {str: pa.string(), int: pa.int64(), float: pa.float64(), bool: pa.bool_()}
+    if annotation in scalars:
+        return scalars[annotation]
+    raise TypeError(f"No Arrow type for {annotation!r}")
+
+
+def _resolve_column(model: Type[BaseModel], path: str):
+    """The Arrow type of column `path`, and the position of the list it crosses.
+
+    The position is `None` for paths through nested objects only, the index of
+    the list's key for paths crossing exactly one list, and -1 for anything
+    else (several lists, or an element index).
+    """
+    pa, _ = _pyarrow()
+    annotation = model
+    lists = []
+    for position, key in enumerate(path.split(".")):
+        annotation = _unwrap_optional(annotation)
+        if _is_list(annotation):
+            annotation = _unwrap_optional(get_args(annotation)[0])
+            lists.append(-1 if key.isdigit() else position - 1)
+            if key.isdigit():
+                continue
+        if not _is_model(annotation) or key not in annotation.model_fields:
+            raise ValueError(f"Unknown column {path!r} for {model.__name__}.")
+        annotation = annotation.model_fields[key].annotation
+    leaf = arrow_type(annotation)
+    if not lists:
+        return leaf, None
+    if any(position >= 0 for position in lists):
+        # `lookup` flattens lists met below the first one.
+        while pa.types.is_list(leaf):
+            leaf = leaf.value_type
+        leaf = pa.list_(leaf)
+    return leaf, lists[0] if len(lists) == 1 else -1
+
+
+def column_type(model: Type[BaseModel], path: str):
+    """The Arrow type of dotted column `path` in items of `model`."""
+    return _resolve_column(model, path)[0]
+
+
+def _pruned_type(annotation, tree: Optional[Dict]):
+    """`arrow_type(annotation)` keeping only the nested fields in `tree`; `None` keeps all."""
+    pa, _ = _pyarrow()
+    annotation = _unwrap_optional(annotation)
+    if tree is None:
+        return arrow_type(annotation)
+    if _is_list(annotation):
+        return pa.list_(_pruned_type(get_args(annotation)[0], tree))
+    return pa.struct(
+        [
+            pa.field(
+                key, _pruned_type(annotation.model_fields[key].annotation, subtree)
+            )
+            for key, subtree in tree.items()
+        ]
+    )
+
+
+class _Plan(NamedTuple):
+    schema: Any
+    # Per-page batches: the selected paths pruned from the model, then the
+    # `lookup` columns, named by their path.
+    source: Any
+    pruned: Any
+    fallback: List[Tuple[List[str], Any]]
+    # Per output column: a `lookup` column name, or struct field indices
+    # before and after the one list crossed.
+    steps: Optional[List]
+
+
+@lru_cache(maxsize=None)
+def _plan(model: Type[BaseModel], columns: Optional[Tuple[str, ...]]) -> _Plan:
+    """The schema for `columns` of `model` and how to build each column.
+
+    Pages are converted by Arrow against a schema pruned to the selected
+    paths, and the columns are then taken out as struct fields (re-wrapped in
+    a list for paths crossing one list). Paths Arrow cannot follow, such as
+    element indexes, are read with `lookup` instead.
+    """
+    pa, _ = _pyarrow()
+    if columns is None:
+        fields = [
+            pa.field(name, arrow_type(field.annotation))
+            for name, field in model.model_fields.items()
+        ]
+        schema = pa.schema(fields)
+        return _Plan(schema, schema, schema, [], None)
+    resolved = [_resolve_column(model, column) for column in columns]
+    schema = pa.schema(
+        [pa.field(column, type_) for column, (type_, _) in zip(columns, resolved)]
+    )
+
+    # Nested dicts of the selected paths; a path selected whole ends in None.
+    tree: Dict[str, Optional[Dict]] = {}
+    for column, (_, list_at) in zip(columns, resolved):
+        if list_at == -1:
+            continue
+        node: Dict[str, Any] = tree
+        *parents, last = column.split(".")
+        for key in parents:
+            if node.get(key, {}) is None:
+                break
+            node = node.setdefault(key, {})
+        else:
+            node[last] = None
+    pruned = _pruned_type(model, tree) if tree else pa.struct([])
+
+    def indices(struct_type, keys):
+        path = []
+        for key in keys:
+            path.append(struct_type.get_field_index(key))
+            struct_type = struct_type.field(path[-1]).type
+        return path, struct_type
+
+    fallback: List[Tuple[List[str], Any]] = []
+    steps: List[Any] = []
+    for column, (type_, list_at) in zip(columns, resolved):
+        keys = column.split(".")
+        if list_at == -1:
+            fallback.append((keys, type_))
+            steps.append(column)
+        elif list_at is None:
+            steps.append((indices(pruned, keys)[0], None))
+        else:
+            outer, list_type = indices(pruned, keys[: list_at + 1])
+            steps.append((outer, indices(list_type.value_type, keys[list_at + 1 :])[0]))
+    source = pa.schema(
+        list(pruned) + [pa.field(".".join(keys), type_) for keys, type_ in fallback]
+    )
+    return _Plan(
+        schema, source, pa.schema(list(pruned)) if tree else None, fallback, steps
+    )
+
+
+def arrow_schema(model: Type[BaseModel], columns: Optional[Sequence[str]] = None):
+    """Every field of `model` as a column, or just the dotted `columns`."""
+    return _plan(model, tuple(columns) if columns else None).schema
+
+
+def _source_batch(items: List[Dict], plan: _Plan):
+    pa, _ = _pyarrow()
+    if not plan.fallback:
+        return pa.RecordBatch.from_pylist(items, schema=plan.source)
+    arrays = []
+    if plan.pruned is not None:
+        arrays = pa.RecordBatch.from_pylist(items, schema=plan.pruned).columns
+    for keys, type_ in plan.fallback:
+        arrays.append(pa.array([lookup(item, keys) for item in items], type=type_))
+    return pa.RecordBatch.from_arrays(arrays, schema=plan.source)
+
+
+def _list_field(array, indices: List[int]):
+    """`indices` taken from each element of list `array`, leaving out nulls like `lookup`."""
+    pa, _ = _pyarrow()
+    import pyarrow.compute as pc
+
+    offsets = array.offsets
+    values = pc.struct_field(array.values, indices)
+    if values.null_count:
+        valid = values.is_valid()
+        kept = pc.cumulative_sum(pc.cast(valid, pa.int32()))
+        offsets = pc.take(pa.concat_arrays([pa.array([0], pa.int32()), kept]), offsets)
+        values = values.filter(valid)
+    return pa.ListArray.from_arrays(offsets, values, mask=array.is_null())
+
+
+def _extract(source, plan: _Plan) -> List:
+    """The output columns from a batch or single-chunk table of source rows."""
+    import pyarrow.compute as pc
+
+    if plan.steps is None:
+        return list(source.columns)
+    arrays = []
+    for step in plan.steps:
+        if isinstance(step, str):
+            arrays.append(source.column(step))
+            continue
+        outer, inner = step
+        array = source.column(outer[0])
+        if hasattr(array, "combine_chunks"):
+            array = array.combine_chunks()
+        if outer[1:]:
+            array = pc.struct_field(array, outer[1:])
+        arrays.append(array if inner is None else _list_field(array, inner))
+    return arrays
+
+
+def record_batch(
+    items: List[Dict], model: Type[BaseModel], columns: Optional[Sequence[str]] = None
+):
+    """One Arrow record batch from raw payload items, without building models."""
+    pa, _ = _pyarrow()
+    plan = _plan(model, tuple(columns) if columns else None)
+    return pa.RecordBatch.from_arrays(
+        _extract(_source_batch(items, plan), plan), schema=plan.schema
+    )
+
+
+class ParquetWriter:
+    """Writes raw items of `model` to a Parquet file, one row group at a time.
+
+    Mirrors `ExportWriter`: paths are replaced atomically by `close()`, open
+    binary files are written to and left open.
+    """
+
+    format = "parquet"
+
+    def __init__(
+        self,
+        destination: Destination,
+        model: Type[BaseModel],
+        columns: Optional[Sequence[str]] = None,
+        compression: Optional[str] = "snappy",
+        row_group_size: int = ROW_GROUP_SIZE,
+    ):
+        pa, pq = _pyarrow()
+        self.model = model
+        self.columns = list(columns) if columns else None
+        self._plan = _plan(model, tuple(columns) if columns else None)
+        self.schema = self._plan.schema
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self.path: Optional[str] = None
+        self._tmp_path: Optional[str] = None
+        # Converted pages not yet written, and output rows left over from the last row group.
+        self._pending: List[Any] = []
+        self._pending_rows = 0
+        self._carry = None
+        target: Destination = destination
+        if isinstance(destination, (str, os.PathLike)):
+            self.path = os.fspath(destination)
+            fd, self._tmp_path = temporary_file(self.path)
+            os.close(fd)
+            target = self._tmp_path
+        self._writer = pq.ParquetWriter(
+            target, self.schema, compression=compression or "none"
+        )
+
+    def write_many(self, items: List[Dict]) -> None:
+        if not items:
+            return
+        self._pending.append(_source_batch(items, self._plan))
+        self._pending_rows += len(items)
+        self.rows += len(items)
+        if self._pending_rows >= self.row_group_size:
+            self._flush(final=False)
+
+    def write(self, item: Dict) -> None:
+        self.write_many([item])
+
+    def _flush(self, final: bool) -> None:
+        pa, _ = _pyarrow()
+        if not self._pending and self._carry is None:
+            return
+        # Columns are taken out once per row group rather than once per page, and
+        # written as one contiguous chunk; both are slow on many small pieces.
+        source = pa.Table.from_batches(
+            self._pending, schema=self._plan.source
+        ).combine_chunks()
+        table = pa.Table.from_arrays(_extract(source, self._plan), schema=self.schema)
+        if self._carry is not None:
+            table = pa.concat_tables([self._carry, table]).combine_chunks()
+        while table.num_rows >= self.row_group_size or (final and table.num_rows):
+            group = table.slice(0, self.row_group_size)
+            self._writer.write_table(group, row_group_size=self.row_group_size)
+            table = table.slice(group.num_rows)
+        self._pending = []
+        self._pending_rows = table.num_rows
+        self._carry = table if table.num_rows else None
+
+    def close(self) -> None:
+        self._flush(final=True)
+        self._writer.close()
+        if self._tmp_path is not None and self.path is not None:
+            os.replace(self._tmp_path, self.path)
+            self._tmp_path = None
+
+    def abort(self) -> None:
+        self._pending = []
+        self._carry = None
+        self._writer.close()
+        if self._tmp_path is not None:
+            os.unlink(self._tmp_path)
+            self._tmp_path = None
+
+    def __enter__(self) -> "ParquetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -29,8 +29,30 @@ class InternalServerErrorException(SpotifyClientException):
 
 
 class RateLimitException(SpotifyClientException):
+    """Raised when the app has exceeded its rate limits."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RequestTimeoutException(SpotifyClientException):
+    """Raised when the API did not answer in time."""
+
     pass
 
 
 class BadRequestException(SpotifyClientException):
     pass
+
+
+class PlaylistChangedException(SpotifyClientException):
+    """Raised when a playlist kept changing while it was being read."""
+
+    pass
+
+
+class CassetteMissException(SpotifyClientException):
+    """Raised when a replayed request has no matching recording."""
+
+    pass
@@ -0,0 +1,656 @@
+"""Stream library and catalog data to NDJSON, CSV or Parquet in constant memory."""
+
+import csv
+import gzip
+import io
+import json
+import os
+import queue
+import stat
+import tempfile
+import threading
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+
+from pydantic import BaseModel
+
+from rebel_rhythms.models import (
+    ArtistObject,
+    AudioFeaturesObject,
+    PlaylistTrackObject,
+    SavedAlbumObject,
+    SavedTrackObject,
+    SimplifiedAlbumObject,
+    SimplifiedPlaylistObject,
+    Track,
+)
+
+FORMATS = ("ndjson", "csv", "parquet")
+
+TRACK_COLUMNS = (
+    "id",
+    "name",
+    "artists.name",
+    "album.name",
+    "album.release_date",
+    "duration_ms",
+    "explicit",
+    "popularity",
+    "external_ids.isrc",
+    "uri",
+)
+SAVED_TRACK_COLUMNS = ("added_at",) + tuple(
+    f"track.{column}" for column in TRACK_COLUMNS
+)
+PLAYLIST_ITEM_COLUMNS = ("added_at", "added_by.id", "is_local") + tuple(
+    f"track.{column}" for column in TRACK_COLUMNS
+)
+ALBUM_COLUMNS = (
+    "id",
+    "name",
+    "artists.name",
+    "album_type",
+    "release_date",
+    "total_tracks",
+    "uri",
+)
+SAVED_ALBUM_COLUMNS = ("added_at",) + tuple(
+    f"album.{column}" for column in ALBUM_COLUMNS
+)
+ARTIST_COLUMNS = ("id", "name", "genres", "popularity", "followers.total", "uri")
+PLAYLIST_COLUMNS = ("id", "name", "owner.id", "tracks.total", "public", "uri")
+
+AUDIO_FEATURES_COLUMNS = (
+    "id",
+    "danceability",
+    "energy",
+    "key",
+    "loudness",
+    "mode",
+    "speechiness",
+    "acousticness",
+    "instrumentalness",
+    "liveness",
+    "valence",
+    "tempo",
+    "duration_ms",
+    "time_signature",
+)
+
+SEARCH_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "track": TRACK_COLUMNS,
+    "album": ALBUM_COLUMNS,
+    "artist": ARTIST_COLUMNS,
+    "playlist": PLAYLIST_COLUMNS,
+}
+SEARCH_MODELS: Dict[str, Type[BaseModel]] = {
+    "track": Track,
+    "album": SimplifiedAlbumObject,
+    "artist": ArtistObject,
+    "playlist": SimplifiedPlaylistObject,
+}
+
+# Joins the values of a column that crosses a list, e.g. several artists.
+LIST_SEPARATOR = "; "
+
+Destination = Union[str, os.PathLike, IO]
+
+
+class ExportReport(BaseModel):
+    rows: int
+    pages: int
+    format: str
+    path: Optional[str] = None
+
+
+def lookup(item: Any, path: Union[str, Sequence[str]]) -> Any:
+    """The value at dotted `path` in a raw item, `None` if any part is missing."""
+    keys = path.split(".") if isinstance(path, str) else path
+    value = item
+    for i, key in enumerate(keys):
+        if isinstance(value, list):
+            if key.isdigit():
+                index = int(key)
+                value = value[index] if index < len(value) else None
+                continue
+            found = []
+            for element in value:
+                result = lookup(element, keys[i:])
+                if isinstance(result, list):
+                    found.extend(result)
+                elif result is not None:
+                    found.append(result)
+            return found
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def fields_filter(columns: Sequence[str], item_path: str = "items") -> str:
+    """A Spotify `fields` filter selecting `columns`, e.g. `items(track(name)),next`."""
+    tree: Dict[str, Dict] = {}
+    for column in columns:
+        node = tree
+        for key in column.split("."):
+            if not key.isdigit():
+                node = node.setdefault(key, {})
+
+    def render(node: Dict) -> str:
+        return ",".join(
+            key + (f"({render(child)})" if child else "") for key, child in node.items()
+        )
+
+    return f"{item_path}({render(tree)}),next"
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return LIST_SEPARATOR.join(
+            json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else str(v)
+            for v in value
+        )
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def resolve_format(destination: Destination, format: Optional[str] = None) -> str:
+    """`format` if given, else `csv` for `.csv`/`.csv.gz` paths and `ndjson` otherwise."""
+    if format is None:
+        name = (
+            os.fspath(destination)
+            if isinstance(destination, (str, os.PathLike))
+            else ""
+        )
+        if name.endswith(".gz"):
+            name = name[:-3]
+        name = name.lower()
+        if name.endswith(".csv"):
+            format = "csv"
+        elif name.endswith(".parquet"):
+            format = "parquet"
+        else:
+            format = "ndjson"
+    if format not in FORMATS:
+        raise ValueError(f"Invalid format, must be one of {list(FORMATS)}.")
+    return format
+
+
+def _file_mode(path: str) -> int:
+    """The mode of the existing file at `path`, or the umask's default for a new one."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def temporary_file(path: str) -> Tuple[int, str]:
+    """A new file next to `path` to write to before replacing `path` with it.
+
+    mkstemp creates it readable by the owner only; it gets the mode `path`
+    has (or would get), since `os.replace` keeps the temporary file's mode.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}-", suffix=".tmp"
+    )
+    try:
+        os.chmod(tmp_path, _file_mode(path))
+    except BaseException:
+        os.close(fd)
+        os.remove(tmp_path)
+        raise
+    return fd, tmp_path
+
+
+def open_writer(
+    destination: Destination,
+    format: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    compress: Optional[bool] = None,
+    model: Optional[Type[BaseModel]] = None,
+):
+    """An `ExportWriter`, or a `columnar.ParquetWriter` typed from `model`."""
+    if resolve_format(destination, format) != "parquet":
+        return ExportWriter(destination, format, columns, compress)
+    if model is None:
+        raise ValueError("Parquet export needs the model of the exported items.")
+    from rebel_rhythms.columnar import ParquetWriter
+
+    return ParquetWriter(
+        destination, model, columns, compression=None if compress is False else "snappy"
+    )
+
+
+class ExportWriter:
+    """Writes raw items as NDJSON lines or CSV rows to a path or open file.
+
+    Paths are written to a temporary file next to the target and moved into
+    place by `close()`; `abort()` discards it. Open files are left open.
+    """
+
+    def __init__(
+        self,
+        destination: Destination,
+        format: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        compress: Optional[bool] = None,
+    ):
+        self.path: Optional[str] = None
+        if isinstance(destination, (str, os.PathLike)):
+            self.path = os.fspath(destination)
+            if compress is None:
+                compress = self.path.endswith(".gz")
+        format = resolve_format(destination, format)
+        if format == "parquet":
+            raise ValueError("Parquet files are written by `open_writer()`.")
+        if format == "csv" and not columns:
+            raise ValueError("CSV export needs columns.")
+
+        self.format = format
+        self.columns = list(columns) if columns else None
+        self._getters = [column.split(".") for column in self.columns or ()]
+        self.rows = 0
+        self._tmp_path: Optional[str] = None
+        self._owned: List[Union[IO, gzip.GzipFile]] = []
+        self._destination = destination
+        self._file = self._open(destination, bool(compress))
+        if format == "csv":
+            self._csv = csv.writer(self._file, lineterminator="\n")
+            self._csv.writerow(self.columns or ())
+
+    def _open(self, destination: Destination, compress: bool) -> IO[str]:
+        raw: Union[IO, gzip.GzipFile]
+        if self.path is not None:
+            fd, self._tmp_path = temporary_file(self.path)
+            raw = os.fdopen(fd, "wb")
+            self._owned.append(raw)
+        else:
+            # Not a path, or `self.path` would be set.
+            raw = cast(IO, destination)
+            if isinstance(raw, io.TextIOBase) and not compress:
+                return raw
+            if isinstance(raw, io.TextIOBase):
+                raw.flush()
+                raw = raw.buffer
+        if compress:
+            raw = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6)
+            self._owned.append(raw)
+        text = io.TextIOWrapper(raw, encoding="utf-8", newline="", write_through=False)
+        self._owned.append(text)
+        return text
+
+    def write_many(self, items: List[Dict]) -> None:
+        if self.format == "csv":
+            self._csv.writerows(
+                [_csv_value(lookup(item, keys)) for keys in self._getters]
+                for item in items
+            )
+        else:
+            if self.columns:
+                items = [
+                    {
+                        column: lookup(item, keys)
+                        for column, keys in zip(self.columns, self._getters)
+                    }
+                    for item in items
+                ]
+            self._file.write(
+                "".join(
+                    json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n"
+                    for item in items
+                )
+            )
+        self.rows += len(items)
+
+    def write(self, item: Dict) -> None:
+        self.write_many([item])
+
+    def _release(self) -> None:
+        # Innermost wrapper first; the caller's own file is flushed but never closed.
+        for owned in reversed(self._owned):
+            if isinstance(owned, io.TextIOWrapper) and self.path is None:
+                owned.flush()
+                owned.detach()
+            else:
+                owned.close()
+        self._owned = []
+        if self.path is None:
+            cast(IO, self._destination).flush()
+
+    def close(self) -> None:
+        self._release()
+        if self._tmp_path is not None and self.path is not None:
+            os.replace(self._tmp_path, self.path)
+            self._tmp_path = None
+
+    def abort(self) -> None:
+        self._release()
+        if self._tmp_path is not None:
+            os.unlink(self._tmp_path)
+            self._tmp_path = None
+
+    def __enter__(self) -> "ExportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+_DONE = object()
+
+
+def prefetch(pages: Iterator, depth: int) -> Iterator:
+    """Run `pages` in a background thread, keeping at most `depth` pages ahead."""
+    if depth <= 0:
+        yield from pages
+        return
+
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(value) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for page in pages:
+                if not put((page, None)):
+                    return
+            put((_DONE, None))
+        except BaseException as exc:
+            put((None, exc))
+
+    thread = threading.Thread(target=produce, name="rebel-rhythms-export", daemon=True)
+    thread.start()
+    try:
+        while True:
+            page, error = buffer.get()
+            if error is not None:
+                raise error
+            if page is _DONE:
+                return
+            yield page
+    finally:
+        stop.set()
+        thread.join()
+
+
+class LibraryExporter:
+    """Exports playlists, saved items, top items and search results page by page.
+
+    Items are written from the raw page payloads while the next page is
+    fetched. Columns are dotted paths (see `lookup`); for playlists they also
+    become the `fields` filter, so Spotify only sends what is written.
+    """
+
+    def __init__(self, client, prefetch_pages: int = 2):
+        self.client = client
+        self.prefetch_pages = prefetch_pages
+
+    def pages(
+        self,
+        endpoint: str,
+        params: Dict,
+        item_path: str = "items",
+        next_path: str = "next",
+        include_market: bool = True,
+        max_items: Optional[int] = None,
+    ) -> Iterator[List[Dict]]:
+        """Raw item lists, one per page, up to `max_items` items."""
+        manager = self.client.request_manager
+        limit = params.get("limit", 50)
+        offset = params.get("offset", 0)
+        remaining = max_items
+        while remaining is None or remaining > 0:
+            response = manager.get(
+                endpoint,
+                params={**params, "limit": limit, "offset": offset},
+                include_market=include_market,
+            )
+            items = manager._navigate_to_item_path(response, item_path) or []
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+            if items:
+                yield items
+            if not items or not manager._navigate_to_item_path(response, next_path):
+                return
+            offset += limit
+
+    def export(
+        self,
+        pages: Iterator[List[Dict]],
+        destination: Destination,
+        columns: Optional[Sequence[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+        model: Optional[Type[BaseModel]] = None,
+    ) -> ExportReport:
+        """Write every page of raw items to `destination`; Parquet needs their `model`."""
+        count = 0
+        with open_writer(destination, format, columns, compress, model) as writer:
+            for page in prefetch(pages, self.prefetch_pages):
+                writer.write_many(page)
+                count += 1
+        return ExportReport(
+            rows=writer.rows, pages=count, format=writer.format, path=writer.path
+        )
+
+    def _export(
+        self,
+        source: Callable[[Optional[Sequence[str]]], Iterator[List[Dict]]],
+        destination: Destination,
+        columns: Optional[Sequence[str]],
+        format: Optional[str],
+        compress: Optional[bool],
+        default_columns: Sequence[str],
+        model: Type[BaseModel],
+    ) -> ExportReport:
+        format = resolve_format(destination, format)
+        if format == "csv" and not columns:
+            columns = default_columns
+        return self.export(
+            source(columns), destination, columns, format, compress, model
+        )
+
+    def playlist(
+        self,
+        playlist_id: str,
+        destination: Destination,
+        columns: Optional[Sequence[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        def source(columns):
+            params: Dict[str, Any] = {"limit": 100, "offset": 0}
+            if columns:
+                params["fields"] = fields_filter(columns)
+            return self.pages(f"/v1/playlists/{playlist_id}/tracks", params)
+
+        return self._export(
+            source,
+            destination,
+            columns,
+            format,
+            compress,
+            PLAYLIST_ITEM_COLUMNS,
+            PlaylistTrackObject,
+        )
+
+    def saved_tracks(
+        self,
+        destination: Destination,
+        columns: Optional[Sequence[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        def source(columns):
+            return self.pages("/v1/me/tracks", {"limit": 50, "offset": 0})
+
+        return self._export(
+            source,
+            destination,
+            columns,
+            format,
+            compress,
+            SAVED_TRACK_COLUMNS,
+            SavedTrackObject,
+        )
+
+    def saved_albums(
+        self,
+        destination: Destination,
+        columns: Optional[Sequence[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        def source(columns):
+            return self.pages("/v1/me/albums", {"limit": 50, "offset": 0})
+
+        return self._export(
+            source,
+            destination,
+            columns,
+            format,
+            compress,
+            SAVED_ALBUM_COLUMNS,
+            SavedAlbumObject,
+        )
+
+    def top_items(
+        self,
+        items_type: str,
+        destination: Destination,
+        time_range: str = "medium_term",
+        columns: Optional[Sequence[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        if items_type not in ("tracks", "artists"):
+            raise ValueError("Invalid items_type, must be 'tracks' or 'artists'.")
+
+        def source(columns):
+            params = {"limit": 50, "offset": 0, "time_range": time_range}
+            return self.pages(f"/v1/me/top/{items_type}", params, include_market=False)
+
+        default_columns: Tuple[str, ...]
+        model: Type[BaseModel]
+        if items_type == "tracks":
+            default_columns, model = TRACK_COLUMNS, Track
+        else:
+            default_columns, model = ARTIST_COLUMNS, ArtistObject
+        return self._export(
+            source, destination, columns, format, compress, default_columns, model
+        )
+
+    def search(
+        self,
+        query: str,
+        search_type: str,
+        destination: Destination,
+        max_items: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        if search_type not in SEARCH_COLUMNS:
+            raise ValueError(f"Invalid search_type: {search_type}")
+
+        def source(columns):
+            params = {"q": query, "type": search_type, "limit": 50, "offset": 0}
+            return self.pages(
+                "/v1/search",
+                params,
+                item_path=f"{search_type}s.items",
+                next_path=f"{search_type}s.next",
+                max_items=max_items,
+            )
+
+        return self._export(
+            source,
+            destination,
+            columns,
+            format,
+            compress,
+            SEARCH_COLUMNS[search_type],
+            SEARCH_MODELS[search_type],
+        )
+
+    def _lookup_pages(
+        self, endpoint: str, key: str, ids: Sequence[str], size: int
+    ) -> Iterator[List[Dict]]:
+        """Catalog objects for `ids`, `size` IDs per request, skipping unknown ones."""
+        for start in range(0, len(ids), size):
+            response = self.client.request_manager.get(
+                endpoint, params={"ids": ",".join(ids[start : start + size])}
+            )
+            items = [item for item in response.get(key) or [] if item]
+            if items:
+                yield items
+
+    def tracks(
+        self,
+        track_ids: Sequence[str],
+        destination: Destination,
+        columns: Optional[Sequence[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        def source(columns):
+            return self._lookup_pages("/v1/tracks", "tracks", track_ids, 50)
+
+        return self._export(
+            source, destination, columns, format, compress, TRACK_COLUMNS, Track
+        )
+
+    def audio_features(
+        self,
+        track_ids: Sequence[str],
+        destination: Destination,
+        columns: Optional[Sequence[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        def source(columns):
+            return self._lookup_pages(
+                "/v1/audio-features", "audio_features", track_ids, 100
+            )
+
+        return self._export(
+            source,
+            destination,
+            columns,
+            format,
+            compress,
+            AUDIO_FEATURES_COLUMNS,
+            AudioFeaturesObject,
+        )
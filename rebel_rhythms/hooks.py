@@ -0,0 +1,66 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+_ID_SEGMENT = re.compile(r"^[0-9A-Za-z]{22}$")
+# Segments after these are free-form names rather than base-62 IDs.
+_NAMED_SEGMENTS = {"users": "{user_id}", "categories": "{category_id}"}
+
+
+@lru_cache(maxsize=1024)
+def endpoint_template(endpoint: str) -> str:
+    """`/v1/playlists/37i9dQZF1DWZtGWF9Ltb0N/tracks` -> `/v1/playlists/{id}/tracks`.
+
+    Keeps metric label cardinality bounded by the API surface, not by data.
+    """
+    parts = endpoint.split("?", 1)[0].split("/")
+    template = []
+    for i, part in enumerate(parts):
+        previous = parts[i - 1] if i else ""
+        if part and previous in _NAMED_SEGMENTS:
+            template.append(_NAMED_SEGMENTS[previous])
+        elif _ID_SEGMENT.match(part):
+            template.append("{id}")
+        else:
+            template.append(part)
+    return "/".join(template)
+
+
+class RequestInfo(NamedTuple):
+    method: str
+    endpoint: str
+    # 0 for the first send; every resend (after a 401 or for a retry) adds one.
+    attempt: int = 0
+    # Seconds this send waited on the client-side rate limiter.
+    throttled: float = 0.0
+
+    @property
+    def template(self) -> str:
+        return endpoint_template(self.endpoint)
+
+
+class RequestHook:
+    """Observer of a request manager's traffic; override what you need.
+
+    Hooks run synchronously on the requesting thread, once per HTTP send, so
+    they should be cheap and thread-safe. Exceptions raised by a hook are not
+    caught.
+    """
+
+    def before_request(self, info: RequestInfo) -> None:
+        pass
+
+    def after_response(self, info: RequestInfo, response, elapsed: float) -> None:
+        pass
+
+    def on_error(self, info: RequestInfo, error: Exception, elapsed: float) -> None:
+        """The send raised instead of returning a response (e.g. a timeout)."""
+
+    def on_retry(self, info: RequestInfo, reason: str, delay: float) -> None:
+        """`info` was answered with a 429 ("rate_limited") or a 5xx ("server_error")."""
+
+    def on_token_refresh(self) -> None:
+        pass
+
+    def on_cache(self, endpoint: str, hit: bool) -> None:
+        """Reported by caching layers through `SpotifyRequestManager.notify_cache`."""
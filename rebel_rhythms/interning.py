@@ -0,0 +1,211 @@
+"""Share repeated sub-objects and strings across a large result set."""
+
+import threading
+from typing import Any, Dict, NoReturn, Optional, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict
+
+from rebel_rhythms.models import (
+    AlbumObject,
+    ArtistObject,
+    ExternalUrls,
+    ImageObject,
+    PlaylistOwner,
+    PlaylistTrackAddedBy,
+    SimplifiedAlbumObject,
+    SimplifiedArtistObject,
+    TrackAlbum,
+)
+
+
+class FrozenList(list):
+    """A list that rejects mutation, for the list fields of shared objects.
+
+    A list subclass rather than a tuple: pydantic serializes a nested
+    object by its declared `List[...]` type and warns about tuples, and
+    this still compares equal to plain lists.
+    """
+
+    def _immutable(self, *args: Any, **kwargs: Any) -> NoReturn:
+        raise TypeError("Shared interned lists are immutable")
+
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable  # type: ignore[assignment]
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        return hash(tuple(self))
+
+    def __reduce__(self) -> Tuple[type, Tuple[list]]:
+        # Copies and pickles would otherwise be rebuilt through `extend`.
+        return FrozenList, (list(self),)
+
+
+class _Shared:
+    """Pydantic only compares models of the same class; a shared object is
+    equal to a regular model of the class it was made from, with the same data.
+    """
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        regular = _REGULAR_MODELS.get(type(self))
+        if regular is not _REGULAR_MODELS.get(type(other), type(other)):
+            return False
+        return self.__dict__ == other.__dict__
+
+    __hash__ = BaseModel.__hash__
+
+
+class FrozenExternalUrls(_Shared, ExternalUrls):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenImageObject(_Shared, ImageObject):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenSimplifiedArtistObject(_Shared, SimplifiedArtistObject):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenArtistObject(_Shared, ArtistObject):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenTrackAlbum(_Shared, TrackAlbum):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenSimplifiedAlbumObject(_Shared, SimplifiedAlbumObject):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenAlbumObject(_Shared, AlbumObject):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenPlaylistOwner(_Shared, PlaylistOwner):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenPlaylistTrackAddedBy(_Shared, PlaylistTrackAddedBy):
+    model_config = ConfigDict(frozen=True)
+
+
+FROZEN_MODELS: Dict[type, Type[BaseModel]] = {
+    ExternalUrls: FrozenExternalUrls,
+    ImageObject: FrozenImageObject,
+    SimplifiedArtistObject: FrozenSimplifiedArtistObject,
+    ArtistObject: FrozenArtistObject,
+    TrackAlbum: FrozenTrackAlbum,
+    SimplifiedAlbumObject: FrozenSimplifiedAlbumObject,
+    AlbumObject: FrozenAlbumObject,
+    PlaylistOwner: FrozenPlaylistOwner,
+    PlaylistTrackAddedBy: FrozenPlaylistTrackAddedBy,
+}
+_REGULAR_MODELS: Dict[type, Type[BaseModel]] = {
+    frozen: regular for regular, frozen in FROZEN_MODELS.items()
+}
+_SHARED_TYPES = frozenset(FROZEN_MODELS.values())
+
+
+# Strings are only shared for fields with a handful of distinct values;
+# names, IDs and URLs are mostly unique and would just grow the table.
+INTERNED_FIELDS = frozenset(
+    {
+        "type",
+        "album_type",
+        "album_group",
+        "release_date_precision",
+        "available_markets",
+        "country",
+        "product",
+    }
+)
+
+
+class Interner:
+    """Canonicalizes models and raw dicts in place.
+
+    Artists, albums and owners already seen (by ID) are replaced with one
+    frozen shared instance, which compares equal to the regular model but
+    rejects assignment; if an ID shows up with different data, the first
+    version wins. Safe to share between threads: a race can at worst create
+    two equivalent instances, never a wrong one.
+    """
+
+    def __init__(self):
+        self._strings: Dict[str, str] = {}
+        self._shared: Dict[Tuple, BaseModel] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self._shared)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "objects": len(self._shared),
+            "strings": len(self._strings),
+            "hits": self.hits,
+        }
+
+    def string(self, value: str) -> str:
+        return self._strings.setdefault(value, value)
+
+    def intern(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.string(value)
+        return self._walk(value)
+
+    def _walk(
+        self, value: Any, field: Optional[str] = None, frozen: bool = False
+    ) -> Any:
+        if isinstance(value, str):
+            return self.string(value) if field in INTERNED_FIELDS else value
+        if isinstance(value, BaseModel):
+            return self._model(value, frozen)
+        if isinstance(value, list):
+            for i, item in enumerate(value):
+                value[i] = self._walk(item, field, frozen)
+            return value
+        if isinstance(value, dict):
+            for key, item in value.items():
+                value[key] = self._walk(item, key, frozen)
+            return value
+        return value
+
+    def _model(self, obj: BaseModel, frozen: bool = False) -> BaseModel:
+        """Share `obj` by ID, or freeze it when it is part of a shared object."""
+        cls = type(obj)
+        if cls in _SHARED_TYPES:
+            return obj
+        frozen_cls = FROZEN_MODELS.get(cls)
+        entity_id = obj.__dict__.get("id")
+        if frozen_cls is None or not (entity_id or frozen):
+            # Not shareable itself (e.g. the per-item Track), but its parts may be.
+            self._walk(obj.__dict__)
+            return obj
+
+        key = (cls, entity_id) if entity_id else None
+        if key is not None:
+            shared = self._shared.get(key)
+            if shared is not None:
+                with self._lock:
+                    self.hits += 1
+                return shared
+
+        self._walk(obj.__dict__, frozen=True)
+        fields = {
+            name: FrozenList(value) if isinstance(value, list) else value
+            for name, value in obj.__dict__.items()
+        }
+        # Already validated, so the frozen copy can skip validation.
+        shared = frozen_cls.model_construct(
+            _fields_set=set(obj.model_fields_set), **fields
+        )
+        if key is not None:
+            with self._lock:
+                shared = self._shared.setdefault(key, shared)
+        return shared
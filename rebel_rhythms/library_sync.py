@@ -0,0 +1,234 @@
+import random
+from enum import Enum
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from rebel_rhythms.state_store import MemoryStateStore, StateStore
+
+
+class LibraryKind(str, Enum):
+    TRACKS = "tracks"
+    ALBUMS = "albums"
+
+
+class LibraryDelta(BaseModel):
+    added: List[Dict[str, Any]] = []
+    removed: List[str] = []
+    total: int = 0
+    requests: int = 0
+    reconciled: bool = False
+    full_resync: bool = False
+
+
+class LibrarySync:
+    """Incremental mirror of the user's saved tracks or albums.
+
+    Saved items are returned newest-first, so a sync pages only until it meets
+    an item it already knows. Removals don't show up at the top; they are found
+    by comparing the remote `total` with the local count (and, every
+    `reconcile_every` syncs, a random sample page) and then bisecting pages
+    to locate the gaps.
+    """
+
+    def __init__(
+        self,
+        client,
+        kind: LibraryKind = LibraryKind.TRACKS,
+        store: Optional[StateStore] = None,
+        user_key: str = "me",
+        reconcile_every: int = 12,
+        page_size: int = 50,
+    ):
+        if not isinstance(kind, LibraryKind):
+            raise ValueError("Invalid kind. Must be an instance of LibraryKind Enum.")
+        self.client = client
+        self.kind = kind
+        self.store = store if store is not None else MemoryStateStore()
+        self.key = f"library:{kind.value}:{user_key}"
+        self.reconcile_every = reconcile_every
+        self.page_size = page_size
+        self.endpoint = f"/v1/me/{kind.value}"
+        self._item_key = kind.value[:-1]
+        self._requests = 0
+
+    def _load_state(self) -> Dict[str, Any]:
+        return self.store.get(self.key) or {"items": [], "syncs": 0}
+
+    def _fetch_page(self, offset: int) -> Dict[str, Any]:
+        self._requests += 1
+        return self.client.request_manager.get(
+            self.endpoint, params={"limit": self.page_size, "offset": offset}
+        )
+
+    def _entry(self, item: Dict[str, Any]) -> Tuple[str, str]:
+        return item[self._item_key]["id"], item["added_at"]
+
+    def item_ids(self) -> List[str]:
+        return [item_id for item_id, _ in self._load_state()["items"]]
+
+    def high_water_mark(self) -> Optional[str]:
+        items = self._load_state()["items"]
+        return items[0][1] if items else None
+
+    def sync(self) -> LibraryDelta:
+        self._requests = 0
+        state = self._load_state()
+        local = [tuple(entry) for entry in state["items"]]
+        known = dict(local)
+
+        added = []
+        offset = 0
+        while True:
+            page = self._fetch_page(offset)
+            reached_known = False
+            for item in page.get("items", []):
+                item_id, added_at = self._entry(item)
+                if known.get(item_id) == added_at:
+                    reached_known = True
+                    break
+                added.append(item)
+            if reached_known or not page.get("next"):
+                break
+            offset += self.page_size
+        total = page.get("total", 0)
+
+        added_ids = {self._entry(item)[0] for item in added}
+        entries = [self._entry(item) for item in added]
+        entries += [entry for entry in local if entry[0] not in added_ids]
+
+        delta = LibraryDelta(added=added, total=total)
+
+        syncs = state["syncs"] + 1
+        sample_due = self.reconcile_every and syncs % self.reconcile_every == 0
+        if total != len(entries) or (sample_due and not self._sample_matches(entries)):
+            entries, delta = self._reconcile(entries, delta)
+
+        self.store.set(self.key, {"items": [list(e) for e in entries], "syncs": syncs})
+        delta.requests = self._requests
+        return delta
+
+    def _sample_matches(self, entries: List[Tuple[str, str]]) -> bool:
+        if not entries:
+            return True
+        offset = random.randrange(0, len(entries), self.page_size)
+        page = self._fetch_page(offset)
+        remote = [self._entry(item) for item in page.get("items", [])]
+        return remote == entries[offset : offset + len(remote)]
+
+    def reconcile(self) -> LibraryDelta:
+        self._requests = 0
+        state = self._load_state()
+        entries = [tuple(entry) for entry in state["items"]]
+        delta = LibraryDelta(total=self._fetch_page(0).get("total", 0))
+        entries, delta = self._reconcile(entries, delta)
+        self.store.set(
+            self.key, {"items": [list(e) for e in entries], "syncs": state["syncs"]}
+        )
+        delta.requests = self._requests
+        return delta
+
+    def _reconcile(
+        self, entries: List[Tuple[str, str]], delta: LibraryDelta
+    ) -> Tuple[List[Tuple[str, str]], LibraryDelta]:
+        delta.reconciled = True
+        removed = self._locate_removals(entries, delta.total)
+        if removed is None:
+            return self._full_resync(entries, delta)
+
+        delta.removed = [entries[index][0] for index in sorted(removed)]
+        entries = [entry for i, entry in enumerate(entries) if i not in removed]
+        return entries, delta
+
+    def _locate_removals(
+        self, entries: List[Tuple[str, str]], total: int
+    ) -> Optional[set]:
+        """Indices of local entries missing remotely, None if the lists diverged."""
+        if total > len(entries):
+            return None
+        if total == 0:
+            return set(range(len(entries)))
+
+        index_of = {entry: i for i, entry in enumerate(entries)}
+        pages: Dict[int, List[int]] = {}
+
+        def fetch(page_number: int) -> Optional[List[int]]:
+            if page_number not in pages:
+                page = self._fetch_page(page_number * self.page_size)
+                # -1 marks an entry that isn't in the stored list.
+                indices = [
+                    index_of.get(self._entry(item), -1) for item in page["items"]
+                ]
+                if not indices or -1 in indices or indices != sorted(indices):
+                    return None
+                pages[page_number] = indices
+            return pages[page_number]
+
+        def drift(page_number: int, last: bool) -> int:
+            indices = pages[page_number]
+            position = page_number * self.page_size
+            if last:
+                return indices[-1] - (position + len(indices) - 1)
+            return indices[0] - position
+
+        removed: Set[int] = set()
+
+        def collect_within(page_number: int) -> None:
+            indices = pages[page_number]
+            present = set(indices)
+            removed.update(
+                i for i in range(indices[0], indices[-1]) if i not in present
+            )
+
+        def bisect(low: int, high: int) -> bool:
+            if drift(low, last=True) == drift(high, last=False):
+                return True
+            if high == low + 1:
+                removed.update(range(pages[low][-1] + 1, pages[high][0]))
+                return True
+            middle = (low + high) // 2
+            if fetch(middle) is None:
+                return False
+            collect_within(middle)
+            return bisect(low, middle) and bisect(middle, high)
+
+        last_page = (total - 1) // self.page_size
+        if fetch(0) is None or fetch(last_page) is None:
+            return None
+        removed.update(range(0, pages[0][0]))
+        removed.update(range(pages[last_page][-1] + 1, len(entries)))
+        collect_within(0)
+        collect_within(last_page)
+        if last_page and not bisect(0, last_page):
+            return None
+
+        if len(entries) - len(removed) != total:
+            return None
+        return removed
+
+    def _full_resync(
+        self, entries: List[Tuple[str, str]], delta: LibraryDelta
+    ) -> Tuple[List[Tuple[str, str]], LibraryDelta]:
+        remote_items = []
+        offset = 0
+        while True:
+            page = self._fetch_page(offset)
+            remote_items.extend(page.get("items", []))
+            if not page.get("next"):
+                break
+            offset += self.page_size
+
+        remote = [self._entry(item) for item in remote_items]
+        local_keys = set(entries)
+        already_added = {self._entry(item) for item in delta.added}
+
+        delta.full_resync = True
+        delta.total = len(remote)
+        delta.added = delta.added + [
+            item
+            for item, entry in zip(remote_items, remote)
+            if entry not in local_keys and entry not in already_added
+        ]
+        remote_ids = {item_id for item_id, _ in remote}
+        delta.removed = [item_id for item_id, _ in entries if item_id not in remote_ids]
+        return remote, delta
@@ -0,0 +1,317 @@
+"""In-process request metrics, exposed in the Prometheus text format."""
+
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from rebel_rhythms.hooks import RequestHook, RequestInfo, endpoint_template
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[Sample]: ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last)], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels) -> int:
+        counts, _ = self._values.get(self._key(labels), ([0], [0.0]))
+        return sum(counts)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            values = sorted(
+                (key, (list(counts), total[0]))
+                for key, (counts, total) in self._values.items()
+            )
+        for key, (counts, total) in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {
+                    **labels,
+                    "le": _format_value(bound),
+                }, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+MetricT = TypeVar("MetricT", bound=_Metric)
+
+
+class MetricsRegistry:
+    """A named set of metrics; asking for an existing name returns it."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls: Type[MetricT], name: str, *args) -> MetricT:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for sample_name, labels, value in metric.samples():
+                if labels:
+                    rendered = ",".join(
+                        f'{k}="{_escape(v)}"' for k, v in labels.items()
+                    )
+                    sample_name = f"{sample_name}{{{rendered}}}"
+                lines.append(f"{sample_name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int = 0, host: str = "127.0.0.1") -> "MetricsServer":
+        return MetricsServer(self, port, host)
+
+
+class MetricsServer:
+    """Serves `registry.render()` at `/metrics` from a background thread."""
+
+    def __init__(
+        self, registry: MetricsRegistry, port: int = 0, host: str = "127.0.0.1"
+    ):
+        # http.server is only needed when metrics are actually served.
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header(
+                    "Content-Type", "text/plain; version=0.0.4; charset=utf-8"
+                )
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.1},
+            daemon=True,
+        )
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}/metrics"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> "MetricsServer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class RequestMetrics(RequestHook):
+    """Request hook that feeds a `MetricsRegistry`.
+
+    Endpoints are labelled by template (`/v1/playlists/{id}/tracks`), so the
+    counters show which API calls use up the rate budget and the latency.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[MetricsRegistry] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.registry = registry or MetricsRegistry()
+        registry = self.registry
+        self.requests = registry.counter(
+            "spotify_requests_total",
+            "HTTP requests sent, by response status.",
+            ("method", "endpoint", "status"),
+        )
+        self.latency = registry.histogram(
+            "spotify_request_duration_seconds",
+            "Time to receive a response.",
+            ("method", "endpoint"),
+            buckets,
+        )
+        self.response_bytes = registry.counter(
+            "spotify_response_bytes_total",
+            "Response body bytes received.",
+            ("method", "endpoint"),
+        )
+        self.errors = registry.counter(
+            "spotify_request_errors_total",
+            "Sends that failed without a response.",
+            ("method", "endpoint", "error"),
+        )
+        self.retries = registry.counter(
+            "spotify_retries_total",
+            "Requests retried after a 429 or 5xx.",
+            ("method", "endpoint", "reason"),
+        )
+        self.retry_wait = registry.counter(
+            "spotify_retry_wait_seconds_total",
+            "Seconds of back-off before retries.",
+            ("reason",),
+        )
+        self.throttled = registry.counter(
+            "spotify_rate_limiter_wait_seconds_total",
+            "Seconds requests waited on the client-side rate limiter.",
+            ("endpoint",),
+        )
+        self.token_refreshes = registry.counter(
+            "spotify_token_refreshes_total", "Access token refreshes."
+        )
+        self.cache = registry.counter(
+            "spotify_cache_requests_total",
+            "Cache lookups by result.",
+            ("endpoint", "result"),
+        )
+
+    def after_response(self, info: RequestInfo, response, elapsed: float) -> None:
+        template = info.template
+        self.requests.inc(
+            method=info.method, endpoint=template, status=response.status_code
+        )
+        self.latency.observe(elapsed, method=info.method, endpoint=template)
+        self.response_bytes.inc(
+            len(response.content or b""), method=info.method, endpoint=template
+        )
+        if info.throttled:
+            self.throttled.inc(info.throttled, endpoint=template)
+
+    def on_error(self, info: RequestInfo, error: Exception, elapsed: float) -> None:
+        self.errors.inc(
+            method=info.method, endpoint=info.template, error=type(error).__name__
+        )
+
+    def on_retry(self, info: RequestInfo, reason: str, delay: float) -> None:
+        self.retries.inc(method=info.method, endpoint=info.template, reason=reason)
+        self.retry_wait.inc(delay, reason=reason)
+
+    def on_token_refresh(self) -> None:
+        self.token_refreshes.inc()
+
+    def on_cache(self, endpoint: str, hit: bool) -> None:
+        self.cache.inc(
+            endpoint=endpoint_template(endpoint), result="hit" if hit else "miss"
+        )
+
+    def render(self) -> str:
+        return self.registry.render()
+
+    def serve(self, port: int = 0, host: str = "127.0.0.1") -> MetricsServer:
+        return self.registry.serve(port, host)
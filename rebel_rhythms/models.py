@@ -1,39 +1,45 @@
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
-class ExternalUrls(BaseModel):
+class SpotifyModel(BaseModel):
+    # Validators are built on first use rather than at import, so importing the
+    # package doesn't pay for ~40 schemas that a given program may never touch.
+    model_config = ConfigDict(defer_build=True)
+
+
+class ExternalUrls(SpotifyModel):
     spotify: str
 
 
-class Restrictions(BaseModel):
+class Restrictions(SpotifyModel):
     reason: str
 
 
-class ImageObject(BaseModel):
+class ImageObject(SpotifyModel):
     height: int | None = None
     width: int | None = None
     url: str
 
 
-class CopyrightObject(BaseModel):
+class CopyrightObject(SpotifyModel):
     text: str
     type: str
 
 
-class ExternalIds(BaseModel):
+class ExternalIds(SpotifyModel):
     isrc: str | None = None
     ean: str | None = None
     upc: str | None = None
 
 
-class Followers(BaseModel):
+class Followers(SpotifyModel):
     href: str | None = None
     total: int
 
 
-class LinkedFrom(BaseModel):
+class LinkedFrom(SpotifyModel):
     external_urls: ExternalUrls
     href: str
     id: str
@@ -41,7 +47,7 @@ class LinkedFrom(BaseModel):
     uri: str
 
 
-class SimplifiedArtistObject(BaseModel):
+class SimplifiedArtistObject(SpotifyModel):
     external_urls: ExternalUrls
     href: str
     id: str
@@ -50,7 +56,7 @@ class SimplifiedArtistObject(BaseModel):
     uri: str
 
 
-class ArtistObject(BaseModel):
+class ArtistObject(SpotifyModel):
     external_urls: ExternalUrls
     href: str
     id: str
@@ -63,7 +69,7 @@ class ArtistObject(BaseModel):
     popularity: int | None = None
 
 
-class SimplifiedTrackObject(BaseModel):
+class SimplifiedTrackObject(SpotifyModel):
     artists: List[SimplifiedArtistObject]
     available_markets: List[str] | None = None
     disc_number: int
@@ -83,7 +89,7 @@ class SimplifiedTrackObject(BaseModel):
     is_local: bool
 
 
-class Tracks(BaseModel):
+class Tracks(SpotifyModel):
     href: str
     limit: int
     next: str | None = None
@@ -93,7 +99,7 @@ class Tracks(BaseModel):
     items: List[SimplifiedTrackObject]
 
 
-class AlbumObject(BaseModel):
+class AlbumObject(SpotifyModel):
     album_type: str
     total_tracks: int
     available_markets: List[str] | None = None
@@ -116,7 +122,7 @@ class AlbumObject(BaseModel):
     tracks: Tracks | None = None
 
 
-class SimplifiedAlbumObject(BaseModel):
+class SimplifiedAlbumObject(SpotifyModel):
     album_type: str
     total_tracks: int
     available_markets: List[str] | None = None
@@ -139,12 +145,12 @@ class SimplifiedAlbumObject(BaseModel):
     artists: List[SimplifiedArtistObject]
 
 
-class SavedAlbumObject(BaseModel):
+class SavedAlbumObject(SpotifyModel):
     added_at: str
     album: AlbumObject
 
 
-class TrackAlbum(BaseModel):
+class TrackAlbum(SpotifyModel):
     album_type: str
     total_tracks: int
     available_markets: List[str] | None = None
@@ -167,7 +173,7 @@ class TrackAlbum(BaseModel):
     artists: List[SimplifiedArtistObject]
 
 
-class Track(BaseModel):
+class Track(SpotifyModel):
     album: TrackAlbum
     artists: List[ArtistObject]
     available_markets: List[str] | None = None
@@ -189,14 +195,14 @@ class Track(BaseModel):
     is_local: bool
 
 
-class BrowseCategory(BaseModel):
+class BrowseCategory(SpotifyModel):
     href: str
     icons: List[ImageObject]
     id: str
     name: str
 
 
-class PlaylistOwner(BaseModel):
+class PlaylistOwner(SpotifyModel):
     external_urls: ExternalUrls
     followers: Followers | None = None
     href: str
@@ -206,7 +212,7 @@ class PlaylistOwner(BaseModel):
     display_name: str | None = None
 
 
-class PlaylistTrackAddedBy(BaseModel):
+class PlaylistTrackAddedBy(SpotifyModel):
     external_urls: ExternalUrls
     followers: Followers | None = None
     href: str
@@ -215,14 +221,14 @@ class PlaylistTrackAddedBy(BaseModel):
     uri: str
 
 
-class PlaylistTrackObject(BaseModel):
+class PlaylistTrackObject(SpotifyModel):
     added_at: str
     added_by: PlaylistTrackAddedBy
     is_local: bool
     track: Track
 
 
-class PlaylistTracks(BaseModel):
+class PlaylistTracks(SpotifyModel):
     href: str
     limit: int
     next: str | None = None
@@ -232,7 +238,7 @@ class PlaylistTracks(BaseModel):
     items: List[PlaylistTrackObject]
 
 
-class Playlist(BaseModel):
+class Playlist(SpotifyModel):
     collaborative: bool | None = None
     description: str | None = None
     external_urls: ExternalUrls
@@ -249,12 +255,12 @@ class Playlist(BaseModel):
     uri: str
 
 
-class SimplifiedPlaylistTrack(BaseModel):
+class SimplifiedPlaylistTrack(SpotifyModel):
     href: str
     total: int
 
 
-class SimplifiedPlaylistObject(BaseModel):
+class SimplifiedPlaylistObject(SpotifyModel):
     collaborative: bool | None = None
     description: str | None = None
     external_urls: ExternalUrls
@@ -272,12 +278,12 @@ class SimplifiedPlaylistObject(BaseModel):
     tracks: SimplifiedPlaylistTrack
 
 
-class SavedTrackObject(BaseModel):
+class SavedTrackObject(SpotifyModel):
     added_at: str
     track: Track
 
 
-class AudioFeaturesObject(BaseModel):
+class AudioFeaturesObject(SpotifyModel):
     acousticness: float
     analysis_url: str
     danceability: float
@@ -298,19 +304,19 @@ class AudioFeaturesObject(BaseModel):
     valence: float
 
 
-class AudioAnalysisBars(BaseModel):
+class AudioAnalysisBars(SpotifyModel):
     start: float
     duration: float
     confidence: float
 
 
-class AudioAnalysisBeats(BaseModel):
+class AudioAnalysisBeats(SpotifyModel):
     start: float
     duration: float
     confidence: float
 
 
-class AudioAnalysisSections(BaseModel):
+class AudioAnalysisSections(SpotifyModel):
     start: float
     duration: float
     confidence: float
@@ -325,7 +331,7 @@ class AudioAnalysisSections(BaseModel):
     time_signature_confidence: float
 
 
-class AudioAnalysisSegments(BaseModel):
+class AudioAnalysisSegments(SpotifyModel):
     start: float
     duration: float
     confidence: float
@@ -337,13 +343,13 @@ class AudioAnalysisSegments(BaseModel):
     timbre: List[float]
 
 
-class AudioAnalysisTatums(BaseModel):
+class AudioAnalysisTatums(SpotifyModel):
     start: float
     duration: float
     confidence: float
 
 
-class AudioAnalysisMeta(BaseModel):
+class AudioAnalysisMeta(SpotifyModel):
     analyzer_version: str
     platform: str
     detailed_status: str
@@ -353,7 +359,7 @@ class AudioAnalysisMeta(BaseModel):
     input_process: str
 
 
-class AudioAnalysisTrack(BaseModel):
+class AudioAnalysisTrack(SpotifyModel):
     num_samples: int
     duration: float
     sample_md5: str | None = None
@@ -381,7 +387,7 @@ class AudioAnalysisTrack(BaseModel):
     rhythm_version: int
 
 
-class AudioAnalysisObject(BaseModel):
+class AudioAnalysisObject(SpotifyModel):
     meta: AudioAnalysisMeta
     track: AudioAnalysisTrack
     bars: List[AudioAnalysisBars]
@@ -391,7 +397,7 @@ class AudioAnalysisObject(BaseModel):
     tatums: List[AudioAnalysisTatums]
 
 
-class RecommendationSeedObject(BaseModel):
+class RecommendationSeedObject(SpotifyModel):
     afterFilteringSize: int
     afterRelinkingSize: int
     href: str
@@ -400,17 +406,17 @@ class RecommendationSeedObject(BaseModel):
     type: str
 
 
-class Recommendations(BaseModel):
+class Recommendations(SpotifyModel):
     seeds: List[RecommendationSeedObject]
     tracks: List[Track]
 
 
-class ExplicitContent(BaseModel):
+class ExplicitContent(SpotifyModel):
     filter_enabled: bool
     filter_locked: bool
 
 
-class User(BaseModel):
+class User(SpotifyModel):
     display_name: str
     external_urls: ExternalUrls
     followers: Followers
@@ -421,7 +427,7 @@ class User(BaseModel):
     uri: str
 
 
-class CurrentUser(BaseModel):
+class CurrentUser(SpotifyModel):
     display_name: str
     external_urls: ExternalUrls
     followers: Followers
@@ -0,0 +1,60 @@
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_ISRC_SEPARATORS = re.compile(r"[^A-Za-z0-9]")
+_ISRC = re.compile(r"^[A-Z]{2}[A-Z0-9]{3}\d{7}$")
+
+# Decorations that don't change the recording: "(Remastered 2011)", "[feat. X]",
+# "- 2009 Remaster", "(Single Version)" and similar.
+_BRACKETED_DECORATION = re.compile(
+    r"\s*[\(\[][^\)\]]*\b(?:remaster(?:ed)?|feat\.?|ft\.?|featuring|mono|stereo"
+    r"|single version|album version)\b[^\)\]]*[\)\]]",
+    re.IGNORECASE,
+)
+_DASH_DECORATION = re.compile(
+    r"\s+-\s+[^-]*\b(?:remaster(?:ed)?|mono|stereo|single version|album version)\b.*$",
+    re.IGNORECASE,
+)
+
+
+def fold_diacritics(text: str) -> str:
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def normalize_text(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    text = fold_diacritics(text).casefold()
+    text = _NON_WORD.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def normalize_title(title: Optional[str]) -> str:
+    if not title:
+        return ""
+    title = _BRACKETED_DECORATION.sub("", title)
+    title = _DASH_DECORATION.sub("", title)
+    return normalize_text(title)
+
+
+def normalize_isrc(isrc: Optional[str]) -> Optional[str]:
+    if not isrc:
+        return None
+    isrc = _ISRC_SEPARATORS.sub("", isrc).upper()
+    return isrc if _ISRC.match(isrc) else None
+
+
+def fuzzy_track_key(
+    title: Optional[str], artists: Iterable[Optional[str]]
+) -> Optional[str]:
+    normalized_title = normalize_title(title)
+    primary_artist = next((normalize_text(a) for a in artists if a), "")
+    if not normalized_title or not primary_artist:
+        return None
+    return f"{primary_artist}\x1f{normalized_title}"
@@ -0,0 +1,174 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from rebel_rhythms.normalization import fuzzy_track_key, normalize_isrc
+from rebel_rhythms.validators import ContentType, validate_and_extract_single_id
+
+DEDUPE_FIELDS = (
+    "items(is_local,track(id,uri,name,external_ids(isrc),artists(name),"
+    "linked_from(uri))),next"
+)
+
+
+def identity_keys(
+    track_id: Optional[str],
+    uri: Optional[str],
+    isrc: Optional[str],
+    name: Optional[str],
+    artists: Iterable[Optional[str]],
+    fuzzy: bool = True,
+) -> List[str]:
+    keys = []
+
+    isrc = normalize_isrc(isrc)
+    if isrc:
+        keys.append(f"isrc:{isrc}")
+
+    if track_id:
+        keys.append(f"id:{track_id}")
+    elif uri:
+        # Local files have no ID, their URI is the only stable identity.
+        keys.append(f"uri:{uri}")
+
+    if fuzzy:
+        fuzzy_key = fuzzy_track_key(name, artists)
+        if fuzzy_key:
+            keys.append(f"fuzzy:{fuzzy_key}")
+
+    return keys
+
+
+def track_identity_keys(track: dict, fuzzy: bool = True) -> List[str]:
+    return identity_keys(
+        track.get("id"),
+        track.get("uri"),
+        (track.get("external_ids") or {}).get("isrc"),
+        track.get("name"),
+        [artist.get("name") for artist in track.get("artists") or []],
+        fuzzy,
+    )
+
+
+def playlist_item_uri(track: dict) -> Optional[str]:
+    # With track relinking the playlist still references the original URI.
+    linked_from = track.get("linked_from") or {}
+    return linked_from.get("uri") or track.get("uri")
+
+
+class DuplicateIndex:
+    """Set of identity keys (ISRC, track ID, fuzzy title/artist) seen so far.
+
+    A single index can be shared between several playlists so that tracks are
+    deduplicated across all of them; memory grows with unique keys only.
+
+    The fuzzy title/artist key only marks a duplicate when the ISRCs don't
+    conflict: two tracks that both carry an ISRC, and different ones, are
+    different recordings ("Intro" on two albums) even if their names match.
+    """
+
+    def __init__(self, fuzzy: bool = True):
+        self.fuzzy = fuzzy
+        self._keys: Set[str] = set()
+        # Fuzzy key -> ISRCs of the tracks seen with it (None for no ISRC).
+        self._fuzzy: Dict[str, Set[Optional[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._fuzzy)
+
+    def __contains__(self, track: dict) -> bool:
+        return self._is_duplicate(track_identity_keys(track, self.fuzzy))
+
+    def _is_duplicate(self, keys: List[str]) -> bool:
+        isrc = next((key for key in keys if key.startswith("isrc:")), None)
+        for key in keys:
+            if not key.startswith("fuzzy:"):
+                if key in self._keys:
+                    return True
+                continue
+            seen = self._fuzzy.get(key)
+            if seen and (isrc is None or None in seen or isrc in seen):
+                return True
+        return False
+
+    def add(self, track: dict) -> bool:
+        """Index the track and return True if it duplicates an earlier one."""
+        return self.add_keys(track_identity_keys(track, self.fuzzy))
+
+    def add_keys(self, keys: List[str]) -> bool:
+        is_duplicate = self._is_duplicate(keys)
+        isrc = next((key for key in keys if key.startswith("isrc:")), None)
+        for key in keys:
+            if key.startswith("fuzzy:"):
+                self._fuzzy.setdefault(key, set()).add(isrc)
+            else:
+                self._keys.add(key)
+        return is_duplicate
+
+
+class DedupeReport(BaseModel):
+    playlist_id: str
+    snapshot_id: str
+    scanned: int
+    removed: int
+    duplicates: Dict[str, List[int]]
+    dry_run: bool = False
+
+
+class PlaylistDeduplicator:
+    def __init__(
+        self,
+        client,
+        index: Optional[DuplicateIndex] = None,
+        fuzzy: bool = True,
+        dry_run: bool = False,
+    ):
+        self.client = client
+        self.index = index if index is not None else DuplicateIndex(fuzzy=fuzzy)
+        self.dry_run = dry_run
+
+    def find_duplicates(self, playlist: str) -> Tuple[str, int, List[Tuple[str, int]]]:
+        snapshot_id, items = self.client.get_raw_playlist_snapshot(
+            playlist, fields=DEDUPE_FIELDS
+        )
+        duplicates: List[Tuple[str, int]] = []
+        scanned = 0
+
+        for position, item in enumerate(items):
+            scanned += 1
+            track = item.get("track")
+            if not track:
+                continue
+            uri = playlist_item_uri(track)
+            if self.index.add(track) and uri:
+                duplicates.append((uri, position))
+
+        return snapshot_id, scanned, duplicates
+
+    def dedupe(self, playlist: str) -> DedupeReport:
+        playlist_id = validate_and_extract_single_id(playlist, ContentType.PLAYLIST)
+        snapshot_id, scanned, duplicates = self.find_duplicates(playlist_id)
+
+        if duplicates and not self.dry_run:
+            snapshot_id = self.client.remove_playlist_items_at_positions(
+                playlist_id, duplicates, snapshot_id
+            )
+
+        positions_by_uri = defaultdict(list)
+        for uri, position in duplicates:
+            positions_by_uri[uri].append(position)
+
+        return DedupeReport(
+            playlist_id=playlist_id,
+            snapshot_id=snapshot_id,
+            scanned=scanned,
+            removed=len(duplicates),
+            duplicates=dict(positions_by_uri),
+            dry_run=self.dry_run,
+        )
+
+    def dedupe_many(self, playlists: Iterable[str]) -> List[DedupeReport]:
+        # Earlier playlists win: a track kept in the first playlist is removed
+        # from every later one.
+        return [self.dedupe(playlist) for playlist in playlists]
@@ -0,0 +1,234 @@
+import random
+import re
+from typing import Any, Callable, List, Optional, Sequence, Union, cast
+
+from pydantic import BaseModel
+
+from rebel_rhythms.playlist_dedupe import (
+    DuplicateIndex,
+    identity_keys,
+    playlist_item_uri,
+)
+from rebel_rhythms.playlist_sync import (
+    PlaylistSynchronizer,
+    SyncPlan,
+    build_sync_plan,
+    plan_playlist_changes,
+)
+from rebel_rhythms.validators import ContentType, validate_and_extract_single_id
+
+MAINTENANCE_FIELDS = (
+    "items(added_at,is_local,track(id,uri,name,duration_ms,popularity,is_playable,"
+    "external_ids(isrc),artists(name),album(name,release_date),linked_from(uri))),next"
+)
+
+_TRACK_URI = re.compile(r"^spotify:track:[a-zA-Z0-9]{22}$")
+
+
+class PlaylistEntry:
+    """Compact, slot-based view of one playlist item."""
+
+    __slots__ = (
+        "position",
+        "uri",
+        "track_id",
+        "isrc",
+        "name",
+        "artists",
+        "album",
+        "release_date",
+        "duration_ms",
+        "popularity",
+        "is_playable",
+        "is_local",
+        "added_at",
+    )
+
+    def __init__(self, position: int, item: dict):
+        track = item.get("track") or {}
+        album = track.get("album") or {}
+        self.position = position
+        self.uri = playlist_item_uri(track) if track else None
+        self.track_id = track.get("id")
+        self.isrc = (track.get("external_ids") or {}).get("isrc")
+        self.name = track.get("name")
+        self.artists = tuple(a.get("name") for a in track.get("artists") or [])
+        self.album = album.get("name")
+        self.release_date = album.get("release_date")
+        self.duration_ms = track.get("duration_ms")
+        self.popularity = track.get("popularity")
+        self.is_playable = track.get("is_playable")
+        self.is_local = bool(item.get("is_local") or track.get("is_local"))
+        self.added_at = item.get("added_at")
+
+    def identity_keys(self, fuzzy: bool = True) -> List[str]:
+        return identity_keys(
+            self.track_id, self.uri, self.isrc, self.name, self.artists, fuzzy
+        )
+
+
+MaintenancePass = Callable[[List[PlaylistEntry]], List[PlaylistEntry]]
+
+
+class RemoveUnplayable:
+    def __call__(self, entries: List[PlaylistEntry]) -> List[PlaylistEntry]:
+        # Unknown playability (no market) and local files are left alone.
+        return [
+            entry
+            for entry in entries
+            if entry.uri is not None
+            and (entry.is_local or entry.is_playable is not False)
+        ]
+
+
+class Deduplicate:
+    def __init__(self, index: Optional[DuplicateIndex] = None, fuzzy: bool = True):
+        self.index = index if index is not None else DuplicateIndex(fuzzy=fuzzy)
+
+    def __call__(self, entries: List[PlaylistEntry]) -> List[PlaylistEntry]:
+        return [
+            entry
+            for entry in entries
+            if not self.index.add_keys(entry.identity_keys(self.index.fuzzy))
+        ]
+
+
+class SortBy:
+    def __init__(
+        self, key: Union[str, Callable[[PlaylistEntry], Any]], reverse: bool = False
+    ):
+        if isinstance(key, str):
+            if key not in PlaylistEntry.__slots__:
+                raise ValueError(f"Invalid sort key: {key}")
+            attribute = key
+            key = lambda entry: (
+                getattr(entry, attribute) is None,
+                getattr(entry, attribute),
+            )
+        self.key = key
+        self.reverse = reverse
+
+    def __call__(self, entries: List[PlaylistEntry]) -> List[PlaylistEntry]:
+        return sorted(entries, key=self.key, reverse=self.reverse)
+
+
+class Shuffle:
+    def __init__(self, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+
+    def __call__(self, entries: List[PlaylistEntry]) -> List[PlaylistEntry]:
+        entries = list(entries)
+        self.random.shuffle(entries)
+        return entries
+
+
+class TrimToLength:
+    def __init__(self, max_length: int, keep_newest: bool = False):
+        if max_length < 0:
+            raise ValueError("Invalid max_length, must be positive.")
+        self.max_length = max_length
+        self.keep_newest = keep_newest
+
+    def __call__(self, entries: List[PlaylistEntry]) -> List[PlaylistEntry]:
+        if len(entries) <= self.max_length:
+            return entries
+        if not self.keep_newest:
+            return entries[: self.max_length]
+        newest = sorted(entries, key=lambda e: e.added_at or "", reverse=True)
+        keep = {id(entry) for entry in newest[: self.max_length]}
+        return [entry for entry in entries if id(entry) in keep]
+
+
+def _plan_around_unavailable(
+    playlist_id: str,
+    snapshot_id: str,
+    entries: List[PlaylistEntry],
+    kept: List[PlaylistEntry],
+    dry_run: bool,
+) -> SyncPlan:
+    """Plan with moves and removals only, leaving unavailable items in place.
+
+    Unavailable items have no URI, so they can be moved by position but
+    not removed, and replacing the playlist would drop them.
+    """
+    kept_ids = {id(entry) for entry in kept}
+    if any(entry.uri is None and id(entry) not in kept_ids for entry in entries):
+        raise ValueError("Playlist has unavailable items and can't be replaced.")
+
+    def key(entry: PlaylistEntry) -> str:
+        return entry.uri or f"unavailable:{entry.position}"
+
+    changes = plan_playlist_changes(
+        [key(entry) for entry in entries], [key(entry) for entry in kept]
+    )
+    assert changes is not None
+    removals, moves, _ = changes
+    return SyncPlan(
+        playlist_id=playlist_id,
+        snapshot_id=snapshot_id,
+        removals=removals,
+        moves=moves,
+        dry_run=dry_run,
+    )
+
+
+class MaintenanceReport(BaseModel):
+    playlist_id: str
+    scanned: int
+    kept: int
+    plan: SyncPlan
+
+    @property
+    def removed(self) -> int:
+        return self.scanned - self.kept
+
+
+class PlaylistMaintenance:
+    """Runs several cleanup passes over one read and applies one merged write plan."""
+
+    def __init__(
+        self,
+        client,
+        passes: Sequence[MaintenancePass],
+        allow_replace: bool = True,
+    ):
+        self.client = client
+        self.passes = list(passes)
+        # Replacing is cheapest for big reorders but resets added_at/added_by.
+        self.allow_replace = allow_replace
+
+    def run(self, playlist: str, dry_run: bool = False) -> MaintenanceReport:
+        playlist_id = validate_and_extract_single_id(playlist, ContentType.PLAYLIST)
+        snapshot_id, items = self.client.get_raw_playlist_snapshot(
+            playlist_id, fields=MAINTENANCE_FIELDS
+        )
+        entries = [PlaylistEntry(position, item) for position, item in enumerate(items)]
+        current = [entry.uri for entry in entries]
+
+        kept = entries
+        for maintenance_pass in self.passes:
+            kept = maintenance_pass(kept)
+
+        desired = [entry.uri for entry in kept]
+        if None in desired:
+            plan = _plan_around_unavailable(
+                playlist_id, snapshot_id, entries, kept, dry_run
+            )
+        else:
+            allow_replace = self.allow_replace and all(
+                _TRACK_URI.match(uri) for uri in cast(List[str], desired)
+            )
+            plan = build_sync_plan(
+                playlist_id,
+                snapshot_id,
+                current,
+                cast(List[str], desired),
+                allow_replace=allow_replace,
+                dry_run=dry_run,
+            )
+        if not dry_run and not plan.is_noop:
+            plan = PlaylistSynchronizer(self.client).apply(plan)
+
+        return MaintenanceReport(
+            playlist_id=playlist_id, scanned=len(entries), kept=len(kept), plan=plan
+        )
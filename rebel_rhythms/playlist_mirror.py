@@ -0,0 +1,100 @@
+from typing import Any, Dict, Generator, Iterable, List, Optional, Union
+
+from pydantic import BaseModel
+
+from rebel_rhythms.models import PlaylistTrackObject, SimplifiedPlaylistObject
+from rebel_rhythms.state_store import MemoryStateStore, StateStore
+from rebel_rhythms.validators import ContentType, validate_and_extract_single_id
+
+
+class MirroredPlaylist(BaseModel):
+    playlist_id: str
+    snapshot_id: str
+    items: List[Dict[str, Any]]
+    refreshed: bool = False
+
+
+class PlaylistMirror:
+    """Local copy of playlist items keyed by `snapshot_id`.
+
+    A sync costs one metadata request (zero when the snapshot is already known
+    from a playlist listing) and only pages through items when the snapshot
+    changed.
+    """
+
+    key_prefix = "playlist:"
+
+    def __init__(
+        self,
+        client,
+        store: Optional[StateStore] = None,
+        fields: Optional[str] = None,
+    ):
+        self.client = client
+        self.store = store if store is not None else MemoryStateStore()
+        self.fields = fields
+
+    def _key(self, playlist_id: str) -> str:
+        return f"{self.key_prefix}{playlist_id}"
+
+    def get(self, playlist: str) -> Optional[MirroredPlaylist]:
+        playlist_id = validate_and_extract_single_id(playlist, ContentType.PLAYLIST)
+        state = self.store.get(self._key(playlist_id))
+        if state is None or state.get("fields") != self.fields:
+            return None
+        return MirroredPlaylist(
+            playlist_id=playlist_id,
+            snapshot_id=state["snapshot_id"],
+            items=state["items"],
+        )
+
+    def sync(
+        self, playlist: str, snapshot_id: Optional[str] = None
+    ) -> MirroredPlaylist:
+        playlist_id = validate_and_extract_single_id(playlist, ContentType.PLAYLIST)
+        if snapshot_id is None:
+            snapshot_id = self.client.get_playlist_snapshot_id(playlist_id)
+
+        mirrored = self.get(playlist_id)
+        fresh = mirrored is not None and mirrored.snapshot_id == snapshot_id
+        self.client.request_manager.notify_cache(
+            f"/v1/playlists/{playlist_id}/tracks", fresh
+        )
+        if mirrored is not None and fresh:
+            return mirrored
+
+        items = list(
+            self.client.get_raw_playlist_items(playlist_id, fields=self.fields)
+        )
+        self.store.set(
+            self._key(playlist_id),
+            {"snapshot_id": snapshot_id, "fields": self.fields, "items": items},
+        )
+        return MirroredPlaylist(
+            playlist_id=playlist_id,
+            snapshot_id=snapshot_id,
+            items=items,
+            refreshed=True,
+        )
+
+    def sync_many(
+        self, playlists: Iterable[Union[str, SimplifiedPlaylistObject]]
+    ) -> Generator[MirroredPlaylist, None, None]:
+        for playlist in playlists:
+            if isinstance(playlist, SimplifiedPlaylistObject):
+                yield self.sync(playlist.id, snapshot_id=playlist.snapshot_id)
+            else:
+                yield self.sync(playlist)
+
+    def sync_current_user_playlists(self) -> Generator[MirroredPlaylist, None, None]:
+        # The listing carries every playlist's snapshot_id, 50 per request.
+        return self.sync_many(self.client.get_current_user_playlists())
+
+    def forget(self, playlist: str) -> None:
+        playlist_id = validate_and_extract_single_id(playlist, ContentType.PLAYLIST)
+        self.store.delete(self._key(playlist_id))
+
+    def tracks(self, playlist: str) -> Generator[PlaylistTrackObject, None, None]:
+        if self.fields is not None:
+            raise ValueError("Projected mirrors can't be converted to models.")
+        return (PlaylistTrackObject(**item) for item in self.sync(playlist).items)
@@ -0,0 +1,324 @@
+from bisect import bisect_left
+from collections import defaultdict, deque
+from typing import Dict, List, Optional, Sequence, Tuple, cast
+
+from pydantic import BaseModel
+
+from rebel_rhythms.playlist_dedupe import playlist_item_uri
+from rebel_rhythms.validators import (
+    ContentType,
+    validate_and_extract_single_id,
+    validate_track_uris,
+)
+
+SYNC_FIELDS = "items(track(uri,linked_from(uri))),next"
+BATCH_SIZE = 100
+
+
+class PlaylistMove(BaseModel):
+    range_start: int
+    insert_before: int
+    range_length: int = 1
+
+
+class PlaylistInsert(BaseModel):
+    position: int
+    uris: List[str]
+
+
+class SyncPlan(BaseModel):
+    playlist_id: str
+    snapshot_id: str
+    removals: List[Tuple[str, int]] = []
+    moves: List[PlaylistMove] = []
+    inserts: List[PlaylistInsert] = []
+    replace_with: Optional[List[str]] = None
+    dry_run: bool = False
+    # Set by `apply()` on a replace: how many of `replace_with` are in the
+    # playlist, and why it stopped short. Apply the result again to resume.
+    replaced: int = 0
+    error: Optional[str] = None
+
+    @property
+    def is_noop(self) -> bool:
+        return (
+            self.replace_with is None
+            and not self.removals
+            and not self.moves
+            and not self.inserts
+        )
+
+    @property
+    def complete(self) -> bool:
+        return self.replace_with is None or (
+            self.error is None and self.replaced == len(self.replace_with)
+        )
+
+    @property
+    def request_count(self) -> int:
+        if self.replace_with is not None:
+            return replace_request_count(len(self.replace_with))
+        removal_batches = -(-len(self.removals) // BATCH_SIZE)
+        return removal_batches + len(self.moves) + len(self.inserts)
+
+
+def replace_request_count(size: int) -> int:
+    return max(1, -(-size // BATCH_SIZE))
+
+
+def _longest_increasing_subsequence(values: Sequence[int]) -> set:
+    tails: List[int] = []
+    tail_indices: List[int] = []
+    parents = [-1] * len(values)
+
+    for i, value in enumerate(values):
+        pos = bisect_left(tails, value)
+        if pos == len(tails):
+            tails.append(value)
+            tail_indices.append(i)
+        else:
+            tails[pos] = value
+            tail_indices[pos] = i
+        parents[i] = tail_indices[pos - 1] if pos else -1
+
+    result = set()
+    i = tail_indices[-1] if tail_indices else -1
+    while i != -1:
+        result.add(values[i])
+        i = parents[i]
+    return result
+
+
+def _plan_moves(
+    ranks: List[int], max_moves: Optional[int] = None
+) -> Optional[List[PlaylistMove]]:
+    """Moves that sort `ranks` (a permutation of 0..n-1), None if over `max_moves`."""
+    stable = _longest_increasing_subsequence(ranks)
+    state = list(ranks)
+    placed = sorted(stable)
+    moves = []
+
+    rank = 0
+    while rank < len(state):
+        if rank in stable:
+            rank += 1
+            continue
+
+        start = state.index(rank)
+        length = 1
+        # Items that are adjacent both now and in the target move as one range.
+        while (
+            start + length < len(state)
+            and state[start + length] == rank + length
+            and rank + length not in stable
+        ):
+            length += 1
+
+        successor = bisect_left(placed, rank + length)
+        if successor < len(placed):
+            insert_before = state.index(placed[successor])
+        else:
+            insert_before = len(state)
+
+        if insert_before not in (start, start + length):
+            moves.append(
+                PlaylistMove(
+                    range_start=start, insert_before=insert_before, range_length=length
+                )
+            )
+            if max_moves is not None and len(moves) > max_moves:
+                return None
+            block = state[start : start + length]
+            del state[start : start + length]
+            target = insert_before - length if insert_before > start else insert_before
+            state[target:target] = block
+
+        for moved in range(rank, rank + length):
+            placed.insert(bisect_left(placed, moved), moved)
+        rank += length
+
+    return moves
+
+
+def _plan_inserts(desired: Sequence[str], matched: set) -> List[PlaylistInsert]:
+    inserts = []
+    run_start = None
+    for index in range(len(desired) + 1):
+        is_new = index < len(desired) and index not in matched
+        if is_new and run_start is None:
+            run_start = index
+        elif not is_new and run_start is not None:
+            for start in range(run_start, index, BATCH_SIZE):
+                end = min(start + BATCH_SIZE, index)
+                inserts.append(
+                    PlaylistInsert(position=start, uris=list(desired[start:end]))
+                )
+            run_start = None
+    return inserts
+
+
+def plan_playlist_changes(
+    current: Sequence[str],
+    desired: Sequence[str],
+    max_requests: Optional[int] = None,
+) -> Optional[Tuple[List[Tuple[str, int]], List[PlaylistMove], List[PlaylistInsert]]]:
+    """Removals, moves and inserts turning `current` into `desired`.
+
+    Returns None when the diff would take more than `max_requests` write calls.
+    """
+    desired_positions: Dict[str, deque] = defaultdict(deque)
+    for index, uri in enumerate(desired):
+        desired_positions[uri].append(index)
+
+    removals = []
+    kept_targets = []
+    for position, uri in enumerate(current):
+        if desired_positions.get(uri):
+            kept_targets.append(desired_positions[uri].popleft())
+        else:
+            removals.append((uri, position))
+
+    inserts = _plan_inserts(desired, set(kept_targets))
+
+    max_moves = None
+    if max_requests is not None:
+        max_moves = max_requests - len(inserts) - -(-len(removals) // BATCH_SIZE)
+        if max_moves < 0:
+            return None
+
+    order = sorted(range(len(kept_targets)), key=kept_targets.__getitem__)
+    ranks = [0] * len(kept_targets)
+    for rank, index in enumerate(order):
+        ranks[index] = rank
+    moves = _plan_moves(ranks, max_moves)
+    if moves is None:
+        return None
+
+    return removals, moves, inserts
+
+
+def build_sync_plan(
+    playlist_id: str,
+    snapshot_id: str,
+    current: Sequence[Optional[str]],
+    desired: List[str],
+    allow_replace: bool = True,
+    dry_run: bool = False,
+) -> SyncPlan:
+    plan = SyncPlan(playlist_id=playlist_id, snapshot_id=snapshot_id, dry_run=dry_run)
+    if None in current:
+        # Unavailable entries can't be addressed individually.
+        if not allow_replace:
+            raise ValueError("Playlist has unavailable items and can't be replaced.")
+        plan.replace_with = desired
+        return plan
+
+    # No None entries past this point.
+    changes = plan_playlist_changes(
+        cast(Sequence[str], current),
+        desired,
+        max_requests=replace_request_count(len(desired)) if allow_replace else None,
+    )
+    if changes is None:
+        plan.replace_with = desired
+    else:
+        plan.removals, plan.moves, plan.inserts = changes
+    return plan
+
+
+class PlaylistSynchronizer:
+    def __init__(self, client):
+        self.client = client
+
+    def plan(
+        self, playlist: str, desired_uris: List[str], dry_run: bool = False
+    ) -> SyncPlan:
+        playlist_id = validate_and_extract_single_id(playlist, ContentType.PLAYLIST)
+        desired = validate_track_uris(list(desired_uris)) if desired_uris else []
+
+        snapshot_id, items = self.client.get_raw_playlist_snapshot(
+            playlist_id, fields=SYNC_FIELDS
+        )
+        current = [
+            playlist_item_uri(item["track"]) if item.get("track") else None
+            for item in items
+        ]
+        return build_sync_plan(
+            playlist_id, snapshot_id, current, desired, dry_run=dry_run
+        )
+
+    def apply(self, plan: SyncPlan) -> SyncPlan:
+        playlist_id = plan.playlist_id
+        snapshot_id = plan.snapshot_id
+
+        if plan.replace_with is not None:
+            return self._replace(plan)
+
+        if plan.removals:
+            snapshot_id = self.client.remove_playlist_items_at_positions(
+                playlist_id, plan.removals, snapshot_id
+            )
+
+        for move in plan.moves:
+            response = self.client.reorder_playlist_items(
+                playlist_id,
+                range_start=move.range_start,
+                insert_before=move.insert_before,
+                range_length=move.range_length,
+                snapshot_id=snapshot_id,
+            )
+            snapshot_id = response.get("snapshot_id", snapshot_id)
+
+        for insert in plan.inserts:
+            response = self.client.add_tracks_to_playlist(
+                playlist_id, insert.uris, position=insert.position
+            )
+            snapshot_id = response.get("snapshot_id", snapshot_id)
+
+        return plan.model_copy(update={"snapshot_id": snapshot_id})
+
+    def _replace(self, plan: SyncPlan) -> SyncPlan:
+        """PUT the first 100 tracks, then append the rest 100 at a time.
+
+        Past 100 tracks this takes several requests, and the playlist is
+        truncated until the last one succeeds. A failure is returned in the
+        plan (`error`, `replaced`) rather than raised, so the caller can
+        apply the returned plan again to continue where it stopped.
+        """
+        uris = plan.replace_with or []
+        snapshot_id = plan.snapshot_id
+        written = plan.replaced
+        try:
+            while written == 0 or written < len(uris):
+                batch = uris[written : written + BATCH_SIZE]
+                if written == 0:
+                    response = self.client.replace_playlist_items(
+                        plan.playlist_id, batch
+                    )
+                else:
+                    response = self.client.add_tracks_to_playlist(
+                        plan.playlist_id, batch
+                    )
+                snapshot_id = response.get("snapshot_id", snapshot_id)
+                written += len(batch)
+                if not batch:
+                    break
+        except Exception as e:
+            return plan.model_copy(
+                update={
+                    "snapshot_id": snapshot_id,
+                    "replaced": written,
+                    "error": str(e) or type(e).__name__,
+                }
+            )
+        return plan.model_copy(
+            update={"snapshot_id": snapshot_id, "replaced": written, "error": None}
+        )
+
+    def sync(
+        self, playlist: str, desired_uris: List[str], dry_run: bool = False
+    ) -> SyncPlan:
+        plan = self.plan(playlist, desired_uris, dry_run=dry_run)
+        if dry_run or plan.is_noop:
+            return plan
+        return self.apply(plan)
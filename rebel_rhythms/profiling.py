@@ -0,0 +1,297 @@
+"""Opt-in call-tree profiler for `SpotifyClient`."""
+
+import inspect
+import random
+import threading
+import time
+from collections.abc import Generator
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Transport sends, rate limiting and retry back-off, JSON decoding, pydantic
+# construction and the ID/URI validators; the rest of a call is its "own" time.
+CATEGORIES = ("network", "wait", "decode", "model", "validation")
+
+_SKIP = object()
+_state = threading.local()
+# class -> (its own __init__ before patching, number of users)
+_patched_inits: Dict[type, Tuple[Optional[Callable], int]] = {}
+_patch_lock = threading.Lock()
+
+
+class ProfileNode:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.total = 0.0
+        self.times: Dict[str, float] = dict.fromkeys(CATEGORIES, 0.0)
+        self.counts: Dict[str, int] = dict.fromkeys(CATEGORIES, 0)
+        self.children: Dict[str, "ProfileNode"] = {}
+
+    def child(self, name: str) -> "ProfileNode":
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = ProfileNode(name)
+        return node
+
+    @property
+    def own(self) -> float:
+        children = sum(child.total for child in self.children.values())
+        return max(0.0, self.total - children - sum(self.times.values()))
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "total": self.total,
+            "own": self.own,
+            "categories": {
+                category: {"time": self.times[category], "count": self.counts[category]}
+                for category in CATEGORIES
+            },
+            "children": [
+                child.to_dict()
+                for child in sorted(self.children.values(), key=lambda c: -c.total)
+            ],
+        }
+
+
+def _stack() -> List:
+    stack = getattr(_state, "stack", None)
+    if stack is None:
+        stack = _state.stack = []
+    return stack
+
+
+def _current():
+    """(profiler, node) for the call being profiled on this thread, if any."""
+    stack = getattr(_state, "stack", None)
+    if not stack or stack[-1] is _SKIP:
+        return None
+    return stack[-1]
+
+
+def _measure(category: str, func: Callable, *args, **kwargs) -> Any:
+    """Call `func`, charging its time to the current node unless a category
+    is already being timed."""
+    current = _current()
+    if current is None or getattr(_state, "timing", False):
+        return func(*args, **kwargs)
+    profiler, node = current
+    _state.timing = True
+    started = profiler.clock()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _state.timing = False
+        profiler._record(node, category, profiler.clock() - started)
+
+
+def timed(category: str) -> Callable[[Callable], Callable]:
+    """Decorator charging the function's time to `category` during profiled calls."""
+
+    def decorate(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not getattr(_state, "stack", None):
+                return func(*args, **kwargs)
+            return _measure(category, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def time_init(cls: type, category: str) -> None:
+    """Charge construction of `cls` (and subclasses) to `category` until the
+    matching `untime_init(cls)`. Calls nest, so profiled clients can share it."""
+    with _patch_lock:
+        original, users = _patched_inits.get(cls, (cls.__dict__.get("__init__"), 0))
+        if not users:
+            setattr(cls, "__init__", timed(category)(getattr(cls, "__init__")))
+        _patched_inits[cls] = (original, users + 1)
+
+
+def untime_init(cls: type) -> None:
+    with _patch_lock:
+        if cls not in _patched_inits:
+            return
+        original, users = _patched_inits.pop(cls)
+        if users > 1:
+            _patched_inits[cls] = (original, users - 1)
+        elif original is None:
+            delattr(cls, "__init__")
+        else:
+            setattr(cls, "__init__", original)
+
+
+class _ProfiledGenerator(Generator):
+    """A generator returned by a profiled call; each resume is charged to it.
+
+    `send`, `throw` and `close` are forwarded, so closing the wrapper runs
+    the inner generator's cleanup.
+    """
+
+    def __init__(self, profiler: "CallProfiler", node: "ProfileNode", generator):
+        self._profiler = profiler
+        self._node = node
+        self._generator = generator
+
+    def send(self, value):
+        return self._profiler._run(self._node, self._generator.send, value)
+
+    def throw(self, *args):
+        return self._profiler._run(self._node, self._generator.throw, *args)
+
+    def close(self) -> None:
+        self._profiler._run(self._node, self._generator.close)
+
+
+class CallProfiler:
+    def __init__(
+        self, sample_rate: float = 1.0, clock: Callable[[], float] = time.perf_counter
+    ):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("Invalid sample_rate, must be between 0 and 1.")
+        self.sample_rate = sample_rate
+        self.clock = clock
+        self.root = ProfileNode("<root>")
+        self._lock = threading.Lock()
+        # (client, names of the methods wrapped on it)
+        self._clients: List[Tuple[Any, List[str]]] = []
+
+    # --- attaching ------------------------------------------------------------
+
+    def attach(self, client) -> "CallProfiler":
+        client.request_manager.profiler = self
+        methods = []
+        for name, member in inspect.getmembers(type(client), inspect.isfunction):
+            if name.startswith("_") or name in (
+                "enable_profiling",
+                "disable_profiling",
+            ):
+                continue
+            setattr(
+                client,
+                name,
+                self._wrap(f"{type(client).__name__}.{name}", getattr(client, name)),
+            )
+            methods.append(name)
+
+        self._clients.append((client, methods))
+        return self
+
+    def detach(self, client=None) -> None:
+        for entry in list(self._clients):
+            attached, methods = entry
+            if client is not None and attached is not client:
+                continue
+            if attached.request_manager.profiler is self:
+                attached.request_manager.profiler = None
+            for name in methods:
+                attached.__dict__.pop(name, None)
+            self._clients.remove(entry)
+
+    # --- recording ------------------------------------------------------------
+
+    def measure(self, category: str, func: Callable, *args, **kwargs) -> Any:
+        """Call `func`, charging its time to `category` if one of this
+        profiler's calls is running on this thread."""
+        current = _current()
+        if current is None or current[0] is not self:
+            return func(*args, **kwargs)
+        return _measure(category, func, *args, **kwargs)
+
+    def _record(self, node: ProfileNode, category: str, elapsed: float) -> None:
+        with self._lock:
+            node.times[category] += elapsed
+            node.counts[category] += 1
+
+    def _run(self, node: ProfileNode, func: Callable, *args, **kwargs):
+        stack = _stack()
+        stack.append((self, node))
+        started = self.clock()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = self.clock() - started
+            stack.pop()
+            with self._lock:
+                node.total += elapsed
+
+    def _wrap(self, name: str, method: Callable) -> Callable:
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            stack = _stack()
+            if not stack:
+                if random.random() >= self.sample_rate:
+                    stack.append(_SKIP)
+                    try:
+                        return method(*args, **kwargs)
+                    finally:
+                        stack.pop()
+                parent = self.root
+            elif stack[-1] is _SKIP or stack[-1][0] is not self:
+                return method(*args, **kwargs)
+            else:
+                parent = stack[-1][1]
+
+            with self._lock:
+                node = parent.child(name)
+                node.calls += 1
+            result = self._run(node, method, *args, **kwargs)
+            if inspect.isgenerator(result):
+                return _ProfiledGenerator(self, node, result)
+            return result
+
+        return wrapper
+
+    # --- output ---------------------------------------------------------------
+
+    def reset(self) -> None:
+        with self._lock:
+            self.root = ProfileNode("<root>")
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            calls = self.root.to_dict()["children"]
+        return {
+            "sample_rate": self.sample_rate,
+            "categories": list(CATEGORIES),
+            "calls": calls,
+        }
+
+    def report(self, min_share: float = 0.0) -> str:
+        """An indented call tree with per-category times in milliseconds.
+
+        Nodes taking less than `min_share` of their top-level call are left out.
+        """
+        columns = ("calls", "total") + CATEGORIES + ("own",)
+        rows = []
+
+        def walk(node: Dict, depth: int, top_total: float):
+            if top_total and node["total"] < min_share * top_total:
+                return
+            times = [node["categories"][c]["time"] for c in CATEGORIES]
+            rows.append(
+                ("  " * depth + node["name"], str(node["calls"]))
+                + tuple(f"{t * 1000:.1f}" for t in [node["total"], *times, node["own"]])
+            )
+            for child in node["children"]:
+                walk(child, depth + 1, top_total or node["total"])
+
+        for call in self.to_dict()["calls"]:
+            walk(call, 0, 0.0)
+
+        header = ("call",) + columns
+        widths = [
+            max(len(row[i]) for row in rows + [header]) for i in range(len(header))
+        ]
+        lines = [
+            "  ".join(
+                cell.ljust(widths[i]) if i == 0 else cell.rjust(widths[i])
+                for i, cell in enumerate(row)
+            )
+            for row in [header] + rows
+        ]
+        return "\n".join(lines) + "\n(times in ms)"
@@ -0,0 +1,55 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class RateLimiter:
+    """Token bucket shared by every thread using a request manager.
+
+    With `rate=None` requests are not throttled, but a `pause()` (e.g. after a
+    429 with Retry-After) still holds back all callers until it expires.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Optional[Callable[[float], None]] = None,
+    ):
+        if rate is not None and rate <= 0:
+            raise ValueError("Invalid rate, must be positive.")
+        self.rate = rate
+        # Unused without a rate.
+        self.capacity: float = burst or (max(1.0, rate) if rate else 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a request may be sent, returning the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.rate is None:
+                        return waited
+                    self._tokens = min(
+                        self.capacity, self._tokens + (now - self._updated) * self.rate
+                    )
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    wait = (1 - self._tokens) / self.rate
+            (self._sleep or time.sleep)(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
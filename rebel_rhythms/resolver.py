@@ -0,0 +1,294 @@
+"""Resolve (artist, title, ISRC) metadata rows to Spotify tracks in bulk."""
+
+import re
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from difflib import SequenceMatcher
+from typing import Any, Dict, Generator, Iterable, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from rebel_rhythms.normalization import (
+    fuzzy_track_key,
+    normalize_isrc,
+    normalize_text,
+    normalize_title,
+)
+from rebel_rhythms.state_store import MemoryStateStore, StateStore
+
+# Weights of the title, artist and duration similarities in a candidate's score.
+TITLE_WEIGHT = 0.5
+ARTIST_WEIGHT = 0.35
+DURATION_WEIGHT = 0.15
+# Durations further apart than this score 0.
+DURATION_TOLERANCE_MS = 10000
+
+_ARTIST_SEPARATORS = re.compile(
+    r"\s*(?:,|;|&|\+|/|\bfeat\.?|\bft\.?|\bfeaturing\b|\bwith\b|\bx\b)\s*",
+    re.IGNORECASE,
+)
+
+
+class TrackQuery(BaseModel):
+    artist: Optional[str] = None
+    title: Optional[str] = None
+    isrc: Optional[str] = None
+    album: Optional[str] = None
+    duration_ms: Optional[int] = None
+
+    @property
+    def artists(self) -> List[str]:
+        if not self.artist:
+            return []
+        return [name for name in _ARTIST_SEPARATORS.split(self.artist) if name.strip()]
+
+    @property
+    def key(self) -> Optional[str]:
+        """The cache key: the ISRC if valid, else the normalized primary artist and title."""
+        isrc = normalize_isrc(self.isrc)
+        if isrc:
+            return f"isrc:{isrc}"
+        key = fuzzy_track_key(self.title, self.artists)
+        if key is None:
+            return None
+        return (
+            f"track:{key}"
+            if self.duration_ms is None
+            else f"track:{key}\x1f{self.duration_ms // 1000}"
+        )
+
+
+class TrackResolution(BaseModel):
+    index: int
+    # None when the row itself could not be turned into a query.
+    query: Optional[TrackQuery] = None
+    uri: Optional[str] = None
+    track_id: Optional[str] = None
+    name: Optional[str] = None
+    artists: List[str] = []
+    confidence: float = 0.0
+    matched_by: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+    @property
+    def resolved(self) -> bool:
+        return self.uri is not None
+
+
+TrackRow = Union[TrackQuery, Dict, Tuple, List]
+
+
+def as_query(row: TrackRow) -> TrackQuery:
+    """A `TrackQuery` from a dict, an (artist, title[, isrc]) tuple or a query."""
+    if isinstance(row, TrackQuery):
+        return row
+    if isinstance(row, dict):
+        return TrackQuery(**row)
+    return TrackQuery(**dict(zip(("artist", "title", "isrc"), row)))
+
+
+def _similarity(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def score_candidate(query: TrackQuery, track: Dict) -> float:
+    """How well a raw track dict matches `query`, from 0 to 1."""
+    title = _similarity(
+        normalize_title(query.title), normalize_title(track.get("name"))
+    )
+    candidate_artists = [
+        normalize_text(artist.get("name")) for artist in track.get("artists") or []
+    ]
+    query_artists = [normalize_text(name) for name in query.artists]
+    if query_artists and candidate_artists:
+        # Either the primary artist matches one of the candidate's, or the
+        # whole credit matches; missing guests don't sink a match.
+        artist = max(_similarity(query_artists[0], name) for name in candidate_artists)
+        joined = _similarity(
+            " ".join(sorted(query_artists)), " ".join(sorted(candidate_artists))
+        )
+        artist = max(artist, joined)
+    else:
+        artist = 0.0
+
+    weights = [(TITLE_WEIGHT, title)]
+    if query_artists:
+        weights.append((ARTIST_WEIGHT, artist))
+    if query.duration_ms and track.get("duration_ms"):
+        difference = abs(query.duration_ms - track["duration_ms"])
+        weights.append(
+            (DURATION_WEIGHT, max(0.0, 1 - difference / DURATION_TOLERANCE_MS))
+        )
+    return sum(weight * value for weight, value in weights) / sum(
+        weight for weight, _ in weights
+    )
+
+
+def _quoted(value: str) -> str:
+    return value.replace('"', " ").strip()
+
+
+class TrackResolver:
+    def __init__(
+        self,
+        client,
+        min_confidence: float = 0.75,
+        max_workers: int = 8,
+        candidates: int = 10,
+        store: Optional[StateStore] = None,
+    ):
+        if not 0 <= min_confidence <= 1:
+            raise ValueError("Invalid min_confidence, must be between 0 and 1.")
+        self.client = client
+        self.min_confidence = min_confidence
+        self.max_workers = max(1, max_workers)
+        self.candidates = candidates
+        self.store = store if store is not None else MemoryStateStore()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    # --- lookups --------------------------------------------------------------
+
+    def _queries(self, query: TrackQuery) -> List[Tuple[str, str]]:
+        queries = []
+        isrc = normalize_isrc(query.isrc)
+        if isrc:
+            queries.append(("isrc", f"isrc:{isrc}"))
+        artists = query.artists
+        if query.title:
+            # Decorations like "- Remastered 2011" narrow field matches too much.
+            title = normalize_title(query.title) or _quoted(query.title)
+            fields = f'track:"{_quoted(title)}"'
+            if artists:
+                fields += f' artist:"{_quoted(artists[0])}"'
+            queries.append(("fields", fields))
+            text = title
+            if artists:
+                text = f"{text} {normalize_text(artists[0])}"
+            queries.append(("text", text))
+        return queries
+
+    def _search(self, q: str) -> List[Dict]:
+        with self._lock:
+            self.requests += 1
+        response = self.client.request_manager.get(
+            "/v1/search",
+            params={"q": q, "type": "track", "limit": self.candidates, "offset": 0},
+        )
+        return [
+            track
+            for track in (response.get("tracks") or {}).get("items") or []
+            if track
+        ]
+
+    def match(self, query: TrackQuery) -> Dict:
+        """The best candidate for `query` across strategies, as a cacheable dict."""
+        best: Dict[str, Any] = {
+            "uri": None,
+            "track_id": None,
+            "name": None,
+            "artists": [],
+            "confidence": 0.0,
+            "matched_by": None,
+        }
+        for strategy, q in self._queries(query):
+            for track in self._search(q):
+                confidence = score_candidate(query, track)
+                if strategy == "isrc":
+                    # Same recording; the metadata score only picks between re-releases.
+                    confidence = 0.9 + 0.1 * confidence
+                if confidence > best["confidence"]:
+                    best = {
+                        "uri": track.get("uri"),
+                        "track_id": track.get("id"),
+                        "name": track.get("name"),
+                        "artists": [
+                            artist.get("name") for artist in track.get("artists") or []
+                        ],
+                        "confidence": round(confidence, 4),
+                        "matched_by": strategy,
+                    }
+            if best["confidence"] >= self.min_confidence:
+                break
+        return best
+
+    def _cached_match(self, query: TrackQuery) -> Tuple[Dict, bool]:
+        key = query.key
+        if key is None:
+            return self.match(query), False
+        store_key = f"resolver:{key}"
+        cached = self.store.get(store_key)
+        if cached is not None:
+            self.client.request_manager.notify_cache("/v1/search", True)
+            return cached, True
+
+        # Single-flight: concurrent rows with the same key share one lookup.
+        with self._lock:
+            shared = self._inflight.get(key)
+            if shared is None:
+                future: Future = Future()
+                self._inflight[key] = future
+        if shared is not None:
+            found = shared.result()
+            self.client.request_manager.notify_cache("/v1/search", True)
+            return found, True
+        try:
+            found = self.match(query)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            # Misses aren't stored: the catalog or the row may match next time.
+            if found["confidence"] >= self.min_confidence:
+                self.store.set(store_key, found)
+            future.set_result(found)
+            self.client.request_manager.notify_cache("/v1/search", False)
+            return found, False
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def resolve_one(self, row: TrackRow, index: int = 0) -> TrackResolution:
+        query = None
+        try:
+            query = as_query(row)
+            found, cached = self._cached_match(query)
+        except Exception as exc:
+            return TrackResolution(
+                index=index, query=query, error=str(exc) or type(exc).__name__
+            )
+        result = TrackResolution(index=index, query=query, cached=cached, **found)
+        if result.confidence < self.min_confidence:
+            result.uri = None
+        return result
+
+    def resolve(
+        self, rows: Iterable[TrackRow]
+    ) -> Generator[TrackResolution, None, None]:
+        """Resolve `rows` concurrently, yielding results in input order as they finish.
+
+        At most a few batches' worth of rows are in flight at a time, so `rows`
+        can be a lazy iterable of any length.
+        """
+        window = self.max_workers * 4
+        pending: deque = deque()
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="rebel-rhythms-resolve"
+        ) as executor:
+            try:
+                for index, row in enumerate(rows):
+                    pending.append(executor.submit(self.resolve_one, row, index))
+                    while len(pending) >= window or (pending and pending[0].done()):
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
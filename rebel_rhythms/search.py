@@ -0,0 +1,132 @@
+"""Search several result types with one request per page."""
+
+from collections import deque
+from typing import Deque, Dict, Generator, List, Optional, Sequence, Type, Union
+
+from pydantic import BaseModel
+
+from rebel_rhythms.models import (
+    ArtistObject,
+    SimplifiedAlbumObject,
+    SimplifiedPlaylistObject,
+    Track,
+)
+
+SEARCH_MODELS: Dict[str, Type[BaseModel]] = {
+    "album": SimplifiedAlbumObject,
+    "artist": ArtistObject,
+    "track": Track,
+    "playlist": SimplifiedPlaylistObject,
+}
+
+
+class MultiSearch:
+    def __init__(
+        self,
+        request_manager,
+        query: str,
+        search_types: Sequence[str],
+        max_items: Union[int, Dict[str, int], None] = None,
+        limit: int = 50,
+    ):
+        search_types = list(dict.fromkeys(search_types))
+        if not search_types:
+            raise ValueError("No search types given.")
+        for search_type in search_types:
+            if search_type not in SEARCH_MODELS:
+                raise ValueError(f"Invalid search_type: {search_type}")
+        if isinstance(max_items, dict):
+            unknown = set(max_items) - set(search_types)
+            if unknown:
+                raise ValueError(
+                    f"max_items given for types not searched: {sorted(unknown)}"
+                )
+
+        self.request_manager = request_manager
+        self.query = query
+        self.search_types = search_types
+        self.limit = limit
+        self.requests = 0
+        self.totals: Dict[str, int] = {}
+        self._offset = 0
+        self._remaining: Dict[str, Optional[int]] = {
+            search_type: (
+                max_items.get(search_type) if isinstance(max_items, dict) else max_items
+            )
+            for search_type in search_types
+        }
+        self._buffers: Dict[str, Deque[Dict]] = {
+            search_type: deque() for search_type in search_types
+        }
+        self._active = [t for t in search_types if self._remaining[t] != 0]
+
+    @property
+    def exhausted(self) -> bool:
+        return not self._active
+
+    def _fetch_page(self) -> None:
+        types = list(self._active)
+        response = self.request_manager.get(
+            "/v1/search",
+            params={
+                "q": self.query,
+                "type": ",".join(types),
+                "limit": self.limit,
+                "offset": self._offset,
+            },
+        )
+        self.requests += 1
+        self._offset += self.limit
+        for search_type in types:
+            section = response.get(f"{search_type}s") or {}
+            items = section.get("items") or []
+            if "total" in section:
+                self.totals[search_type] = section["total"]
+            remaining = self._remaining[search_type]
+            if remaining is not None:
+                items = items[:remaining]
+                self._remaining[search_type] = remaining - len(items)
+            self._buffers[search_type].extend(items)
+            if (
+                not items
+                or not section.get("next")
+                or self._remaining[search_type] == 0
+            ):
+                self._active.remove(search_type)
+
+    def raw(self, search_type: str) -> Generator[Dict, None, None]:
+        """Raw result dicts of one type, fetching pages as they are needed."""
+        if search_type not in self._buffers:
+            raise ValueError(f"search_type {search_type!r} is not part of this search")
+        buffer = self._buffers[search_type]
+        try:
+            while True:
+                while buffer:
+                    yield buffer.popleft()
+                if search_type not in self._active:
+                    return
+                self._fetch_page()
+        finally:
+            # Abandoned early: stop asking for this type and drop what is queued.
+            if search_type in self._active:
+                self._active.remove(search_type)
+            buffer.clear()
+
+    def __getitem__(self, search_type: str) -> Generator[BaseModel, None, None]:
+        interner = self.request_manager.interner
+        items = self.raw(search_type)
+        try:
+            for item in items:
+                # Only reached for searched types; `raw` rejects the others.
+                result = SEARCH_MODELS[search_type](**item)
+                yield result if interner is None else interner.intern(result)
+        finally:
+            items.close()
+
+    def collect(self) -> Dict[str, List[BaseModel]]:
+        """Fetch every remaining page and return the results per type."""
+        while self._active:
+            self._fetch_page()
+        return {
+            search_type: list(self[search_type]) for search_type in self.search_types
+        }
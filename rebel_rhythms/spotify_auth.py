@@ -1,11 +1,12 @@
-import webbrowser
+import time
+from functools import lru_cache
 from typing import Optional
+from urllib.parse import urlencode
 import requests
-import json
-from http.server import BaseHTTPRequestHandler, HTTPServer
-import os
 from enum import Enum
 
+from rebel_rhythms.token_store import FileTokenStore, MemoryTokenStore, TokenStore
+
 
 class SpotifyScope(Enum):
     USER_READ_PRIVATE = "user-read-private"
@@ -25,8 +26,25 @@ class SpotifyScope(Enum):
     UGC_IMAGE_UPLOAD = "ugc-image-upload"
 
 
-class SpotifyAuth:
-    class SimpleHandler(BaseHTTPRequestHandler):
+TOKEN_URL = "https://accounts.spotify.com/api/token/"
+
+_UNLOADED = object()
+
+
+def _with_expiry(tokens):
+    # Spotify reports a relative lifetime; store an absolute time so that it
+    # stays meaningful after the tokens are written to disk.
+    if isinstance(tokens, dict) and "expires_in" in tokens:
+        tokens["expires_at"] = time.time() + tokens["expires_in"]
+    return tokens
+
+
+@lru_cache(maxsize=None)
+def _callback_handler_class():
+    # http.server is only needed for the interactive authorization flow.
+    from http.server import BaseHTTPRequestHandler
+
+    class CallbackHandler(BaseHTTPRequestHandler):
         def __init__(self, *args, spotify_auth, **kwargs):
             self.spotify_auth = spotify_auth
             super().__init__(*args, **kwargs)
@@ -41,40 +59,72 @@ class SpotifyAuth:
                 if tokens:
                     self.spotify_auth.store_tokens(tokens)
 
-    def __init__(self, client_id, client_secret, redirect_uri, scope: Optional[list[SpotifyScope]] = None, tokens_file=None):
+    return CallbackHandler
+
+
+class SpotifyAuth:
+    def __init__(
+        self,
+        client_id,
+        client_secret,
+        redirect_uri,
+        scope: Optional[list[SpotifyScope]] = None,
+        tokens_file=None,
+        token_store: Optional[TokenStore] = None,
+        token_url: str = TOKEN_URL,
+    ):
         if scope is None:
             scope = [s for s in SpotifyScope]
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
         self.scope = " ".join([s.value for s in scope])
-        if tokens_file is None:
-            self.tokens_file = os.path.join(os.getcwd(), "tokens.json")
-        else:
-            self.tokens_file = tokens_file
-        self.token_url = "https://accounts.spotify.com/api/token/"
-        self.tokens = self.load_tokens()
+        if token_store is None:
+            token_store = FileTokenStore(tokens_file)
+        self.token_store = token_store
+        self.token_url = token_url
+        self._tokens = _UNLOADED
+
+    @property
+    def tokens(self):
+        # Loaded on first access so that constructing the auth does no I/O.
+        if self._tokens is _UNLOADED:
+            self._tokens = self.load_tokens()
+        return self._tokens
+
+    @tokens.setter
+    def tokens(self, tokens):
+        self._tokens = tokens
 
     def initiate_authorization(self):
+        import webbrowser
+
         webbrowser.open(self.get_authorization_url())
         self.run_server()
         self.tokens = self.load_tokens()
 
     def run_server(self):
+        from http.server import HTTPServer
+
+        handler = _callback_handler_class()
         server = HTTPServer(
-            ("localhost", 8080), lambda *args, **kwargs: self.SimpleHandler(*args, spotify_auth=self, **kwargs)
+            ("localhost", 8080), lambda *args, **kwargs: handler(*args, spotify_auth=self, **kwargs)
         )
         server.handle_request()
 
+    @property
+    def tokens_file(self) -> Optional[str]:
+        return getattr(self.token_store, "path", None)
+
     def load_tokens(self):
-        if os.path.exists(self.tokens_file):
-            with open(self.tokens_file, "r") as file:
-                return json.load(file)
-        return None
+        return self.token_store.load()
 
     def store_tokens(self, tokens):
-        with open(self.tokens_file, "w") as file:
-            json.dump(tokens, file)
+        self.token_store.save(tokens)
+
+    def token_lock(self):
+        """Serialize token refreshes between everyone sharing the token store."""
+        return self.token_store.lock()
 
     def get_authorization_url(self):
         base_url = "https://accounts.spotify.com/authorize"
@@ -84,12 +134,12 @@ class SpotifyAuth:
             "redirect_uri": self.redirect_uri,
             "scope": self.scope,
         }
-        return requests.get(base_url, params=params).url
+        return f"{base_url}?{urlencode(params)}"
 
     def get_access_token(self, auth_code):
         payload = {"grant_type": "authorization_code", "code": auth_code, "redirect_uri": self.redirect_uri}
         response = requests.post(self.token_url, data=payload, auth=(self.client_id, self.client_secret), headers=None)
-        return response.json()
+        return _with_expiry(response.json())
 
     def refresh_tokens(self):
         if not self.tokens or "refresh_token" not in self.tokens:
@@ -98,4 +148,45 @@ class SpotifyAuth:
         refresh_token = self.tokens.get("refresh_token")
         payload = {"grant_type": "refresh_token", "refresh_token": refresh_token}
         response = requests.post(self.token_url, data=payload, auth=(self.client_id, self.client_secret), headers=None)
-        return response.json()
+        return _with_expiry(response.json())
+
+
+class SpotifyClientCredentialsAuth:
+    """App-only auth via the client-credentials grant.
+
+    Tokens are kept in memory by default: there is no browser, callback
+    server or token file, and no refresh token. Renewal simply requests a new
+    token. Pass a shared `token_store` to reuse one app token across workers.
+    Only endpoints that don't need a user (catalog lookups, search) work.
+    """
+
+    def __init__(
+        self,
+        client_id,
+        client_secret,
+        token_store: Optional[TokenStore] = None,
+        token_url: str = TOKEN_URL,
+    ):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        self.token_store = token_store or MemoryTokenStore()
+        self.tokens = None
+
+    def initiate_authorization(self):
+        self.tokens = self.refresh_tokens()
+        self.store_tokens(self.tokens)
+
+    def load_tokens(self):
+        return self.token_store.load()
+
+    def store_tokens(self, tokens):
+        self.token_store.save(tokens)
+
+    def token_lock(self):
+        return self.token_store.lock()
+
+    def refresh_tokens(self):
+        payload = {"grant_type": "client_credentials"}
+        response = requests.post(self.token_url, data=payload, auth=(self.client_id, self.client_secret), headers=None)
+        return _with_expiry(response.json())
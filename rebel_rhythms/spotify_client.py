@@ -1,9 +1,24 @@
 import base64
-import random
 from collections import defaultdict
+from contextlib import contextmanager
 from enum import Enum
-from typing import Dict, Generator, List, Optional, Type, Union
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
+from rebel_rhythms.custom_exceptions import PlaylistChangedException
+from rebel_rhythms.export import Destination, ExportReport, LibraryExporter
+from rebel_rhythms.interning import Interner
+from rebel_rhythms.metrics import MetricsRegistry, RequestMetrics
 from rebel_rhythms.models import (
     AlbumObject,
     ArtistObject,
@@ -20,19 +35,53 @@ from rebel_rhythms.models import (
     SimplifiedAlbumObject,
     SimplifiedPlaylistObject,
     SimplifiedTrackObject,
+    SpotifyModel,
     Track,
     User,
 )
-from rebel_rhythms.spotify_auth import SpotifyAuth
-from rebel_rhythms.spotify_request_manager import SpotifyRequestManager
+from rebel_rhythms.bulk import BulkReport, run_bulk
+from rebel_rhythms.playlist_dedupe import (
+    DedupeReport,
+    DuplicateIndex,
+    PlaylistDeduplicator,
+)
+from rebel_rhythms.playlist_maintenance import (
+    MaintenancePass,
+    MaintenanceReport,
+    PlaylistMaintenance,
+    RemoveUnplayable,
+    Shuffle,
+)
+from rebel_rhythms.playlist_sync import PlaylistSynchronizer, SyncPlan
+from rebel_rhythms.profiling import CallProfiler, time_init, untime_init
+from rebel_rhythms.rate_limiter import RateLimiter
+from rebel_rhythms.resolver import TrackResolution, TrackResolver, TrackRow
+from rebel_rhythms.search import MultiSearch
+from rebel_rhythms.spotify_auth import (
+    TOKEN_URL,
+    SpotifyAuth,
+    SpotifyClientCredentialsAuth,
+)
+from rebel_rhythms.spotify_request_manager import API_BASE_URL, SpotifyRequestManager
+from rebel_rhythms.state_store import StateStore
+from rebel_rhythms.token_store import TokenStore
+from rebel_rhythms.transport import Transport
 from rebel_rhythms.validators import (
     ContentType,
     check_list_limit,
+    parse_spotify_ids,
+    split_fields,
     validate_boolean_param,
     validate_id_or_url,
     validate_playlist_params,
     validate_track_uris,
 )
+from rebel_rhythms.write_behind import WriteBehindQueue
+
+
+def _with_next(fields: str) -> str:
+    # Pagination stops when `next` is missing from the projection.
+    return fields if "next" in split_fields(fields) else f"{fields},next"
 
 
 class IncludeGroups(Enum):
@@ -55,12 +104,66 @@ class SpotifyClient:
         redirect_uri="http://localhost:8080/callback",
         market="UA",
         scope=None,
+        rate_limit: Optional[float] = None,
+        max_retries: int = 3,
+        background_token_refresh: bool = False,
+        auth=None,
+        token_store: Optional[TokenStore] = None,
+        api_base_url: str = API_BASE_URL,
+        token_url: str = TOKEN_URL,
+        transport: Optional[Transport] = None,
     ):
         self.market = market
-        self.spotify_auth = SpotifyAuth(
-            client_id, client_secret, redirect_uri=redirect_uri, scope=scope
+        self.spotify_auth = auth or SpotifyAuth(
+            client_id,
+            client_secret,
+            redirect_uri=redirect_uri,
+            scope=scope,
+            token_store=token_store,
+            token_url=token_url,
         )
-        self.request_manager = SpotifyRequestManager(self.spotify_auth, self.market)
+        self.request_manager = SpotifyRequestManager(
+            self.spotify_auth,
+            self.market,
+            rate_limiter=RateLimiter(rate=rate_limit),
+            max_retries=max_retries,
+            background_refresh=background_token_refresh,
+            base_url=api_base_url,
+            transport=transport,
+        )
+        self.write_behind: Optional[WriteBehindQueue] = None
+        self.metrics: Optional[RequestMetrics] = None
+        self.profiler: Optional[CallProfiler] = None
+
+    @classmethod
+    def from_client_credentials(
+        cls,
+        client_id: str,
+        client_secret: str,
+        market="UA",
+        token_store: Optional[TokenStore] = None,
+        token_url: str = TOKEN_URL,
+        **kwargs,
+    ) -> "SpotifyClient":
+        """Create a headless, app-only client for catalog endpoints.
+
+        Uses the client-credentials grant: no browser, no token file, and
+        user endpoints (library, playlists of the current user) are unavailable.
+        """
+        return cls(
+            client_id,
+            client_secret,
+            market=market,
+            auth=SpotifyClientCredentialsAuth(
+                client_id, client_secret, token_store, token_url=token_url
+            ),
+            **kwargs,
+        )
+
+    def warmup(self) -> "SpotifyClient":
+        """Resolve (and if needed refresh) tokens now instead of on the first call."""
+        self.request_manager.warmup()
+        return self
 
     def _format_ids(self, ids: Union[str, List[str]]) -> str:
         if isinstance(ids, list):
@@ -137,6 +240,18 @@ class SpotifyClient:
         response = self.request_manager.delete("/v1/me/albums", json={"ids": albums})
         return response
 
+    # [Tested]
+    def save_albums_bulk(self, albums: List[str], max_workers: int = 4) -> BulkReport:
+        return run_bulk(albums, ContentType.ALBUM, self.save_albums, 50, max_workers)
+
+    # [Tested]
+    def remove_user_saved_albums_bulk(
+        self, albums: List[str], max_workers: int = 4
+    ) -> BulkReport:
+        return run_bulk(
+            albums, ContentType.ALBUM, self.remove_user_saved_albums, 50, max_workers
+        )
+
     # [Tested]
     @check_list_limit("albums", 20)
     @validate_id_or_url(ContentType.ALBUM, multiple=True)
@@ -349,6 +464,64 @@ class SpotifyClient:
                 max_items,
             )
 
+    # [Tested]
+    @validate_id_or_url(content_type=ContentType.PLAYLIST, multiple=False)
+    def get_playlist_snapshot_id(self, playlist: str) -> str:
+        response = self.request_manager.get(
+            f"/v1/playlists/{playlist}", params={"fields": "snapshot_id"}
+        )
+        return response["snapshot_id"]
+
+    # [Tested]
+    @validate_id_or_url(content_type=ContentType.PLAYLIST, multiple=False)
+    def get_raw_playlist_items(
+        self, playlist: str, fields: Optional[str] = None
+    ) -> Generator[Dict, None, None]:
+        endpoint = f"/v1/playlists/{playlist}/tracks"
+        params: Dict[str, Any] = {"limit": 100, "offset": 0}
+        if fields:
+            params["fields"] = _with_next(fields)
+
+        return self.request_manager._fetch_from_api(endpoint, params, lambda item: item)
+
+    # [Tested]
+    @validate_id_or_url(content_type=ContentType.PLAYLIST, multiple=False)
+    def get_raw_playlist_snapshot(
+        self, playlist: str, fields: Optional[str] = None, attempts: int = 3
+    ) -> Tuple[str, List[Dict]]:
+        """The playlist's snapshot_id with all of its items, as of that snapshot.
+
+        The snapshot_id and the first page come from one request. Past one
+        page, the snapshot_id is checked again after the last page and the
+        read starts over if the playlist changed in between.
+        """
+        item_fields = _with_next(fields) if fields else None
+        tracks = f"tracks({item_fields})" if item_fields else "tracks"
+        for _ in range(attempts):
+            response = self.request_manager.get(
+                f"/v1/playlists/{playlist}", params={"fields": f"snapshot_id,{tracks}"}
+            )
+            snapshot_id = response["snapshot_id"]
+            page = response["tracks"]
+            items = list(page["items"])
+            if not page.get("next"):
+                return snapshot_id, items
+
+            params: Dict[str, Any] = {"limit": 100, "offset": len(items)}
+            if item_fields:
+                params["fields"] = item_fields
+            items.extend(
+                self.request_manager._fetch_from_api(
+                    f"/v1/playlists/{playlist}/tracks", params, lambda item: item
+                )
+            )
+            if self.get_playlist_snapshot_id(playlist) == snapshot_id:
+                return snapshot_id, items
+
+        raise PlaylistChangedException(
+            f"Playlist {playlist} changed while it was being read."
+        )
+
     # [Tested]
     @check_list_limit("uris", 100)
     @validate_id_or_url(content_type=ContentType.PLAYLIST, multiple=False)
@@ -378,6 +551,75 @@ class SpotifyClient:
             },
         )
 
+    # [Tested]
+    @validate_id_or_url(content_type=ContentType.PLAYLIST, multiple=False)
+    def remove_playlist_items_at_positions(
+        self,
+        playlist: str,
+        items: List[Tuple[str, int]],
+        snapshot_id: str,
+    ) -> str:
+        # Deleting from the end backwards keeps the remaining positions valid
+        # against each new snapshot, so every batch can chain on the previous one.
+        ordered = sorted(items, key=lambda item: item[1], reverse=True)
+
+        for i in range(0, len(ordered), 100):
+            positions_by_uri = defaultdict(list)
+            for uri, position in ordered[i : i + 100]:
+                positions_by_uri[uri].append(position)
+
+            response = self.request_manager.delete(
+                f"/v1/playlists/{playlist}/tracks",
+                json={
+                    "tracks": [
+                        {"uri": uri, "positions": positions}
+                        for uri, positions in positions_by_uri.items()
+                    ],
+                    "snapshot_id": snapshot_id,
+                },
+            )
+            snapshot_id = response.get("snapshot_id", snapshot_id)
+
+        return snapshot_id
+
+    # [Tested]
+    @validate_id_or_url(content_type=ContentType.PLAYLIST, multiple=False)
+    def reorder_playlist_items(
+        self,
+        playlist: str,
+        range_start: int,
+        insert_before: int,
+        range_length: int = 1,
+        snapshot_id: Optional[str] = None,
+    ) -> Dict:
+        if range_start < 0 or insert_before < 0 or range_length < 1:
+            raise ValueError("Invalid range, positions must be positive.")
+        payload: Dict[str, Any] = dict(
+            range_start=range_start,
+            insert_before=insert_before,
+            range_length=range_length,
+        )
+        if snapshot_id:
+            payload["snapshot_id"] = snapshot_id
+        return self.request_manager.put(
+            f"/v1/playlists/{playlist}/tracks", json=payload
+        )
+
+    # [Tested]
+    @check_list_limit("uris", 100)
+    @validate_id_or_url(content_type=ContentType.PLAYLIST, multiple=False)
+    def replace_playlist_items(self, playlist: str, uris: List[str]) -> Dict:
+        return self.request_manager.put(
+            f"/v1/playlists/{playlist}/tracks",
+            json=dict(uris=validate_track_uris(uris) if uris else []),
+        )
+
+    # [Tested]
+    def sync_playlist(
+        self, playlist: str, desired_uris: List[str], dry_run: bool = False
+    ) -> SyncPlan:
+        return PlaylistSynchronizer(self).sync(playlist, desired_uris, dry_run=dry_run)
+
     # [Tested]
     def get_current_user_playlists(
         self, max_items: Optional[int] = None
@@ -546,6 +788,26 @@ class SpotifyClient:
     def remove_user_saved_tracks(self, tracks: Union[str, List[str]]) -> None:
         return self.request_manager.delete("/v1/me/tracks", json=dict(ids=tracks))
 
+    # [Tested]
+    def save_tracks_for_current_user_bulk(
+        self, tracks: List[str], max_workers: int = 4
+    ) -> BulkReport:
+        return run_bulk(
+            tracks,
+            ContentType.TRACK,
+            self.save_tracks_for_current_user,
+            50,
+            max_workers,
+        )
+
+    # [Tested]
+    def remove_user_saved_tracks_bulk(
+        self, tracks: List[str], max_workers: int = 4
+    ) -> BulkReport:
+        return run_bulk(
+            tracks, ContentType.TRACK, self.remove_user_saved_tracks, 50, max_workers
+        )
+
     # [Tested]
     @check_list_limit("tracks", 50)
     @validate_id_or_url(content_type=ContentType.TRACK, multiple=True)
@@ -641,6 +903,98 @@ class SpotifyClient:
     def unfollow_playlist(self, playlist: str):
         return self.request_manager.delete(f"/v1/playlists/{playlist}/followers")
 
+    # [Tested]
+    @check_list_limit("artists", 50)
+    @validate_id_or_url(content_type=ContentType.ARTIST, multiple=True)
+    def follow_artists(self, artists: Union[str, List[str]]) -> None:
+        return self.request_manager.put(
+            "/v1/me/following", params={"type": "artist"}, json={"ids": artists}
+        )
+
+    # [Tested]
+    @check_list_limit("artists", 50)
+    @validate_id_or_url(content_type=ContentType.ARTIST, multiple=True)
+    def unfollow_artists(self, artists: Union[str, List[str]]) -> None:
+        return self.request_manager.delete(
+            "/v1/me/following", params={"type": "artist"}, json={"ids": artists}
+        )
+
+    # [Tested]
+    @check_list_limit("users", 50)
+    @validate_id_or_url(content_type=ContentType.USER, multiple=True)
+    def follow_users(self, users: Union[str, List[str]]) -> None:
+        return self.request_manager.put(
+            "/v1/me/following", params={"type": "user"}, json={"ids": users}
+        )
+
+    # [Tested]
+    @check_list_limit("users", 50)
+    @validate_id_or_url(content_type=ContentType.USER, multiple=True)
+    def unfollow_users(self, users: Union[str, List[str]]) -> None:
+        return self.request_manager.delete(
+            "/v1/me/following", params={"type": "user"}, json={"ids": users}
+        )
+
+    # [Tested]
+    def enable_write_behind(
+        self,
+        max_batch_size: int = 50,
+        flush_interval: float = 1.0,
+        max_workers: int = 4,
+    ) -> WriteBehindQueue:
+        """Buffer save/remove/follow mutations and write them in batches.
+
+        Call `flush()` or `close()` on the returned queue to make sure pending
+        operations are written before the program exits.
+        """
+        if self.write_behind is None:
+            self.write_behind = WriteBehindQueue(
+                self, max_batch_size, flush_interval, max_workers
+            )
+        return self.write_behind
+
+    # [Tested]
+    def enable_metrics(
+        self, registry: Optional[MetricsRegistry] = None
+    ) -> RequestMetrics:
+        """Start counting this client's requests; see `RequestMetrics.render()`."""
+        if self.metrics is None:
+            self.metrics = RequestMetrics(registry)
+            self.request_manager.add_hook(self.metrics)
+        return self.metrics
+
+    # [Tested]
+    def enable_profiling(self, sample_rate: float = 1.0) -> CallProfiler:
+        """Record a call tree for (a `sample_rate` share of) this client's calls."""
+        if self.profiler is None:
+            time_init(SpotifyModel, "model")
+            self.profiler = CallProfiler(sample_rate).attach(self)
+        return self.profiler
+
+    # [Tested]
+    def disable_profiling(self) -> Optional[CallProfiler]:
+        profiler, self.profiler = self.profiler, None
+        if profiler is not None:
+            profiler.detach(self)
+            untime_init(SpotifyModel)
+        return profiler
+
+    # [Tested]
+    @contextmanager
+    def interning(self, interner: Optional[Interner] = None) -> Iterator[Interner]:
+        """Share repeated artists, albums and strings across paginated results.
+
+        Applies to generators that start iterating inside the block; pass an
+        existing `interner` to share objects across several blocks.
+        """
+        interner = interner or Interner()
+        previous = self.request_manager.interner
+        self.request_manager.interner = interner
+        try:
+            yield interner
+        finally:
+            self.request_manager.interner = previous
+
     # [Tested]
     def search(
         self,
@@ -710,89 +1064,180 @@ class SpotifyClient:
                 item_path=result_type_map[search_type]["item_path"],
             )
 
-    # [Not tested]
-    def shuffle_playlist(self, playlist_id: str):
-        # Get all the tracks in the playlist
-        all_tracks = self.get_all_playlist_tracks(playlist_id)
-
-        # Extract URIs from the tracks
-        track_uris = [track.uri for track in all_tracks]
-
-        # Get the total number of tracks
-        total_tracks = len(track_uris)
-
-        # Create a list of positions
-        positions = list(range(total_tracks))
-
-        # Shuffle the positions
-        random.shuffle(positions)
+    # [Tested]
+    def multi_search(
+        self,
+        query: str,
+        search_types: List[str],
+        max_items: Union[int, Dict[str, int], None] = None,
+    ) -> MultiSearch:
+        """Search several types at once, one request per page for all of them.
+
+        `max_items` caps every type, or each type separately when a dict.
+        Items of a type nobody iterates are buffered, so iterate every type
+        (`results["track"]`, ...) or use `collect()`.
+        """
+        if isinstance(query, dict):
+            query = self._build_search_query(query)
+        return MultiSearch(self.request_manager, query, search_types, max_items)
 
-        # Reorder the tracks one by one to the shuffled positions
-        for i in range(total_tracks):
-            # The position of the item to be reordered
-            range_start = i
+    # [Tested]
+    def resolve_tracks(
+        self,
+        rows: Iterable[TrackRow],
+        min_confidence: float = 0.75,
+        max_workers: int = 8,
+        store: Optional[StateStore] = None,
+    ) -> Generator[TrackResolution, None, None]:
+        """Match (artist, title, ISRC) rows to catalog tracks.
+
+        Results stream back in input order. A result's `uri` is None when no
+        candidate reached `min_confidence`; `store` keeps matches across runs.
+        """
+        resolver = TrackResolver(
+            self, min_confidence=min_confidence, max_workers=max_workers, store=store
+        )
+        return resolver.resolve(rows)
 
-            # The position where the item should be inserted
-            insert_before = positions[i]
+    # [Tested]
+    def maintain_playlist(
+        self,
+        playlist: str,
+        passes: List[MaintenancePass],
+        dry_run: bool = False,
+        allow_replace: bool = True,
+    ) -> MaintenanceReport:
+        maintenance = PlaylistMaintenance(self, passes, allow_replace=allow_replace)
+        return maintenance.run(playlist, dry_run=dry_run)
 
-            # The amount of items to be reordered (only one item in this case)
-            range_length = 1
+    # [Tested]
+    def shuffle_playlist(
+        self, playlist_id: str, seed: Optional[int] = None, dry_run: bool = False
+    ) -> MaintenanceReport:
+        return self.maintain_playlist(playlist_id, [Shuffle(seed)], dry_run=dry_run)
 
-            # Send the request
-            response = self.request_manager.put(
-                f"/v1/playlists/{playlist_id}/tracks",
-                json=dict(
-                    range_start=range_start,
-                    insert_before=insert_before,
-                    range_length=range_length,
-                ),
-            )
+    # [Tested]
+    def remove_duplicate_tracks(
+        self, playlist_id: str, fuzzy: bool = True, dry_run: bool = False
+    ) -> DedupeReport:
+        deduplicator = PlaylistDeduplicator(self, fuzzy=fuzzy, dry_run=dry_run)
+        return deduplicator.dedupe(playlist_id)
 
-            # Handle the response here (e.g., check for success, handle errors)
-            print(response)
+    # [Tested]
+    def remove_duplicates_across_playlists(
+        self,
+        playlist_ids: List[str],
+        fuzzy: bool = True,
+        dry_run: bool = False,
+        index: Optional[DuplicateIndex] = None,
+    ) -> List[DedupeReport]:
+        deduplicator = PlaylistDeduplicator(
+            self, index=index, fuzzy=fuzzy, dry_run=dry_run
+        )
+        return deduplicator.dedupe_many(playlist_ids)
 
-        return f"Shuffled playlist {playlist_id} successfully"
+    # [Tested]
+    @validate_id_or_url(content_type=ContentType.PLAYLIST, multiple=False)
+    def export_playlist(
+        self,
+        playlist: str,
+        destination: Destination,
+        columns: Optional[List[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        """Stream a playlist's items to NDJSON, CSV or Parquet."""
+        return LibraryExporter(self).playlist(
+            playlist, destination, columns, format, compress
+        )
 
-    # [Not tested]
-    def remove_duplicate_tracks(self, playlist_id: str):
-        # Create a dictionary to track unique tracks
-        unique_tracks = defaultdict(list)
+    # [Tested]
+    def export_saved_tracks(
+        self,
+        destination: Destination,
+        columns: Optional[List[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        return LibraryExporter(self).saved_tracks(
+            destination, columns, format, compress
+        )
 
-        # Get all the tracks in the playlist
-        all_tracks = list(self.get_all_playlist_tracks(playlist_id))
+    # [Tested]
+    def export_saved_albums(
+        self,
+        destination: Destination,
+        columns: Optional[List[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        return LibraryExporter(self).saved_albums(
+            destination, columns, format, compress
+        )
 
-        # Identify unique tracks and their positions in the playlist
-        for idx, track in enumerate(all_tracks):
-            key = (
-                track.track.name,
-                tuple(artist.name for artist in track.track.artists),
+    # [Tested]
+    def export_top_items(
+        self,
+        destination: Destination,
+        items_type: ItemsType = ItemsType.TRACKS,
+        time_range: str = "medium_term",
+        columns: Optional[List[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        if not isinstance(items_type, ItemsType):
+            raise ValueError(
+                "Invalid items_type. Must be an instance of ItemsType Enum."
             )
-            unique_tracks[key].append(idx)
-
-        # Identify the duplicate tracks to remove (keep the first occurrence of each track)
-        tracks_to_remove = [
-            idx for indices in unique_tracks.values() for idx in indices[1:]
-        ]
-
-        # Create a list of dictionaries with each track URI and position
-        track_dicts = [{"uri": all_tracks[idx].uri} for idx in tracks_to_remove]
-
-        print(f"Total tracks to remove: {len(tracks_to_remove)}")
-
-        # Divide the track dictionaries into batches of 100
-        batch_size = 100
-        for i in range(0, len(track_dicts), batch_size):
-            batch = track_dicts[i : i + batch_size]
+        return LibraryExporter(self).top_items(
+            items_type.value, destination, time_range, columns, format, compress
+        )
 
-            # Create the JSON payload
-            data = {"tracks": batch}
+    # [Tested]
+    def export_search(
+        self,
+        query: str,
+        search_type: str,
+        destination: Destination,
+        max_items: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        if isinstance(query, dict):
+            query = self._build_search_query(query)
+        return LibraryExporter(self).search(
+            query, search_type, destination, max_items, columns, format, compress
+        )
 
-            # Send the request to remove the duplicate tracks
-            self.request_manager.delete(
-                f"/v1/playlists/{playlist_id}/tracks", json=data
-            )
+    # [Tested]
+    def export_tracks(
+        self,
+        tracks: List[str],
+        destination: Destination,
+        columns: Optional[List[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        """Stream catalog tracks (IDs, URLs or URIs) to NDJSON, CSV or Parquet."""
+        track_ids = parse_spotify_ids(tracks, ContentType.TRACK)
+        return LibraryExporter(self).tracks(
+            track_ids, destination, columns, format, compress
+        )
 
-        return f"Removed duplicate tracks from playlist {playlist_id} successfully"
+    # [Tested]
+    def export_audio_features(
+        self,
+        tracks: List[str],
+        destination: Destination,
+        columns: Optional[List[str]] = None,
+        format: Optional[str] = None,
+        compress: Optional[bool] = None,
+    ) -> ExportReport:
+        track_ids = parse_spotify_ids(tracks, ContentType.TRACK)
+        return LibraryExporter(self).audio_features(
+            track_ids, destination, columns, format, compress
+        )
 
     # [Not tested]
     def get_recommendations(
@@ -900,16 +1345,10 @@ class SpotifyClient:
         response = self.get("/v1/recommendations", params=params)
         return Recommendations(**response)
 
-    # [Not tested]
-    def remove_unplayable_tracks(self, playlist_id: str):
-        not_playable_tracks = []
-        for track in self.get_all_playlist_tracks(playlist_id):
-            if not track.track.is_playable:
-                not_playable_tracks.append(track.track.uri)
-
-        # Remove tracks 100 at a time
-        for i in range(0, len(not_playable_tracks), 100):
-            tracks_to_remove = not_playable_tracks[i : i + 100]
-            self.remove_playlist_items(playlist_id, tracks_to_remove)
-
-        return True
+    # [Tested]
+    def remove_unplayable_tracks(
+        self, playlist_id: str, dry_run: bool = False
+    ) -> MaintenanceReport:
+        return self.maintain_playlist(
+            playlist_id, [RemoveUnplayable()], dry_run=dry_run
+        )
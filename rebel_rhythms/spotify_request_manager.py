@@ -1,24 +1,109 @@
-import requests
+import threading
+import time
 from requests import Response
-from requests.exceptions import Timeout
-from typing import Union, Dict, Any, Callable
+from typing import Optional, Union, Dict, Any, Callable, Tuple
 
 from rebel_rhythms.custom_exceptions import (
     ForbiddenException,
+    InternalServerErrorException,
     RateLimitException,
     SpotifyClientException,
     ResourceNotFoundException,
     UnauthorizedException,
     BadRequestException,
 )
+from rebel_rhythms.hooks import RequestHook, RequestInfo
+from rebel_rhythms.interning import Interner
+from rebel_rhythms.profiling import CallProfiler
+from rebel_rhythms.rate_limiter import RateLimiter
+from rebel_rhythms.transport import RequestsTransport, Transport
+
+# 5xx responses are only retried for reads; a write may already have applied.
+RETRYABLE_SERVER_ERRORS = (502, 503, 504)
+
+# Refresh this many seconds before the access token expires.
+TOKEN_REFRESH_LEEWAY = 60
+
+API_BASE_URL = "https://api.spotify.com"
 
 
 class SpotifyRequestManager:
-    def __init__(self, spotify_auth, market):
-        self.base_url = "https://api.spotify.com"
+    def __init__(
+        self,
+        spotify_auth,
+        market,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 3,
+        refresh_leeway: float = TOKEN_REFRESH_LEEWAY,
+        background_refresh: bool = False,
+        base_url: str = API_BASE_URL,
+        transport: Optional[Transport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.transport = transport or RequestsTransport()
+        self.hooks: Tuple[RequestHook, ...] = ()
+        # Set by `SpotifyClient.interning()`; canonicalizes paginated items.
+        self.interner: Optional[Interner] = None
+        # Set by `SpotifyClient.enable_profiling()`; see `_timed`.
+        self.profiler: Optional[CallProfiler] = None
         self.spotify_auth = spotify_auth
         self.market = market
-        self._load_and_refresh_tokens()
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.refresh_leeway = refresh_leeway
+        self.background_refresh = background_refresh
+        self._clock = time.time
+        self._refresh_timer: Optional[threading.Timer] = None
+        self._refresh_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        # Tokens are resolved on first use (or by `warmup()`), so constructing
+        # a manager never touches the disk, the network or a browser.
+        self._tokens: Optional[Dict] = None
+
+    @property
+    def tokens(self) -> Dict:
+        tokens = self._tokens
+        if tokens is None:
+            with self._load_lock:
+                tokens = self._tokens
+                if tokens is None:
+                    tokens = self._load_tokens()
+        return tokens
+
+    @tokens.setter
+    def tokens(self, tokens: Dict):
+        self._tokens = tokens
+
+    @property
+    def headers(self) -> Dict:
+        access_token = self.tokens.get("access_token")
+        return {"Authorization": f"Bearer {access_token}"} if access_token else {}
+
+    def add_hook(self, hook: RequestHook) -> RequestHook:
+        self.hooks = (*self.hooks, hook)
+        return hook
+
+    def remove_hook(self, hook: RequestHook):
+        self.hooks = tuple(h for h in self.hooks if h is not hook)
+
+    def _notify(self, event: str, *args):
+        for hook in self.hooks:
+            getattr(hook, event)(*args)
+
+    def notify_cache(self, endpoint: str, hit: bool):
+        """Let hooks know that a caching layer answered (or missed) `endpoint`."""
+        self._notify("on_cache", endpoint, hit)
+
+    def _timed(self, category: str, func: Callable, *args, **kwargs) -> Any:
+        """Run one phase of a request, reporting its time to the profiler if any."""
+        if self.profiler is None:
+            return func(*args, **kwargs)
+        return self.profiler.measure(category, func, *args, **kwargs)
+
+    def warmup(self):
+        """Resolve tokens now, refreshing them if they are about to expire."""
+        if self._token_expiring():
+            self._refresh_tokens(self.headers.get("Authorization"))
 
     def _handle_params(self, params: Dict, include_market: bool) -> Dict:
         params = params or {}
@@ -53,7 +138,10 @@ class SpotifyRequestManager:
             )
 
         elif response.status_code == 429:
-            raise RateLimitException("The app has exceeded its rate limits.")
+            raise RateLimitException(
+                "The app has exceeded its rate limits.",
+                retry_after=self._retry_after(response),
+            )
 
         elif response.status_code == 404:
             raise ResourceNotFoundException("Resource not found.")
@@ -61,34 +149,87 @@ class SpotifyRequestManager:
         elif response.status_code == 400:
             raise BadRequestException(response.json())
 
+        elif response.status_code >= 500:
+            raise InternalServerErrorException(
+                f"Request failed with status code {response.status_code}"
+            )
+
         else:
             raise SpotifyClientException(
                 f"Request failed with status code {response.status_code}"
             )
 
+    def _retry_after(self, response: Response) -> float:
+        try:
+            return float(response.headers.get("Retry-After", 1))
+        except (TypeError, ValueError):
+            return 1.0
+
+    def _send(self, info: RequestInfo, url: str, **kwargs) -> Response:
+        throttled = self._timed("wait", self.rate_limiter.acquire)
+        if not self.hooks:
+            return self._timed(
+                "network", self.transport.send, info.method, url, **kwargs
+            )
+
+        info = info._replace(throttled=throttled)
+        self._notify("before_request", info)
+        started = time.perf_counter()
+        try:
+            response = self._timed(
+                "network", self.transport.send, info.method, url, **kwargs
+            )
+        except Exception as error:
+            self._notify("on_error", info, error, time.perf_counter() - started)
+            raise
+        self._notify("after_response", info, response, time.perf_counter() - started)
+        return response
+
+    def _should_retry(
+        self, info: RequestInfo, response: Response, attempt: int
+    ) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if response.status_code == 429:
+            delay = self._retry_after(response)
+            self._notify("on_retry", info, "rate_limited", delay)
+            # Every thread sharing the limiter backs off, not just this one.
+            self.rate_limiter.pause(delay)
+            return True
+        if info.method == "get" and response.status_code in RETRYABLE_SERVER_ERRORS:
+            delay = 0.5 * 2**attempt
+            self._notify("on_retry", info, "server_error", delay)
+            time.sleep(delay)
+            return True
+        return False
+
     def _request(
         self, method: str, endpoint: str, include_market: bool = True, **kwargs
     ) -> Any:
         url = f"{self.base_url}{endpoint}"
         kwargs["params"] = self._handle_params(kwargs.get("params"), include_market)
-        try:
-            response = getattr(requests, method)(
-                url, timeout=30, **kwargs
-            )  # 30-second timeout
-        except Timeout:
-            raise SpotifyClientException("The request timed out after 30 seconds.")
+        info = RequestInfo(method, endpoint)
+        response = self._send(info, url, **kwargs)
 
-        if response.status_code == 401 and self._refresh_token_if_required(response):
-            try:
-                response = getattr(requests, method)(
-                    url, timeout=30, **kwargs
-                )  # 30-second timeout
-            except Timeout:
-                raise SpotifyClientException("The request timed out after 30 seconds.")
+        if response.status_code == 401 and self._refresh_token_if_required(
+            response, (kwargs.get("headers") or {}).get("Authorization")
+        ):
+            # The first attempt carried the rejected token; resend with the new one.
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **self.headers}
+            info = info._replace(attempt=info.attempt + 1)
+            response = self._send(info, url, **kwargs)
 
-        return self._handle_response(response)
+        retries = 0
+        while self._timed("wait", self._should_retry, info, response, retries):
+            retries += 1
+            info = info._replace(attempt=info.attempt + 1)
+            response = self._send(info, url, **kwargs)
+
+        return self._timed("decode", self._handle_response, response)
 
     def _api_call(self, method: str, endpoint: str, **kwargs) -> Any:
+        if self._token_expiring():
+            self._refresh_tokens(self.headers.get("Authorization"))
         kwargs["headers"] = kwargs.get("headers") or self.headers
         return self._request(method, endpoint, **kwargs)
 
@@ -104,39 +245,92 @@ class SpotifyRequestManager:
     def delete(self, endpoint, **kwargs):
         return self._api_call("delete", endpoint, **kwargs)
 
-    def _load_and_refresh_tokens(self):
-        self.tokens = self.spotify_auth.load_tokens() or self._initiate_authorization()
-        if not self.tokens:
+    def _load_tokens(self) -> Dict:
+        tokens = self.spotify_auth.load_tokens() or self._initiate_authorization()
+        if not tokens:
             raise ValueError("Failed to obtain Spotify tokens.")
-        self._refresh_tokens_if_needed()
-        self.headers = {"Authorization": f'Bearer {self.tokens["access_token"]}'}
+        # No refresh here: a still-valid token is used as is, and one close to
+        # expiry (or without a recorded expiry) is refreshed on first use.
+        self.tokens = tokens
+        self.spotify_auth.tokens = tokens
+        self._schedule_refresh()
+        return tokens
 
     def _initiate_authorization(self):
         self.spotify_auth.initiate_authorization()
         return self.spotify_auth.load_tokens()
 
-    def _refresh_tokens_if_needed(self):
-        refresh_token = self.tokens.get("refresh_token")
-        if not refresh_token:
-            raise ValueError("Refresh token not found.")
-        new_tokens = self.spotify_auth.refresh_tokens()
-        self.tokens.update(new_tokens)
-        self.spotify_auth.store_tokens(self.tokens)
-
-    def _refresh_token_if_required(self, response):
+    def _token_expiring(self, tokens: Optional[Dict] = None) -> bool:
+        tokens = tokens or self.tokens
+        expires_at = tokens.get("expires_at")
+        if not tokens.get("access_token") or not isinstance(expires_at, (int, float)):
+            # Token files written before expiries were recorded get one refresh.
+            return True
+        return self._clock() >= expires_at - self.refresh_leeway
+
+    def _use_tokens(self, tokens: Dict):
+        self.tokens = tokens
+        self.spotify_auth.tokens = tokens
+        self._schedule_refresh()
+
+    def _refresh_tokens(self, rejected: Optional[str] = None):
+        """Refresh once, however many threads or processes ask at the same time.
+
+        `rejected` is the Authorization header the caller found stale; if the
+        current one differs, another caller has already refreshed.
+        """
+        with self._refresh_lock:
+            if rejected is not None and self.headers.get("Authorization") != rejected:
+                return
+            with self.spotify_auth.token_lock():
+                stored = self.spotify_auth.load_tokens()
+                if (
+                    stored
+                    and stored.get("access_token")
+                    and f'Bearer {stored["access_token"]}' != rejected
+                    and not self._token_expiring(stored)
+                ):
+                    # Another process refreshed while we were waiting for the lock.
+                    self._use_tokens(stored)
+                    return
+                new_tokens = self.spotify_auth.refresh_tokens()
+                if "access_token" not in new_tokens:
+                    raise ValueError("Failed to refresh the token.")
+                self._notify("on_token_refresh")
+                tokens = {**self.tokens, **new_tokens}
+                self.spotify_auth.store_tokens(tokens)
+                self._use_tokens(tokens)
+
+    def _refresh_token_if_required(self, response, rejected: Optional[str] = None):
         if response.status_code == 401:
-            new_tokens = self.spotify_auth.refresh_tokens()
-            if "access_token" in new_tokens:
-                self.tokens.update(new_tokens)
-                self.spotify_auth.store_tokens(self.tokens)
-                self.headers = {
-                    "Authorization": f'Bearer {self.tokens["access_token"]}'
-                }
-                return True
-            else:
-                raise ValueError("Failed to refresh the token.")
+            self._refresh_tokens(rejected)
+            return True
         return False
 
+    def _schedule_refresh(self):
+        if not self.background_refresh:
+            return
+        self.cancel_refresh()
+        expires_at = self.tokens.get("expires_at")
+        delay = 0.0
+        if isinstance(expires_at, (int, float)):
+            delay = max(0.0, expires_at - self.refresh_leeway - self._clock())
+        self._refresh_timer = threading.Timer(delay, self._background_refresh)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _background_refresh(self):
+        try:
+            self._refresh_tokens(self.headers.get("Authorization"))
+        except Exception:
+            # The next request notices the stale token and refreshes in the foreground.
+            pass
+
+    def cancel_refresh(self):
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
     def _navigate_to_item_path(self, response, path: str):
         items = response
         for attr in path.split("."):
@@ -154,19 +348,22 @@ class SpotifyRequestManager:
     ):
         limit = params.get("limit", 50)
         offset = params.get("offset", 0)
+        interner = self.interner
         while True:
             params.update({"limit": limit, "offset": offset})
             response = self.get(endpoint, params=params, include_market=include_market)
-            import pdb
-
             items = self._navigate_to_item_path(response, item_path)
 
             for item in items:
-                yield convert_func(item)
+                if interner is None:
+                    yield convert_func(item)
+                else:
+                    yield interner.intern(convert_func(item))
 
             next_value = self._navigate_to_item_path(response, next_path)
 
-            if next_value is None:
+            # A `fields` projection without `next` yields {} rather than None.
+            if not next_value:
                 break
             offset += limit
 
@@ -183,6 +380,7 @@ class SpotifyRequestManager:
         limit = params.get("limit", 50)
         offset = params.get("offset", 0)
         items_returned = 0
+        interner = self.interner
 
         while True:
             params.update({"limit": limit, "offset": offset})
@@ -192,11 +390,15 @@ class SpotifyRequestManager:
             for item in items:
                 if items_returned >= max_items:
                     return
-                yield convert_func(item)
+                if interner is None:
+                    yield convert_func(item)
+                else:
+                    yield interner.intern(convert_func(item))
                 items_returned += 1
 
             next_value = self._navigate_to_item_path(response, next_path)
 
-            if next_value is None:
+            # A `fields` projection without `next` yields {} rather than None.
+            if not next_value:
                 break
             offset += limit
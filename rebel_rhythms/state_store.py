@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import quote, unquote
+
+
+class StateStore(ABC):
+    """Key/value persistence for sync state (mirrors, high-water marks, ...)."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def keys(self) -> Iterator[str]: ...
+
+
+class MemoryStateStore(StateStore):
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._data))
+
+
+class JsonFileStateStore(StateStore):
+    """One JSON file per key in `directory`, replaced atomically on write."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, quote(key, safe="") + ".json")
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            with open(self._path(key), "r") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(value, file, separators=(",", ":"))
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self) -> Iterator[str]:
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                yield unquote(name[: -len(".json")])
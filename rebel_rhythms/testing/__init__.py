@@ -0,0 +1,4 @@
+"""Offline helpers for exercising the client without the real Web API."""
+
+from .catalog import SyntheticCatalog, page, spotify_id
+from .server import AppTransport, FakeSpotifyApp, FakeSpotifyServer, Faults
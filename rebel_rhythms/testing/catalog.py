@@ -0,0 +1,284 @@
+import random
+from typing import Dict, List, Optional, Sequence
+
+API_URL = "https://api.spotify.com"
+OPEN_URL = "https://open.spotify.com"
+
+_WORDS = (
+    "night",
+    "city",
+    "echo",
+    "fire",
+    "golden",
+    "river",
+    "Beyoncé",
+    "Sigur Rós",
+    "blue",
+    "motion",
+    "electric",
+    "dream",
+    "Mötley",
+    "shadow",
+    "summer",
+    "Ñandú",
+    "velvet",
+    "signal",
+    "wild",
+    "heart",
+    "north",
+    "neon",
+    "glass",
+    "static",
+)
+_GENRES = ("rock", "pop", "indie", "jazz", "electronic", "folk", "hip hop", "metal")
+
+
+def spotify_id(kind: str, index: int) -> str:
+    """A valid, deterministic 22-character ID, distinct per kind."""
+    return f"{kind[0]}{index:021d}"
+
+
+def page(
+    items: Sequence,
+    href: str,
+    limit: int = 20,
+    offset: int = 0,
+    total: Optional[int] = None,
+) -> Dict:
+    """Wrap a slice of `items` in a Spotify paging object."""
+    total = len(items) if total is None else total
+    sliced = list(items[offset : offset + limit])
+    has_next = offset + limit < total
+    separator = "&" if "?" in href else "?"
+    return {
+        "href": f"{href}{separator}offset={offset}&limit={limit}",
+        "items": sliced,
+        "limit": limit,
+        "offset": offset,
+        "next": (
+            f"{href}{separator}offset={offset + limit}&limit={limit}"
+            if has_next
+            else None
+        ),
+        "previous": (
+            f"{href}{separator}offset={max(0, offset - limit)}&limit={limit}"
+            if offset
+            else None
+        ),
+        "total": total,
+    }
+
+
+class SyntheticCatalog:
+    """Deterministic fake catalog of full Web API objects.
+
+    Objects are generated on demand from their index, so catalogs of any size
+    cost nothing until used. The same `seed` always yields the same data;
+    `change_track()` overrides individual fields of a generated track.
+    """
+
+    def __init__(
+        self,
+        tracks: int = 1000,
+        albums: Optional[int] = None,
+        artists: Optional[int] = None,
+        seed: int = 0,
+    ):
+        self.track_count = tracks
+        self.album_count = albums or max(1, tracks // 10)
+        self.artist_count = artists or max(1, self.album_count // 3)
+        self.seed = seed
+        self.track_changes: Dict[int, Dict] = {}
+
+    def change_track(self, index: int, **fields) -> None:
+        """Override fields of one track, e.g. `change_track(3, is_playable=False)`."""
+        self.track_changes.setdefault(index, {}).update(fields)
+
+    def _rng(self, kind: str, index: int) -> random.Random:
+        return random.Random(f"{self.seed}:{kind}:{index}")
+
+    def _title(self, rng: random.Random, words: int) -> str:
+        return " ".join(rng.choice(_WORDS) for _ in range(words)).title()
+
+    def _object(self, kind: str, index: int) -> Dict:
+        object_id = spotify_id(kind, index)
+        return {
+            "external_urls": {"spotify": f"{OPEN_URL}/{kind}/{object_id}"},
+            "href": f"{API_URL}/v1/{kind}s/{object_id}",
+            "id": object_id,
+            "type": kind,
+            "uri": f"spotify:{kind}:{object_id}",
+        }
+
+    def _images(self, kind: str, index: int) -> List[Dict]:
+        return [
+            {
+                "height": size,
+                "width": size,
+                "url": f"https://i.scdn.co/image/{kind}{index}-{size}",
+            }
+            for size in (640, 300, 64)
+        ]
+
+    def track_ids(self) -> List[str]:
+        return [spotify_id("track", i) for i in range(self.track_count)]
+
+    def simplified_artist(self, index: int) -> Dict:
+        rng = self._rng("artist", index)
+        return {**self._object("artist", index), "name": self._title(rng, 2)}
+
+    def artist(self, index: int) -> Dict:
+        rng = self._rng("artist", index)
+        return {
+            **self.simplified_artist(index),
+            "followers": {"href": None, "total": rng.randrange(10_000_000)},
+            "genres": rng.sample(_GENRES, 2),
+            "images": self._images("artist", index),
+            "popularity": rng.randrange(101),
+        }
+
+    def _album_artist(self, index: int) -> int:
+        return index % self.artist_count
+
+    def simplified_album(self, index: int) -> Dict:
+        rng = self._rng("album", index)
+        year = 1960 + index % 64
+        return {
+            **self._object("album", index),
+            "album_type": rng.choice(("album", "single", "compilation")),
+            "total_tracks": max(1, self.track_count // self.album_count),
+            "available_markets": ["UA", "US", "GB"],
+            "images": self._images("album", index),
+            "name": self._title(rng, 3),
+            "release_date": f"{year}-{1 + index % 12:02d}-{1 + index % 28:02d}",
+            "release_date_precision": "day",
+            "artists": [self.simplified_artist(self._album_artist(index))],
+        }
+
+    def album(self, index: int) -> Dict:
+        rng = self._rng("album", index)
+        album = self.simplified_album(index)
+        album.update(
+            {
+                "artists": [self.artist(self._album_artist(index))],
+                "copyrights": [
+                    {"text": f"(C) {album['release_date'][:4]} Label", "type": "C"}
+                ],
+                "external_ids": {"upc": f"{index:012d}"},
+                "genres": [],
+                "label": f"Label {index % 50}",
+                "popularity": rng.randrange(101),
+            }
+        )
+        return album
+
+    def track(self, index: int) -> Dict:
+        rng = self._rng("track", index)
+        album_index = index % self.album_count
+        artist = self.artist(self._album_artist(album_index))
+        track = {
+            **self._object("track", index),
+            "album": self.simplified_album(album_index),
+            "artists": [artist],
+            "available_markets": ["UA", "US", "GB"],
+            "disc_number": 1,
+            "duration_ms": 120_000 + rng.randrange(240_000),
+            "explicit": rng.random() < 0.1,
+            "external_ids": {
+                "isrc": f"US{'ABCDEFGHIJ'[index % 10]}{index % 100:02d}{index:07d}"[:12]
+            },
+            "is_playable": True,
+            "name": self._title(rng, rng.randint(1, 4)),
+            "popularity": rng.randrange(101),
+            "preview_url": None,
+            "track_number": 1 + index // self.album_count,
+            "is_local": False,
+        }
+        changes = self.track_changes.get(index)
+        if changes:
+            track.update(changes)
+        return track
+
+    def audio_features(self, index: int) -> Dict:
+        rng = self._rng("features", index)
+        track = self._object("track", index)
+        return {
+            "acousticness": rng.random(),
+            "analysis_url": f"{API_URL}/v1/audio-analysis/{track['id']}",
+            "danceability": rng.random(),
+            "duration_ms": 120_000 + rng.randrange(240_000),
+            "energy": rng.random(),
+            "id": track["id"],
+            "instrumentalness": rng.random(),
+            "key": rng.randrange(12),
+            "liveness": rng.random(),
+            "loudness": -rng.random() * 20,
+            "mode": rng.randrange(2),
+            "speechiness": rng.random(),
+            "tempo": 60 + rng.random() * 120,
+            "time_signature": 4,
+            "track_href": track["href"],
+            "type": "audio_features",
+            "uri": track["uri"],
+            "valence": rng.random(),
+        }
+
+    def user(self, user_id: str = "tester") -> Dict:
+        return {
+            "display_name": user_id.title(),
+            "external_urls": {"spotify": f"{OPEN_URL}/user/{user_id}"},
+            "followers": {"href": None, "total": 0},
+            "href": f"{API_URL}/v1/users/{user_id}",
+            "id": user_id,
+            "images": [],
+            "type": "user",
+            "uri": f"spotify:user:{user_id}",
+        }
+
+    def saved_item(
+        self, kind: str, index: int, added_at: str = "2020-01-01T00:00:00Z"
+    ) -> Dict:
+        obj = self.track(index) if kind == "track" else self.album(index)
+        return {"added_at": added_at, kind: obj}
+
+    def playlist_item(
+        self,
+        track: Optional[Dict],
+        added_at: str = "2020-01-01T00:00:00Z",
+        added_by: str = "tester",
+    ) -> Dict:
+        user = self.user(added_by)
+        del user["display_name"], user["images"], user["followers"]
+        return {
+            "added_at": added_at,
+            "added_by": user,
+            "is_local": bool(track and track.get("is_local")),
+            "track": track,
+        }
+
+    def simplified_playlist(
+        self,
+        playlist_id: str,
+        name: str,
+        total: int,
+        snapshot_id: str,
+        owner: str = "tester",
+    ) -> Dict:
+        return {
+            "collaborative": False,
+            "description": "",
+            "external_urls": {"spotify": f"{OPEN_URL}/playlist/{playlist_id}"},
+            "href": f"{API_URL}/v1/playlists/{playlist_id}",
+            "id": playlist_id,
+            "images": [],
+            "name": name,
+            "owner": {k: v for k, v in self.user(owner).items() if k != "images"},
+            "public": False,
+            "snapshot_id": snapshot_id,
+            "tracks": {
+                "href": f"{API_URL}/v1/playlists/{playlist_id}/tracks",
+                "total": total,
+            },
+            "type": "playlist",
+            "uri": f"spotify:playlist:{playlist_id}",
+        }
@@ -0,0 +1,1107 @@
+"""A local stand-in for the Web API, in process or over real HTTP."""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from rebel_rhythms.normalization import normalize_text
+from rebel_rhythms.testing.catalog import SyntheticCatalog, page, spotify_id
+from rebel_rhythms.token_store import MemoryTokenStore
+from rebel_rhythms.transport import RecordedResponse, Transport
+from rebel_rhythms.validators import split_fields
+
+EPOCH = datetime(2020, 1, 1)
+
+# Batch limits of the real API, enforced so that chunking bugs show up here.
+_ID_LIMITS = {"tracks": 50, "albums": 20, "artists": 50, "audio-features": 100}
+_SNAPSHOT_HISTORY = 20
+_SEARCH_FILTER = re.compile(r'(\w+):"([^"]*)"|(\w+):(\S+)|"([^"]*)"|(\S+)')
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    params: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Dict:
+        try:
+            return json.loads(self.body) if self.body else {}
+        except ValueError:
+            raise ApiError(400, "Error parsing JSON.")
+
+    def ids(self, limit: Optional[int] = None) -> List[str]:
+        """IDs from `?ids=` or, for library writes, from the JSON body."""
+        if "ids" in self.params:
+            ids = self.params["ids"].split(",") if self.params["ids"] else []
+        else:
+            ids = self.json().get("ids") or []
+            ids = [ids] if isinstance(ids, str) else ids
+        if not ids:
+            raise ApiError(400, "Missing ids")
+        if limit is not None and len(ids) > limit:
+            raise ApiError(400, "Too many ids requested")
+        return ids
+
+
+class Response(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class Faults:
+    """Failure and latency settings, applied to every API request.
+
+    Rates are probabilities per request, drawn from a seeded generator so a
+    run with the same seed fails the same requests. `fail_next` queues exact
+    failures that take precedence over the random ones.
+    """
+
+    SETTINGS = (
+        "latency",
+        "jitter",
+        "error_rate",
+        "error_status",
+        "rate_limit_rate",
+        "retry_after",
+    )
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.queued: List[Tuple[int, Optional[float]]] = []
+        self._rng = random.Random(seed)
+
+    def delay(self) -> float:
+        return self.latency + (
+            self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+        )
+
+    def failure(self) -> Optional[Tuple[int, Optional[float]]]:
+        if self.queued:
+            return self.queued.pop(0)
+        roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return 429, self.retry_after
+        if roll < self.rate_limit_rate + self.error_rate:
+            return self.error_status, None
+        return None
+
+
+class FakePlaylist:
+    def __init__(
+        self,
+        playlist_id: str,
+        name: str,
+        owner: str,
+        description: str = "",
+        public: bool = False,
+    ):
+        self.id = playlist_id
+        self.name = name
+        self.owner = owner
+        self.description = description
+        self.public = public
+        self.collaborative = False
+        self.followers: Set[str] = set()
+        # (track index, added_at); a None index is an item that is no longer
+        # available and comes back with `track: null`.
+        self.entries: List[Tuple[Optional[int], str]] = []
+        self.version = 0
+        self.snapshots: "OrderedDict[str, List[Tuple[Optional[int], str]]]" = (
+            OrderedDict()
+        )
+        self.commit()
+
+    @property
+    def snapshot_id(self) -> str:
+        return next(reversed(self.snapshots))
+
+    @property
+    def tracks(self) -> List[Optional[int]]:
+        return [index for index, _ in self.entries]
+
+    def commit(self) -> str:
+        self.version += 1
+        snapshot_id = f"{self.id}:{self.version}"
+        self.snapshots[snapshot_id] = list(self.entries)
+        while len(self.snapshots) > _SNAPSHOT_HISTORY:
+            self.snapshots.popitem(last=False)
+        return snapshot_id
+
+
+class FakeSpotifyApp:
+    """The API's behaviour, independent of HTTP: `handle()` maps a request to a response.
+
+    State (library, follows, playlists and their snapshots, issued tokens)
+    lives in memory; catalog objects come from a `SyntheticCatalog`.
+    `client()` returns a `SpotifyClient` that calls `handle()` directly, so
+    tests run without a socket. `intercept`, if set, sees every API request
+    before it is dispatched and may raise `ApiError` or change state.
+    """
+
+    def __init__(
+        self,
+        catalog: Optional[SyntheticCatalog] = None,
+        base_url: str = "",
+        user_id: str = "tester",
+        token_ttl: float = 3600,
+        faults: Optional[Faults] = None,
+    ):
+        self.catalog = catalog or SyntheticCatalog()
+        self.base_url = base_url
+        self.user_id = user_id
+        self.token_ttl = token_ttl
+        self.faults = faults or Faults()
+        self.saved: Dict[str, "OrderedDict[int, str]"] = {
+            "tracks": OrderedDict(),
+            "albums": OrderedDict(),
+        }
+        self.following: Dict[str, set] = {"artist": set(), "user": set()}
+        self.playlists: Dict[str, FakePlaylist] = {}
+        self.access_tokens: Dict[str, float] = {}
+        self.refresh_tokens: Set[str] = set()
+        self.log: List[Tuple[str, str, int]] = []
+        self.requests: List[Request] = []
+        self.relinks: Dict[int, int] = {}
+        self.intercept: Optional[Callable[[Request], None]] = None
+        self._clock = 0
+        self._search_index: Dict[str, List[Dict[str, str]]] = {}
+        self._lock = threading.RLock()
+        self._routes = self._build_routes()
+
+    # --- setup -------------------------------------------------------------
+
+    def _added_at(self) -> str:
+        self._clock += 1
+        return (EPOCH + timedelta(seconds=self._clock)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def save(self, kind: str, indexes) -> None:
+        with self._lock:
+            for index in indexes:
+                self.saved[kind].pop(index, None)
+                self.saved[kind][index] = self._added_at()
+
+    def add_playlist(
+        self, name: str, track_indexes=(), owner: Optional[str] = None
+    ) -> FakePlaylist:
+        with self._lock:
+            playlist_id = spotify_id("playlist", len(self.playlists))
+            playlist = FakePlaylist(playlist_id, name, owner or self.user_id)
+            playlist.entries = [(index, self._added_at()) for index in track_indexes]
+            playlist.commit()
+            self.playlists[playlist_id] = playlist
+            return playlist
+
+    def relink(self, original: int, replacement: int) -> None:
+        """Serve `replacement` wherever a playlist holds `original`, with `linked_from`."""
+        with self._lock:
+            self.relinks[original] = replacement
+
+    def issue_tokens(self, refresh: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            access_token = uuid.uuid4().hex
+            expires_at = time.time() + self.token_ttl
+            self.access_tokens[access_token] = expires_at
+            tokens: Dict[str, Any] = {
+                "access_token": access_token,
+                "token_type": "Bearer",
+                "expires_in": self.token_ttl,
+                "expires_at": expires_at,
+            }
+            if refresh:
+                tokens["refresh_token"] = uuid.uuid4().hex
+                self.refresh_tokens.add(tokens["refresh_token"])
+            return tokens
+
+    def expire_tokens(self) -> None:
+        """Make every issued access token invalid, as if it had timed out."""
+        with self._lock:
+            for token in self.access_tokens:
+                self.access_tokens[token] = 0
+
+    def count(
+        self,
+        method: Optional[str] = None,
+        path_prefix: str = "",
+        status: Optional[int] = None,
+    ) -> int:
+        return sum(
+            1
+            for m, path, s in list(self.log)
+            if (method is None or m == method)
+            and path.startswith(path_prefix)
+            and (status is None or s == status)
+        )
+
+    def client(self, **kwargs):
+        """A `SpotifyClient` that sends its API requests straight to `handle()`."""
+        from rebel_rhythms.spotify_client import SpotifyClient
+
+        kwargs.setdefault("token_store", MemoryTokenStore(self.issue_tokens()))
+        return SpotifyClient(
+            "client_id", "client_secret", transport=AppTransport(self), **kwargs
+        )
+
+    # --- dispatch ----------------------------------------------------------
+
+    def handle(self, request: Request) -> Response:
+        is_token_request = request.path.rstrip("/") == "/api/token"
+        try:
+            if not is_token_request:
+                delay = self.faults.delay()
+                if delay:
+                    time.sleep(delay)
+                # Outside the lock, so an interceptor can hold a request back
+                # while others go through.
+                if self.intercept is not None:
+                    self.intercept(request)
+            with self._lock:
+                if is_token_request:
+                    response = self._json(200, self._token(request))
+                else:
+                    response = self._dispatch(request)
+        except ApiError as e:
+            response = self._error(e)
+        with self._lock:
+            self.log.append((request.method, request.path, response.status))
+            self.requests.append(request)
+        return response
+
+    def _error(self, error: ApiError) -> Response:
+        response = self._json(
+            error.status, {"error": {"status": error.status, "message": error.message}}
+        )
+        if error.retry_after is not None:
+            response.headers["Retry-After"] = str(error.retry_after)
+        return response
+
+    def _dispatch(self, request: Request) -> Response:
+        failure = self.faults.failure()
+        if failure is not None:
+            raise ApiError(failure[0], "Injected failure", failure[1])
+        self._authorize(request)
+        for method, pattern, handler in self._routes:
+            match = pattern.fullmatch(request.path)
+            if match and method == request.method:
+                result = handler(request, *match.groups())
+                if result is None:
+                    return Response(200, {}, b"")
+                return self._json(201 if request.method == "POST" else 200, result)
+        raise ApiError(404, "Service not found")
+
+    def _authorize(self, request: Request) -> None:
+        header = request.headers.get("authorization", "")
+        token = header[len("Bearer ") :] if header.startswith("Bearer ") else None
+        if token is None:
+            raise ApiError(401, "No token provided")
+        if self.access_tokens.get(token, 0) <= time.time():
+            raise ApiError(401, "The access token expired")
+
+    def _json(self, status: int, payload) -> Response:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        return Response(status, {"Content-Type": "application/json"}, body)
+
+    def _token(self, request: Request) -> Dict:
+        form = {k: v[0] for k, v in parse_qs(request.body.decode()).items()}
+        grant_type = form.get("grant_type")
+        if grant_type == "client_credentials":
+            tokens = self.issue_tokens(refresh=False)
+        elif grant_type == "authorization_code" and form.get("code"):
+            tokens = self.issue_tokens()
+        elif (
+            grant_type == "refresh_token"
+            and form.get("refresh_token") in self.refresh_tokens
+        ):
+            tokens = self.issue_tokens(refresh=False)
+        else:
+            raise ApiError(400, "invalid_grant")
+        del tokens["expires_at"]
+        return tokens
+
+    def _build_routes(self) -> List[Tuple[str, "re.Pattern", Callable]]:
+        routes: List[Tuple[str, str, Callable]] = [
+            ("GET", r"/v1/albums", self._get_albums),
+            ("GET", r"/v1/albums/(\w+)", self._get_album),
+            ("GET", r"/v1/albums/(\w+)/tracks", self._get_album_tracks),
+            ("GET", r"/v1/artists", self._get_artists),
+            ("GET", r"/v1/artists/(\w+)", self._get_artist),
+            ("GET", r"/v1/artists/(\w+)/albums", self._get_artist_albums),
+            ("GET", r"/v1/artists/(\w+)/top-tracks", self._get_artist_top_tracks),
+            ("GET", r"/v1/artists/(\w+)/related-artists", self._get_related_artists),
+            ("GET", r"/v1/tracks", self._get_tracks),
+            ("GET", r"/v1/tracks/(\w+)", self._get_track),
+            ("GET", r"/v1/audio-features", self._get_audio_features),
+            ("GET", r"/v1/audio-features/(\w+)", self._get_track_audio_features),
+            ("GET", r"/v1/me", self._get_me),
+            ("GET", r"/v1/users/([\w.-]+)", self._get_user),
+            ("GET", r"/v1/me/top/(tracks|artists)", self._get_top_items),
+            ("GET", r"/v1/me/(tracks|albums)", self._get_saved),
+            ("PUT", r"/v1/me/(tracks|albums)", self._save),
+            ("DELETE", r"/v1/me/(tracks|albums)", self._unsave),
+            ("GET", r"/v1/me/(tracks|albums)/contains", self._saved_contains),
+            ("PUT", r"/v1/me/following", self._follow),
+            ("DELETE", r"/v1/me/following", self._unfollow),
+            ("GET", r"/v1/me/following/contains", self._following_contains),
+            ("GET", r"/v1/me/playlists", self._get_my_playlists),
+            ("POST", r"/v1/me/playlists", self._create_playlist),
+            ("POST", r"/v1/users/([\w.-]+)/playlists", self._create_playlist),
+            ("GET", r"/v1/users/([\w.-]+)/playlists", self._get_user_playlists),
+            ("GET", r"/v1/playlists/(\w+)", self._get_playlist),
+            ("PUT", r"/v1/playlists/(\w+)", self._change_playlist),
+            ("GET", r"/v1/playlists/(\w+)/tracks", self._get_playlist_items),
+            ("POST", r"/v1/playlists/(\w+)/tracks", self._add_playlist_items),
+            ("PUT", r"/v1/playlists/(\w+)/tracks", self._update_playlist_items),
+            ("DELETE", r"/v1/playlists/(\w+)/tracks", self._remove_playlist_items),
+            ("PUT", r"/v1/playlists/(\w+)/followers", self._follow_playlist),
+            ("DELETE", r"/v1/playlists/(\w+)/followers", self._unfollow_playlist),
+            ("GET", r"/v1/search", self._search),
+        ]
+        return [(method, re.compile(path), handler) for method, path, handler in routes]
+
+    # --- helpers -----------------------------------------------------------
+
+    def _index(self, kind: str, object_id: str) -> Optional[int]:
+        counts = {
+            "track": self.catalog.track_count,
+            "album": self.catalog.album_count,
+            "artist": self.catalog.artist_count,
+        }
+        if (
+            len(object_id) != 22
+            or object_id[0] != kind[0]
+            or not object_id[1:].isdigit()
+        ):
+            return None
+        index = int(object_id[1:])
+        return index if index < counts[kind] else None
+
+    def _require(self, kind: str, object_id: str) -> int:
+        index = self._index(kind, object_id)
+        if index is None:
+            raise ApiError(404, "Resource not found")
+        return index
+
+    def _track_index_for_uri(self, uri: str) -> int:
+        prefix = "spotify:track:"
+        index = (
+            self._index("track", uri[len(prefix) :]) if uri.startswith(prefix) else None
+        )
+        if index is None:
+            raise ApiError(400, f"Invalid track uri: {uri}")
+        return index
+
+    def _paging(
+        self, request: Request, default_limit: int = 20, max_limit: int = 50
+    ) -> Tuple[int, int]:
+        try:
+            limit = int(request.params.get("limit", default_limit))
+            offset = int(request.params.get("offset", 0))
+        except ValueError:
+            raise ApiError(400, "Invalid limit or offset")
+        if not 0 < limit <= max_limit or offset < 0:
+            raise ApiError(400, "Invalid limit")
+        return limit, offset
+
+    def _page(self, request: Request, items, limit: int, offset: int) -> Dict:
+        others = {
+            k: v for k, v in request.params.items() if k not in ("limit", "offset")
+        }
+        href = f"{self.base_url}{request.path}"
+        if others:
+            href = f"{href}?{urlencode(others)}"
+        return page(items, href, limit, offset)
+
+    def _batch(
+        self, request: Request, endpoint: str, kind: str, render: Callable[[int], Dict]
+    ) -> List[Optional[Dict]]:
+        """Render each requested ID; unknown IDs come back as null, like the real API."""
+        indexes = [
+            self._index(kind, object_id)
+            for object_id in request.ids(_ID_LIMITS[endpoint])
+        ]
+        return [None if index is None else render(index) for index in indexes]
+
+    def _project(self, payload: Dict, fields: Optional[str]) -> Dict:
+        """Apply the top level of a `fields` filter, e.g. `items(track(uri)),next`."""
+        if not fields:
+            return payload
+        names = split_fields(fields)
+        return {key: value for key, value in payload.items() if key in names}
+
+    # --- catalog -----------------------------------------------------------
+
+    def _get_album(self, request, album_id):
+        return self.catalog.album(self._require("album", album_id))
+
+    def _get_albums(self, request):
+        return {"albums": self._batch(request, "albums", "album", self.catalog.album)}
+
+    def _album_track_indexes(self, album_index: int) -> range:
+        return range(album_index, self.catalog.track_count, self.catalog.album_count)
+
+    def _simplified_track(self, index: int) -> Dict:
+        track = self.catalog.track(index)
+        del track["album"]
+        return track
+
+    def _get_album_tracks(self, request, album_id):
+        indexes = self._album_track_indexes(self._require("album", album_id))
+        limit, offset = self._paging(request)
+        return self._page(
+            request, _Mapped(indexes, self._simplified_track), limit, offset
+        )
+
+    def _get_artist(self, request, artist_id):
+        return self.catalog.artist(self._require("artist", artist_id))
+
+    def _get_artists(self, request):
+        return {
+            "artists": self._batch(request, "artists", "artist", self.catalog.artist)
+        }
+
+    def _artist_album_indexes(self, artist_index: int) -> range:
+        return range(artist_index, self.catalog.album_count, self.catalog.artist_count)
+
+    def _get_artist_albums(self, request, artist_id):
+        indexes = self._artist_album_indexes(self._require("artist", artist_id))
+        limit, offset = self._paging(request)
+        return self._page(
+            request, _Mapped(indexes, self.catalog.simplified_album), limit, offset
+        )
+
+    def _get_artist_top_tracks(self, request, artist_id):
+        artist_index = self._require("artist", artist_id)
+        indexes = [
+            track
+            for album in self._artist_album_indexes(artist_index)[:10]
+            for track in self._album_track_indexes(album)[:1]
+        ]
+        return {"tracks": [self.catalog.track(i) for i in indexes[:10]]}
+
+    def _get_related_artists(self, request, artist_id):
+        artist_index = self._require("artist", artist_id)
+        count = self.catalog.artist_count
+        related = {(artist_index + step) % count for step in range(1, min(count, 21))}
+        return {"artists": [self.catalog.artist(i) for i in sorted(related)]}
+
+    def _get_track(self, request, track_id):
+        return self.catalog.track(self._require("track", track_id))
+
+    def _get_tracks(self, request):
+        return {"tracks": self._batch(request, "tracks", "track", self.catalog.track)}
+
+    def _get_audio_features(self, request):
+        return {
+            "audio_features": self._batch(
+                request, "audio-features", "track", self.catalog.audio_features
+            )
+        }
+
+    def _get_track_audio_features(self, request, track_id):
+        return self.catalog.audio_features(self._require("track", track_id))
+
+    # --- users -------------------------------------------------------------
+
+    def _get_me(self, request):
+        return {
+            **self.catalog.user(self.user_id),
+            "country": "UA",
+            "email": f"{self.user_id}@example.com",
+            "explicit_content": {"filter_enabled": False, "filter_locked": False},
+            "product": "premium",
+        }
+
+    def _get_user(self, request, user_id):
+        return self.catalog.user(user_id)
+
+    def _get_top_items(self, request, kind):
+        limit, offset = self._paging(request)
+        if kind == "tracks":
+            items = _Mapped(
+                range(min(50, self.catalog.track_count)), self.catalog.track
+            )
+        else:
+            items = _Mapped(
+                range(min(50, self.catalog.artist_count)), self.catalog.artist
+            )
+        return self._page(request, items, limit, offset)
+
+    # --- library and following --------------------------------------------
+
+    def _get_saved(self, request, kind):
+        limit, offset = self._paging(request)
+        newest_first = list(reversed(self.saved[kind].items()))
+        render = self.catalog.track if kind == "tracks" else self.catalog.album
+        items = _Mapped(
+            newest_first,
+            lambda entry: {"added_at": entry[1], kind[:-1]: render(entry[0])},
+        )
+        return self._page(request, items, limit, offset)
+
+    def _library_indexes(self, request, kind) -> List[int]:
+        indexes = []
+        for object_id in request.ids(50):
+            index = self._index(kind[:-1], object_id)
+            if index is None:
+                raise ApiError(400, f"Invalid id: {object_id}")
+            indexes.append(index)
+        return indexes
+
+    def _save(self, request, kind):
+        for index in self._library_indexes(request, kind):
+            if index not in self.saved[kind]:
+                self.saved[kind][index] = self._added_at()
+
+    def _unsave(self, request, kind):
+        for index in self._library_indexes(request, kind):
+            self.saved[kind].pop(index, None)
+
+    def _saved_contains(self, request, kind):
+        return [self._index(kind[:-1], i) in self.saved[kind] for i in request.ids(50)]
+
+    def _follow_type(self, request) -> str:
+        follow_type = request.params.get("type")
+        if follow_type not in self.following:
+            raise ApiError(400, "type must be artist or user")
+        return follow_type
+
+    def _follow(self, request):
+        self.following[self._follow_type(request)].update(request.ids(50))
+
+    def _unfollow(self, request):
+        self.following[self._follow_type(request)].difference_update(request.ids(50))
+
+    def _following_contains(self, request):
+        followed = self.following[self._follow_type(request)]
+        return [object_id in followed for object_id in request.ids(50)]
+
+    # --- playlists ---------------------------------------------------------
+
+    def _playlist(self, playlist_id: str) -> FakePlaylist:
+        if playlist_id not in self.playlists:
+            raise ApiError(404, "Resource not found")
+        return self.playlists[playlist_id]
+
+    def _simplified_playlist(self, playlist: FakePlaylist) -> Dict:
+        simplified = self.catalog.simplified_playlist(
+            playlist.id,
+            playlist.name,
+            len(playlist.entries),
+            playlist.snapshot_id,
+            playlist.owner,
+        )
+        simplified.update(
+            description=playlist.description,
+            public=playlist.public,
+            collaborative=playlist.collaborative,
+        )
+        return simplified
+
+    def _visible_playlists(self, user_id: str) -> List[FakePlaylist]:
+        return [
+            playlist
+            for playlist in self.playlists.values()
+            if playlist.owner == user_id
+            or (user_id == self.user_id and self.user_id in playlist.followers)
+        ]
+
+    def _get_my_playlists(self, request):
+        limit, offset = self._paging(request)
+        items = _Mapped(
+            self._visible_playlists(self.user_id), self._simplified_playlist
+        )
+        return self._page(request, items, limit, offset)
+
+    def _get_user_playlists(self, request, user_id):
+        limit, offset = self._paging(request)
+        items = _Mapped(self._visible_playlists(user_id), self._simplified_playlist)
+        return self._page(request, items, limit, offset)
+
+    def _create_playlist(self, request, user_id=None):
+        payload = request.json()
+        if not payload.get("name"):
+            raise ApiError(400, "Missing required field: name")
+        playlist = self.add_playlist(payload["name"])
+        playlist.description = payload.get("description") or ""
+        playlist.public = bool(payload.get("public", True))
+        playlist.collaborative = bool(payload.get("collaborative", False))
+        return self._get_playlist(request, playlist.id)
+
+    def _playlist_track(self, index: Optional[int]) -> Optional[Dict]:
+        if index is None:
+            return None
+        if index not in self.relinks:
+            return self.catalog.track(index)
+        track = self.catalog.track(self.relinks[index])
+        original = self.catalog.track(index)
+        track["linked_from"] = {
+            key: original[key] for key in ("external_urls", "href", "id", "type", "uri")
+        }
+        return track
+
+    def _playlist_item(self, entry: Tuple[Optional[int], str], owner: str) -> Dict:
+        index, added_at = entry
+        return self.catalog.playlist_item(self._playlist_track(index), added_at, owner)
+
+    def _items_page(
+        self, request, playlist: FakePlaylist, limit: int, offset: int
+    ) -> Dict:
+        items = _Mapped(
+            playlist.entries, lambda entry: self._playlist_item(entry, playlist.owner)
+        )
+        return self._page(
+            request._replace(path=f"/v1/playlists/{playlist.id}/tracks"),
+            items,
+            limit,
+            offset,
+        )
+
+    def _get_playlist(self, request, playlist_id):
+        playlist = self._playlist(playlist_id)
+        fields = request.params.get("fields")
+        response = self._simplified_playlist(playlist)
+        response["followers"] = {"href": None, "total": len(playlist.followers)}
+        if not fields or "tracks" in split_fields(fields):
+            response["tracks"] = self._items_page(request, playlist, 100, 0)
+        return self._project(response, fields)
+
+    def _change_playlist(self, request, playlist_id):
+        playlist = self._playlist(playlist_id)
+        for key, value in request.json().items():
+            if key in ("name", "description", "public", "collaborative"):
+                setattr(playlist, key, value)
+
+    def _get_playlist_items(self, request, playlist_id):
+        playlist = self._playlist(playlist_id)
+        limit, offset = self._paging(request, default_limit=100, max_limit=100)
+        return self._project(
+            self._items_page(request, playlist, limit, offset),
+            request.params.get("fields"),
+        )
+
+    def _uris(self, uris) -> List[int]:
+        if len(uris) > 100:
+            raise ApiError(400, "Too many tracks, the maximum is 100")
+        return [self._track_index_for_uri(uri) for uri in uris]
+
+    def _add_playlist_items(self, request, playlist_id):
+        playlist = self._playlist(playlist_id)
+        payload = request.json()
+        indexes = self._uris(payload.get("uris") or [])
+        position = payload.get("position")
+        position = len(playlist.entries) if position is None else position
+        if not 0 <= position <= len(playlist.entries):
+            raise ApiError(400, "Index out of bounds")
+        playlist.entries[position:position] = [
+            (index, self._added_at()) for index in indexes
+        ]
+        return {"snapshot_id": playlist.commit()}
+
+    def _update_playlist_items(self, request, playlist_id):
+        playlist = self._playlist(playlist_id)
+        payload = request.json()
+        if "uris" in payload:
+            playlist.entries = [
+                (index, self._added_at()) for index in self._uris(payload["uris"])
+            ]
+            return {"snapshot_id": playlist.commit()}
+        start = payload.get("range_start")
+        insert_before = payload.get("insert_before")
+        length = payload.get("range_length", 1)
+        size = len(playlist.entries)
+        if (
+            start is None
+            or insert_before is None
+            or start + length > size
+            or insert_before > size
+        ):
+            raise ApiError(400, "Index out of bounds")
+        moved = playlist.entries[start : start + length]
+        remaining = playlist.entries[:start] + playlist.entries[start + length :]
+        if insert_before > start:
+            insert_before -= length
+        remaining[insert_before:insert_before] = moved
+        playlist.entries = remaining
+        return {"snapshot_id": playlist.commit()}
+
+    def _remove_playlist_items(self, request, playlist_id):
+        playlist = self._playlist(playlist_id)
+        payload = request.json()
+        tracks = payload.get("tracks") or []
+        if len(tracks) > 100:
+            raise ApiError(400, "Too many tracks, the maximum is 100")
+        snapshot_id = payload.get("snapshot_id") or playlist.snapshot_id
+        if snapshot_id not in playlist.snapshots:
+            raise ApiError(400, "Invalid snapshot id")
+        base = playlist.snapshots[snapshot_id]
+        # Positions refer to the given snapshot; entries are matched by identity
+        # so that edits made since then are preserved.
+        doomed_entries, doomed_tracks = [], set()
+        for spec in tracks:
+            index = self._track_index_for_uri(spec.get("uri", ""))
+            if "positions" not in spec:
+                doomed_tracks.add(index)
+                continue
+            for position in spec["positions"]:
+                if not 0 <= position < len(base) or base[position][0] != index:
+                    raise ApiError(
+                        400, "Could not remove tracks, please check parameters."
+                    )
+                doomed_entries.append(base[position])
+        remaining = list(playlist.entries)
+        for entry in doomed_entries:
+            if entry in remaining:
+                remaining.remove(entry)
+        playlist.entries = [
+            entry for entry in remaining if entry[0] not in doomed_tracks
+        ]
+        return {"snapshot_id": playlist.commit()}
+
+    def _follow_playlist(self, request, playlist_id):
+        self._playlist(playlist_id).followers.add(self.user_id)
+
+    def _unfollow_playlist(self, request, playlist_id):
+        self._playlist(playlist_id).followers.discard(self.user_id)
+
+    # --- search ------------------------------------------------------------
+
+    def _search_entries(self, kind: str) -> List[Dict[str, str]]:
+        """Normalized searchable text per catalog object, built on first search."""
+        if kind not in self._search_index:
+            if kind == "track":
+                entries = []
+                for i in range(self.catalog.track_count):
+                    track = self.catalog.track(i)
+                    entries.append(
+                        {
+                            "track": normalize_text(track["name"]),
+                            "artist": normalize_text(
+                                " ".join(a["name"] for a in track["artists"])
+                            ),
+                            "album": normalize_text(track["album"]["name"]),
+                            "isrc": track["external_ids"]["isrc"].upper(),
+                        }
+                    )
+            elif kind == "album":
+                entries = [
+                    {
+                        "album": normalize_text(album["name"]),
+                        "artist": normalize_text(album["artists"][0]["name"]),
+                    }
+                    for album in map(
+                        self.catalog.simplified_album, range(self.catalog.album_count)
+                    )
+                ]
+            else:
+                entries = [
+                    {
+                        "artist": normalize_text(
+                            self.catalog.simplified_artist(i)["name"]
+                        )
+                    }
+                    for i in range(self.catalog.artist_count)
+                ]
+            self._search_index[kind] = entries
+        return self._search_index[kind]
+
+    def _parse_query(self, query: str) -> Tuple[Dict[str, str], List[str]]:
+        filters, terms = {}, []
+        for match in _SEARCH_FILTER.finditer(query):
+            key, quoted, bare_key, bare, phrase, word = match.groups()
+            if key or bare_key:
+                filters[(key or bare_key).lower()] = quoted if key else bare
+            else:
+                terms.append(phrase if phrase is not None else word)
+        return filters, [normalize_text(term) for term in terms if normalize_text(term)]
+
+    def _matches(
+        self,
+        entry: Dict[str, str],
+        kind: str,
+        filters: Dict[str, str],
+        terms: List[str],
+    ) -> bool:
+        for key, value in filters.items():
+            if key == "isrc":
+                if entry.get("isrc") != value.upper():
+                    return False
+            elif key in entry and normalize_text(value) not in entry[key]:
+                return False
+        text = " ".join(entry.get(k, "") for k in (kind, "artist") if k in entry)
+        return all(term in text for term in terms)
+
+    def _search(self, request):
+        query = request.params.get("q")
+        types = [t for t in request.params.get("type", "").split(",") if t]
+        if not query or not types:
+            raise ApiError(400, "No search query or type")
+        limit, offset = self._paging(request)
+        filters, terms = self._parse_query(query)
+        response = {}
+        for kind in types:
+            if kind == "playlist":
+                items = _Mapped(
+                    [
+                        p
+                        for p in self.playlists.values()
+                        if all(term in normalize_text(p.name) for term in terms)
+                    ],
+                    self._simplified_playlist,
+                )
+            elif kind in ("track", "album", "artist"):
+                render = {
+                    "track": self.catalog.track,
+                    "album": self.catalog.simplified_album,
+                    "artist": self.catalog.artist,
+                }[kind]
+                hits = [
+                    i
+                    for i, entry in enumerate(self._search_entries(kind))
+                    if self._matches(entry, kind, filters, terms)
+                ]
+                items = _Mapped(hits, render)
+            else:
+                raise ApiError(400, f"Bad search type field {kind}")
+            response[f"{kind}s"] = self._page(request, items, limit, offset)
+        return response
+
+
+class _Mapped:
+    """Sequence adapter so `page()` only renders the slice it returns."""
+
+    def __init__(self, source, render: Callable):
+        self.source = source
+        self.render = render
+
+    def __len__(self):
+        return len(self.source)
+
+    def __getitem__(self, index):
+        return [self.render(item) for item in self.source[index]]
+
+
+class AppTransport(Transport):
+    """Hands each request to a `FakeSpotifyApp` in process, without HTTP."""
+
+    def __init__(self, app: FakeSpotifyApp):
+        self.app = app
+
+    def send(self, method: str, url: str, **kwargs):
+        url_parts = urlsplit(url)
+        params = {
+            k: v[0]
+            for k, v in parse_qs(url_parts.query, keep_blank_values=True).items()
+        }
+        params.update(
+            (k, str(v))
+            for k, v in (kwargs.get("params") or {}).items()
+            if v is not None
+        )
+        if kwargs.get("json") is not None:
+            body = json.dumps(kwargs["json"]).encode()
+        elif kwargs.get("data"):
+            body = urlencode(kwargs["data"]).encode()
+        else:
+            body = b""
+        response = self.app.handle(
+            Request(
+                method.upper(),
+                url_parts.path,
+                params,
+                {k.lower(): v for k, v in (kwargs.get("headers") or {}).items()},
+                body,
+            )
+        )
+        return RecordedResponse(response.status, response.headers, response.body)
+
+
+def _handler_class(app: FakeSpotifyApp):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _serve(self):
+            url = urlsplit(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            request = Request(
+                self.command,
+                url.path,
+                {
+                    k: v[0]
+                    for k, v in parse_qs(url.query, keep_blank_values=True).items()
+                },
+                {k.lower(): v for k, v in self.headers.items()},
+                self.rfile.read(length) if length else b"",
+            )
+            response = app.handle(request)
+            self.send_response(response.status)
+            for name, value in response.headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(response.body)))
+            self.end_headers()
+            self.wfile.write(response.body)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class FakeSpotifyServer:
+    """Runs a `FakeSpotifyApp` on a local port in a background thread.
+
+    `tracks` sizes the synthetic catalog; `saved_tracks` pre-fills the
+    library and `playlists` creates that many playlists of `playlist_size`
+    tracks for the current user. Fault settings can be changed at any time
+    with `inject()` and `fail_next()`.
+    """
+
+    def __init__(
+        self,
+        tracks: int = 1000,
+        albums: Optional[int] = None,
+        artists: Optional[int] = None,
+        seed: int = 0,
+        saved_tracks: int = 0,
+        playlists: int = 0,
+        playlist_size: int = 100,
+        token_ttl: float = 3600,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        **faults,
+    ):
+        catalog = SyntheticCatalog(tracks, albums, artists, seed)
+        self.app = FakeSpotifyApp(
+            catalog, token_ttl=token_ttl, faults=Faults(seed=seed, **faults)
+        )
+        self.app.save("tracks", range(min(saved_tracks, catalog.track_count)))
+        rng = random.Random(seed)
+        for i in range(playlists):
+            size = min(playlist_size, catalog.track_count)
+            self.app.add_playlist(
+                f"Playlist {i}", rng.sample(range(catalog.track_count), size)
+            )
+        self._address = (host, port)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def catalog(self) -> SyntheticCatalog:
+        return self.app.catalog
+
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("The server is not running.")
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    @property
+    def token_url(self) -> str:
+        return f"{self.base_url}/api/token"
+
+    def start(self) -> "FakeSpotifyServer":
+        if self._server is None:
+            self._server = ThreadingHTTPServer(self._address, _handler_class(self.app))
+            self._server.daemon_threads = True
+            self.app.base_url = self.base_url
+            self._thread = threading.Thread(
+                target=self._server.serve_forever,
+                kwargs={"poll_interval": 0.05},
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if self._thread is not None:
+                self._thread.join()
+            self._server = self._thread = None
+
+    def __enter__(self) -> "FakeSpotifyServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def inject(self, **settings) -> None:
+        """Change fault settings, e.g. `inject(latency=0.05, error_rate=0.1)`."""
+        for name, value in settings.items():
+            if name not in Faults.SETTINGS:
+                raise TypeError(f"Unknown fault setting: {name}")
+            setattr(self.app.faults, name, value)
+
+    def fail_next(
+        self, status: int, times: int = 1, retry_after: Optional[float] = None
+    ) -> None:
+        """Fail the next `times` API requests with `status`."""
+        if status == 429 and retry_after is None:
+            retry_after = self.app.faults.retry_after
+        with self.app._lock:
+            self.app.faults.queued.extend([(status, retry_after)] * times)
+
+    def expire_tokens(self) -> None:
+        self.app.expire_tokens()
+
+    @property
+    def log(self) -> List[Tuple[str, str, int]]:
+        return self.app.log
+
+    def count(
+        self,
+        method: Optional[str] = None,
+        path_prefix: str = "",
+        status: Optional[int] = None,
+    ) -> int:
+        return self.app.count(method and method.upper(), path_prefix, status)
+
+    def client(self, **kwargs):
+        """A `SpotifyClient` pointed at this server, holding freshly issued user tokens."""
+        from rebel_rhythms.spotify_client import SpotifyClient
+
+        kwargs.setdefault("token_store", MemoryTokenStore(self.app.issue_tokens()))
+        return SpotifyClient(
+            "client_id",
+            "client_secret",
+            api_base_url=self.base_url,
+            token_url=self.token_url,
+            **kwargs,
+        )
@@ -0,0 +1,214 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager, nullcontext
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+
+def _try_lock(lock_file) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+@contextmanager
+def file_lock(path, timeout: float = 30.0):
+    """Hold an exclusive advisory lock on `path` across processes.
+
+    Raises `TimeoutError` if another holder keeps it for `timeout` seconds.
+    """
+    with open(path, "a+") as lock_file:
+        deadline = time.monotonic() + timeout
+        while not _try_lock(lock_file):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Could not lock {path} within {timeout:g} seconds.")
+            time.sleep(0.01)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class TokenStore(ABC):
+    """Where an auth object keeps its tokens.
+
+    `lock()` serializes refreshes between everyone sharing the store; the
+    request manager re-reads the store under it before refreshing.
+    """
+
+    @abstractmethod
+    def load(self) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def save(self, tokens: Dict) -> None: ...
+
+    def lock(self):
+        return nullcontext()
+
+
+class MemoryTokenStore(TokenStore):
+    def __init__(self, tokens: Optional[Dict] = None):
+        self._tokens = tokens
+        self._lock = threading.RLock()
+
+    def load(self) -> Optional[Dict]:
+        with self._lock:
+            return dict(self._tokens) if self._tokens else None
+
+    def save(self, tokens: Dict) -> None:
+        with self._lock:
+            self._tokens = dict(tokens)
+
+    def lock(self):
+        return self._lock
+
+
+class FileTokenStore(TokenStore):
+    """A JSON file, replaced atomically and locked with `<path>.lock`."""
+
+    def __init__(self, path: Optional[str] = None, timeout: float = 30.0):
+        self.path = path or os.path.join(os.getcwd(), "tokens.json")
+        self.timeout = timeout
+
+    def load(self) -> Optional[Dict]:
+        if os.path.exists(self.path):
+            with open(self.path, "r") as file:
+                return json.load(file)
+        return None
+
+    def save(self, tokens: Dict) -> None:
+        # Write to a temporary file and swap it in, so readers in other
+        # processes never see a half-written token file.
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tokens-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(tokens, file)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def lock(self):
+        return file_lock(self.path + ".lock", self.timeout)
+
+
+class SQLiteTokenStore(TokenStore):
+    """Tokens for many users in one SQLite database, one row per `user_key`.
+
+    `lock()` holds a write transaction, which serializes refreshes between
+    threads and processes using the same database.
+    """
+
+    def __init__(self, path: str, user_key: str = "default", timeout: float = 30.0):
+        self.path = path
+        self.user_key = user_key
+        self.timeout = timeout
+        self._local = threading.local()
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS tokens ("
+                "user_key TEXT PRIMARY KEY, tokens TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+
+    def for_user(self, user_key: str) -> "SQLiteTokenStore":
+        return SQLiteTokenStore(self.path, user_key, self.timeout)
+
+    @contextmanager
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            yield connection
+            return
+        connection = self._connect()
+        try:
+            yield connection
+        finally:
+            connection.close()
+
+    def load(self) -> Optional[Dict]:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT tokens FROM tokens WHERE user_key = ?", (self.user_key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, tokens: Dict) -> None:
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT INTO tokens (user_key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_key) DO UPDATE SET tokens = excluded.tokens, "
+                "updated_at = excluded.updated_at",
+                (self.user_key, json.dumps(tokens), time.time()),
+            )
+
+    @contextmanager
+    def lock(self):
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        self._local.connection = connection
+        try:
+            yield
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+        finally:
+            self._local.connection = None
+            connection.close()
+
+
+class EnvTokenStore(TokenStore):
+    """Read tokens from environment variables, e.g. injected by a secret manager.
+
+    The environment is never written to: refreshed tokens are kept in memory
+    for the life of the process.
+    """
+
+    def __init__(self, prefix: str = "SPOTIFY_"):
+        self.prefix = prefix
+        self._refreshed: Optional[Dict] = None
+
+    def load(self) -> Optional[Dict]:
+        if self._refreshed is not None:
+            return dict(self._refreshed)
+        access_token = os.environ.get(self.prefix + "ACCESS_TOKEN")
+        refresh_token = os.environ.get(self.prefix + "REFRESH_TOKEN")
+        if not access_token and not refresh_token:
+            return None
+        tokens: Dict[str, Any] = {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+        }
+        expires_at = os.environ.get(self.prefix + "TOKEN_EXPIRES_AT")
+        if expires_at:
+            tokens["expires_at"] = float(expires_at)
+        return {k: v for k, v in tokens.items() if v is not None}
+
+    def save(self, tokens: Dict) -> None:
+        self._refreshed = dict(tokens)
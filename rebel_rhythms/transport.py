@@ -0,0 +1,254 @@
+import gzip
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.exceptions import Timeout
+from requests.structures import CaseInsensitiveDict
+
+from rebel_rhythms.custom_exceptions import (
+    CassetteMissException,
+    RequestTimeoutException,
+)
+
+CASSETTE_VERSION = 1
+
+# Only these response headers are worth keeping; the rest is noise (and may
+# carry cookies).
+RECORDED_HEADERS = ("content-type", "retry-after", "etag")
+REDACTED_PARAMS = ("access_token", "refresh_token", "code", "client_secret")
+REDACTED = "REDACTED"
+
+
+class Transport(ABC):
+    """Sends one HTTP request for the request manager.
+
+    `send()` returns an object with `status_code`, `headers`, `content` and
+    `json()`, like a `requests.Response`. Retries, rate limiting and token
+    handling stay in the request manager.
+    """
+
+    @abstractmethod
+    def send(self, method: str, url: str, **kwargs): ...
+
+
+class RequestsTransport(Transport):
+    def __init__(self, timeout: float = 30):
+        self.timeout = timeout
+
+    def send(self, method: str, url: str, **kwargs):
+        try:
+            return getattr(requests, method)(url, timeout=self.timeout, **kwargs)
+        except Timeout:
+            raise RequestTimeoutException(
+                f"The request timed out after {self.timeout:g} seconds."
+            )
+
+
+class RecordedResponse:
+    def __init__(
+        self,
+        status_code: int,
+        headers: Dict[str, str],
+        content: bytes,
+        elapsed: float = 0.0,
+    ):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.elapsed = elapsed
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def _canonical_params(params: Optional[Dict]) -> Dict[str, str]:
+    return {str(k): str(v) for k, v in sorted((params or {}).items()) if v is not None}
+
+
+def _request_key(
+    method: str, url: str, params: Optional[Dict], body, match_on: Iterable[str]
+) -> Tuple:
+    parts = {
+        "method": method.lower(),
+        "path": urlsplit(url).path,
+        "params": tuple(_canonical_params(params).items()),
+        "body": json.dumps(body, sort_keys=True) if body is not None else None,
+    }
+    return tuple(parts[name] for name in match_on)
+
+
+def load_cassette(path: str) -> Dict:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as file:
+        cassette = json.load(file)
+    if cassette.get("version") != CASSETTE_VERSION:
+        raise ValueError(f"Unsupported cassette version: {cassette.get('version')}")
+    return cassette
+
+
+def save_cassette(path: str, interactions: List[Dict]) -> None:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as file:
+        json.dump(
+            {"version": CASSETTE_VERSION, "interactions": interactions},
+            file,
+            separators=(",", ":"),
+        )
+
+
+class RecordingTransport(Transport):
+    """Passes requests through to `inner` and records them for `ReplayTransport`.
+
+    Bearer tokens are scrubbed from everything written, request headers are
+    not stored at all, and params named in `redact_params` are masked.
+    Call `save()` (or use it as a context manager) to write the cassette;
+    a `.gz` path is gzipped.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        inner: Optional[Transport] = None,
+        redact_params: Iterable[str] = REDACTED_PARAMS,
+    ):
+        self.path = path
+        self.inner = inner or RequestsTransport()
+        self.redact_params = set(redact_params)
+        self.interactions: List[Dict] = []
+        self._secrets: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def send(self, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        response = self.inner.send(method, url, **kwargs)
+        elapsed = time.perf_counter() - started
+
+        authorization = (kwargs.get("headers") or {}).get("Authorization", "")
+        params = _canonical_params(kwargs.get("params"))
+        interaction = {
+            "request": {
+                "method": method.lower(),
+                "url": url.split("?", 1)[0],
+                "params": {
+                    k: REDACTED if k in self.redact_params else v
+                    for k, v in params.items()
+                },
+            },
+            "response": {
+                "status": response.status_code,
+                "headers": {
+                    k.lower(): v
+                    for k, v in response.headers.items()
+                    if k.lower() in RECORDED_HEADERS
+                },
+                "body": response.content.decode("utf-8", errors="replace"),
+                "elapsed": round(elapsed, 6),
+            },
+        }
+        if kwargs.get("json") is not None:
+            interaction["request"]["json"] = kwargs["json"]
+        with self._lock:
+            if authorization.startswith("Bearer "):
+                self._secrets.add(authorization[len("Bearer ") :])
+            self.interactions.append(interaction)
+        return response
+
+    def _redacted(self) -> List[Dict]:
+        text = json.dumps(self.interactions)
+        for secret in self._secrets:
+            text = text.replace(secret, REDACTED)
+        return json.loads(text)
+
+    def save(self) -> None:
+        with self._lock:
+            save_cassette(self.path, self._redacted())
+
+    def __enter__(self) -> "RecordingTransport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.save()
+
+
+class ReplayTransport(Transport):
+    """Answers requests from a cassette written by `RecordingTransport`.
+
+    Requests are matched on `match_on` (any of "method", "path", "params",
+    "body"); repeated requests replay their recordings in order and then
+    keep returning the last one. `time_scale` replays the recorded latency
+    and any Retry-After scaled by that factor: 0 (the default) replays at
+    memory speed, 1 in real time.
+
+        client = SpotifyClient(
+            "id", "secret",
+            token_store=MemoryTokenStore({"access_token": "replay", "expires_at": 1e12}),
+            transport=ReplayTransport("library.json.gz"),
+        )
+    """
+
+    def __init__(
+        self,
+        path: str,
+        time_scale: float = 0.0,
+        match_on: Tuple[str, ...] = ("method", "path", "params"),
+        sleep=time.sleep,
+    ):
+        if time_scale < 0:
+            raise ValueError("Invalid time_scale, must not be negative.")
+        self.path = path
+        self.time_scale = time_scale
+        self.match_on = match_on
+        self._sleep = sleep
+        self._recordings: Dict[Tuple, Deque[RecordedResponse]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        for interaction in load_cassette(path)["interactions"]:
+            request, response = interaction["request"], interaction["response"]
+            key = _request_key(
+                request["method"],
+                request["url"],
+                request["params"],
+                request.get("json"),
+                match_on,
+            )
+            self._recordings[key].append(self._response(response))
+
+    def _response(self, recorded: Dict) -> RecordedResponse:
+        headers = dict(recorded["headers"])
+        if "retry-after" in headers:
+            try:
+                headers["retry-after"] = (
+                    f"{float(headers['retry-after']) * self.time_scale:g}"
+                )
+            except ValueError:
+                pass
+        return RecordedResponse(
+            recorded["status"],
+            headers,
+            recorded["body"].encode(),
+            recorded.get("elapsed", 0.0),
+        )
+
+    def send(self, method: str, url: str, **kwargs):
+        key = _request_key(
+            method, url, kwargs.get("params"), kwargs.get("json"), self.match_on
+        )
+        with self._lock:
+            recordings = self._recordings.get(key)
+            if not recordings:
+                raise CassetteMissException(
+                    f"No recording for {method.upper()} {url} {kwargs.get('params') or ''}"
+                )
+            response = recordings.popleft() if len(recordings) > 1 else recordings[0]
+        if self.time_scale and response.elapsed:
+            self._sleep(response.elapsed * self.time_scale)
+        return response
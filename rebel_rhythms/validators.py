@@ -2,7 +2,9 @@ from functools import wraps
 import inspect
 from enum import Enum, auto
 import re
-from typing import List, Union
+from typing import Iterable, List, Tuple, Union
+
+from rebel_rhythms.profiling import timed
 
 
 class ContentType(Enum):
@@ -13,6 +15,27 @@ class ContentType(Enum):
     USER = auto()
 
 
+_ID = re.compile(r"^[a-zA-Z0-9]{22}$")
+_USERNAME = re.compile(r"^[a-zA-Z0-9_-]+$")
+_TRACK_URI = re.compile(r"^spotify:track:[a-zA-Z0-9]{22}$")
+_URL_PATTERNS = {
+    content_type: re.compile(
+        rf"https://open\.spotify\.com/{content_type.name.lower()}/([a-zA-Z0-9]+)"
+    )
+    for content_type in ContentType
+}
+# One alternation per type for batch parsing: URL, URI, then a bare ID (or,
+# for users, any username). The matching group holds the extracted ID.
+_COMBINED_PATTERNS = {}
+for _content_type in ContentType:
+    _name = _content_type.name.lower()
+    _bare = r"[a-zA-Z0-9_-]+" if _content_type == ContentType.USER else r"[a-zA-Z0-9]{22}"
+    _COMBINED_PATTERNS[_content_type] = re.compile(
+        rf"https://open\.spotify\.com/{_name}/([a-zA-Z0-9]+)|spotify:{_name}:({_bare})$|({_bare})$"
+    )
+del _content_type, _name, _bare
+
+
 def validate_boolean_param(param: bool, name: str):
     if param is not None and not isinstance(param, bool):
         raise ValueError(f"The '{name}' parameter must be a boolean.")
@@ -25,13 +48,23 @@ def validate_playlist_params(public: bool, collaborative: bool):
 
 def check_list_limit(arg_name, limit):
     def decorator(func):
+        # Locate the argument once, at decoration time, instead of binding the
+        # full signature on every call.
+        parameters = list(inspect.signature(func).parameters.values())
+        names = [p.name for p in parameters]
+        index = names.index(arg_name) if arg_name in names else None
+        default = None
+        if index is not None and parameters[index].default is not inspect.Parameter.empty:
+            default = parameters[index].default
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            sig = inspect.signature(func)
-            bound_args = sig.bind(*args, **kwargs)
-            bound_args.apply_defaults()
-
-            the_list = bound_args.arguments.get(arg_name, None)
+            if arg_name in kwargs:
+                the_list = kwargs[arg_name]
+            elif index is not None and index < len(args):
+                the_list = args[index]
+            else:
+                the_list = default
             if the_list and isinstance(the_list, list) and len(the_list) > limit:
                 raise ValueError(f"Too many IDs provided. Maximum allowed is {limit}.")
 
@@ -42,8 +75,9 @@ def check_list_limit(arg_name, limit):
     return decorator
 
 
+@timed("validation")
 def validate_track_uris(uris: Union[str, List[str]]) -> List[str]:
-    pattern = re.compile(r"^spotify:track:[a-zA-Z0-9]{22}$")
+    pattern = _TRACK_URI
     if isinstance(uris, str):
         track_uris_list = [uris]
     else:
@@ -58,16 +92,15 @@ def validate_track_uris(uris: Union[str, List[str]]) -> List[str]:
 
 def validate_id_or_url(content_type: ContentType, multiple: bool = False):
     def decorator(func):
+        # The reference is assumed to be the first argument after 'self'.
+        arg_name = list(inspect.signature(func).parameters)[1]
+
         @wraps(func)
         def wrapper(self, *args, **kwargs):
-            sig = inspect.signature(func)
-            param_names = list(sig.parameters.keys())[1:]  # skip 'self'
-
             if args:
                 ref = args[0]
                 rest_args = args[1:]
             else:
-                arg_name = param_names[0]  # assuming 'ref' is the first argument after 'self'
                 ref = kwargs.pop(arg_name, None)
                 rest_args = args
 
@@ -79,7 +112,7 @@ def validate_id_or_url(content_type: ContentType, multiple: bool = False):
                     ref = [ref]
                 valid_ids = validate_and_extract_ids(ref, content_type=content_type)
             else:
-                valid_ids = validate_and_extract_ids([ref], content_type=content_type)[0]
+                valid_ids = validate_and_extract_single_id(ref, content_type)
 
             return func(self, valid_ids, *rest_args, **kwargs)
 
@@ -88,6 +121,7 @@ def validate_id_or_url(content_type: ContentType, multiple: bool = False):
     return decorator
 
 
+@timed("validation")
 def validate_and_extract_ids(url_or_id: Union[str, List[str]], content_type: ContentType) -> List[str]:
     if not url_or_id:
         raise ValueError("ID or URL should not be empty.")
@@ -100,25 +134,67 @@ def validate_and_extract_ids(url_or_id: Union[str, List[str]], content_type: Con
         raise ValueError("Invalid type for ID or URL.")
 
 
+@timed("validation")
 def validate_and_extract_single_id(url_or_id: str, content_type: ContentType) -> str:
     if not isinstance(url_or_id, str):
         raise ValueError(f"Invalid ID or URL: {url_or_id}")
 
-    # Special pattern for ContentType.USER
-    if content_type == ContentType.USER:
-        pattern = r"https://open\.spotify\.com/user/([a-zA-Z0-9]+)"
-    else:
-        pattern = rf"https://open\.spotify\.com/{content_type.name.lower()}/([a-zA-Z0-9]+)"
+    if _ID.match(url_or_id):
+        return url_or_id
 
-    match = re.match(pattern, url_or_id)
+    match = _URL_PATTERNS[content_type].match(url_or_id)
     if match:
         return match.group(1)
 
     # Additional check for ContentType.USER to accept generic usernames
-    if content_type == ContentType.USER and re.match(r"^[a-zA-Z0-9_-]+$", url_or_id):
-        return url_or_id
-
-    if re.match(r"^[a-zA-Z0-9]{22}$", url_or_id):
+    if content_type == ContentType.USER and _USERNAME.match(url_or_id):
         return url_or_id
 
     raise ValueError(f"Invalid ID or URL: {url_or_id}")
+
+
+def split_fields(fields: str) -> List[str]:
+    """Top-level names of a `fields` filter, e.g. `["items", "next"]`."""
+    names = []
+    depth = 0
+    current = ""
+    for char in fields + ",":
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            names.append(current.strip())
+            current = ""
+        elif depth == 0:
+            current += char
+    return names
+
+
+def split_spotify_ids(
+    refs: Iterable, content_type: ContentType
+) -> Tuple[List[str], List]:
+    """Parse IDs, open.spotify.com URLs and spotify: URIs in one pass.
+
+    Returns the extracted IDs and the references that could not be parsed,
+    both in input order.
+    """
+    match = _COMBINED_PATTERNS[content_type].match
+    ids = []
+    invalid = []
+    for ref in refs:
+        found = match(ref) if type(ref) is str else None
+        if found is None:
+            invalid.append(ref)
+        else:
+            # Every alternative captures the ID, so lastindex is always set.
+            ids.append(found.group(found.lastindex or 0))
+    return ids, invalid
+
+
+def parse_spotify_ids(refs: Iterable, content_type: ContentType) -> List[str]:
+    """Like `split_spotify_ids`, but raise on the first unparseable reference."""
+    ids, invalid = split_spotify_ids(refs, content_type)
+    if invalid:
+        raise ValueError(f"Invalid ID or URL: {invalid[0]}")
+    return ids
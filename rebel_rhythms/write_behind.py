@@ -0,0 +1,224 @@
+import threading
+import time
+from concurrent.futures import Future
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from rebel_rhythms.bulk import BulkReport, run_bulk
+from rebel_rhythms.validators import ContentType, parse_spotify_ids
+
+
+class MutationTarget(str, Enum):
+    TRACKS = "tracks"
+    ALBUMS = "albums"
+    ARTISTS = "artists"
+    USERS = "users"
+
+
+_CONTENT_TYPES = {
+    MutationTarget.TRACKS: ContentType.TRACK,
+    MutationTarget.ALBUMS: ContentType.ALBUM,
+    MutationTarget.ARTISTS: ContentType.ARTIST,
+    MutationTarget.USERS: ContentType.USER,
+}
+
+
+class _Waiter:
+    def __init__(self, ids: Iterable[str]):
+        self.future: Future = Future()
+        self.remaining = set(ids)
+        self.report = BulkReport()
+        self._lock = threading.Lock()
+        if not self.remaining:
+            self.future.set_result(self.report)
+
+    def resolve(self, item_id: str, outcome: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            if item_id not in self.remaining:
+                return
+            self.remaining.discard(item_id)
+            if outcome == "succeeded":
+                self.report.succeeded.append(item_id)
+            elif outcome == "cancelled":
+                self.report.cancelled.append(item_id)
+            else:
+                getattr(self.report, outcome)[item_id] = error
+            done = not self.remaining
+        if done:
+            self.future.set_result(self.report)
+
+
+class WriteBehindQueue:
+    """Buffers library and follow mutations and writes them in batches.
+
+    Only the last operation queued for an ID is written: an opposite one
+    replaces it (the earlier one may not have changed anything, e.g. saving
+    an already saved track), and repeated ones coalesce. Buffered operations
+    are flushed when a batch is full or `flush_interval` seconds after the
+    oldest one was queued. Every enqueue returns a Future resolving to a
+    BulkReport once its IDs have been written, or marked cancelled when a
+    later operation replaced them.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_batch_size: int = 50,
+        flush_interval: float = 1.0,
+        max_workers: int = 4,
+    ):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_workers = max_workers
+        self._pending: Dict[Tuple[MutationTarget, str], Tuple[bool, List[_Waiter]]] = {}
+        self._oldest: Optional[float] = None
+        self._condition = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def _mutation(self, target: MutationTarget, add: bool) -> Callable:
+        client = self.client
+        return {
+            (MutationTarget.TRACKS, True): client.save_tracks_for_current_user,
+            (MutationTarget.TRACKS, False): client.remove_user_saved_tracks,
+            (MutationTarget.ALBUMS, True): client.save_albums,
+            (MutationTarget.ALBUMS, False): client.remove_user_saved_albums,
+            (MutationTarget.ARTISTS, True): client.follow_artists,
+            (MutationTarget.ARTISTS, False): client.unfollow_artists,
+            (MutationTarget.USERS, True): client.follow_users,
+            (MutationTarget.USERS, False): client.unfollow_users,
+        }[(target, add)]
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def save_tracks(self, tracks: Union[str, List[str]]) -> Future:
+        return self.enqueue(MutationTarget.TRACKS, tracks, add=True)
+
+    def remove_tracks(self, tracks: Union[str, List[str]]) -> Future:
+        return self.enqueue(MutationTarget.TRACKS, tracks, add=False)
+
+    def save_albums(self, albums: Union[str, List[str]]) -> Future:
+        return self.enqueue(MutationTarget.ALBUMS, albums, add=True)
+
+    def remove_albums(self, albums: Union[str, List[str]]) -> Future:
+        return self.enqueue(MutationTarget.ALBUMS, albums, add=False)
+
+    def follow_artists(self, artists: Union[str, List[str]]) -> Future:
+        return self.enqueue(MutationTarget.ARTISTS, artists, add=True)
+
+    def unfollow_artists(self, artists: Union[str, List[str]]) -> Future:
+        return self.enqueue(MutationTarget.ARTISTS, artists, add=False)
+
+    def follow_users(self, users: Union[str, List[str]]) -> Future:
+        return self.enqueue(MutationTarget.USERS, users, add=True)
+
+    def unfollow_users(self, users: Union[str, List[str]]) -> Future:
+        return self.enqueue(MutationTarget.USERS, users, add=False)
+
+    def enqueue(
+        self, target: MutationTarget, refs: Union[str, List[str]], add: bool
+    ) -> Future:
+        if isinstance(refs, str):
+            refs = [refs]
+        content_type = _CONTENT_TYPES[target]
+        ids = list(dict.fromkeys(parse_spotify_ids(refs, content_type)))
+        waiter = _Waiter(ids)
+
+        superseded = []
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The write-behind queue is closed.")
+            for item_id in ids:
+                key = (target, item_id)
+                pending = self._pending.get(key)
+                if pending is not None and pending[0] == add:
+                    pending[1].append(waiter)
+                    continue
+                if pending is not None:
+                    superseded.append((item_id, pending[1]))
+                self._pending[key] = (add, [waiter])
+            if self._pending and self._oldest is None:
+                self._oldest = time.monotonic()
+            self._ensure_worker()
+            self._condition.notify_all()
+
+        for item_id, waiters in superseded:
+            for superseded_waiter in waiters:
+                superseded_waiter.resolve(item_id, "cancelled")
+        return waiter.future
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="rebel-rhythms-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _batch_full(self) -> bool:
+        counts: Dict[Tuple[MutationTarget, bool], int] = {}
+        for (target, _), (add, _) in self._pending.items():
+            counts[(target, add)] = counts.get((target, add), 0) + 1
+            if counts[(target, add)] >= self.max_batch_size:
+                return True
+        return False
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._pending:
+                        now = time.monotonic()
+                        oldest = self._oldest if self._oldest is not None else now
+                        remaining = oldest + self.flush_interval - now
+                        if remaining <= 0 or self._batch_full():
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._closed and not self._pending:
+                    return
+            self.flush()
+
+    def flush(self) -> List[BulkReport]:
+        """Write everything pending now and wait for it to complete."""
+        with self._send_lock:
+            with self._condition:
+                pending, self._pending = self._pending, {}
+                self._oldest = None
+
+            groups: Dict[Tuple[MutationTarget, bool], List[str]] = {}
+            for (target, item_id), (add, _) in pending.items():
+                groups.setdefault((target, add), []).append(item_id)
+
+            reports = []
+            for (target, add), ids in groups.items():
+                report = run_bulk(
+                    ids,
+                    _CONTENT_TYPES[target],
+                    self._mutation(target, add),
+                    self.max_batch_size,
+                    self.max_workers,
+                )
+                reports.append(report)
+                outcomes: List[Tuple[str, str, Optional[str]]] = [
+                    (i, "succeeded", None) for i in report.succeeded
+                ]
+                outcomes += [(i, "failed", e) for i, e in report.failed.items()]
+                outcomes += [(i, "retriable", e) for i, e in report.retriable.items()]
+                for item_id, outcome, error in outcomes:
+                    for waiter in pending[(target, item_id)][1]:
+                        waiter.resolve(item_id, outcome, error)
+            return reports
+
+    def close(self, flush: bool = True) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if flush:
+            self.flush()
+        if self._thread is not None:
+            self._thread.join()
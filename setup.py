@@ -14,6 +14,9 @@ setup(
         "requests==2.30.0",
         "pydantic==2.1.1",
     ],
+    extras_require={
+        "parquet": ["pyarrow>=12"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -3,7 +3,9 @@ from dotenv import load_dotenv
 load_dotenv(".env")
 import pytest
 from rebel_rhythms import SpotifyClient
+from rebel_rhythms.testing import FakeSpotifyApp, SyntheticCatalog, spotify_id
 import os
+import time
 
 
 @pytest.fixture
@@ -100,3 +102,29 @@ def mixed_tracks(non_existent_track, valid_track):
 @pytest.fixture
 def non_existent_track():
     return "07L2b1rNFcywc0c0000000"
+
+
+def fresh_tokens(access_token="test-token", expires_in=3600):
+    return {
+        "access_token": access_token,
+        "refresh_token": "refresh-token",
+        "expires_at": time.time() + expires_in,
+    }
+
+
+def track_ids(count, start=0):
+    return [spotify_id("track", i) for i in range(start, start + count)]
+
+
+def uris(*indexes):
+    return [f"spotify:track:{spotify_id('track', i)}" for i in indexes]
+
+
+@pytest.fixture
+def app():
+    return FakeSpotifyApp(SyntheticCatalog(tracks=10_000))
+
+
+@pytest.fixture
+def offline_client(app):
+    return app.client()
@@ -1,6 +1,8 @@
 import json
 from unittest.mock import mock_open, patch, Mock, call
-from rebel_rhythms import SpotifyAuth
+from conftest import fresh_tokens
+from rebel_rhythms import SpotifyAuth, SpotifyClient, SpotifyClientCredentialsAuth, SpotifyRequestManager
+from rebel_rhythms.spotify_auth import SpotifyScope
 
 
 class TestSpotifyAuth:
@@ -28,22 +30,47 @@ class TestSpotifyAuth:
 
             assert tokens is None
 
-    def test_store_tokens(self):
-        with patch("builtins.open", mock_open(read_data=json.dumps({"key": "value"}))) as mock_file:
-            auth = SpotifyAuth("client_id", "client_secret", "http://localhost:8080/callback")
-            auth.store_tokens({"access_token": "some_token"})
+    def test_store_tokens(self, tmp_path):
+        tokens_file = str(tmp_path / "tokens.json")
+        auth = SpotifyAuth("client_id", "client_secret", "http://localhost:8080/callback", tokens_file=tokens_file)
+        auth.store_tokens({"access_token": "some_token"})
+        auth.store_tokens({"access_token": "other_token"})
 
-            calls = [call("{"), call('"access_token"'), call(": "), call('"some_token"'), call("}")]
-            mock_file().write.assert_has_calls(calls)
+        assert auth.load_tokens() == {"access_token": "other_token"}
+        assert [p.name for p in tmp_path.iterdir()] == ["tokens.json"]
 
     def test_get_authorization_url(self):
         with patch("requests.get") as mock_get:
-            mock_get.return_value.url = "some_url"
-
-            auth = SpotifyAuth("client_id", "client_secret", "http://localhost:8080/callback")
+            auth = SpotifyAuth("client_id", "client_secret", "http://localhost:8080/callback", scope=[SpotifyScope.USER_TOP_READ, SpotifyScope.USER_READ_EMAIL])
             url = auth.get_authorization_url()
 
-            assert url == "some_url"
+            mock_get.assert_not_called()
+            assert url == (
+                "https://accounts.spotify.com/authorize?client_id=client_id&response_type=code"
+                "&redirect_uri=http%3A%2F%2Flocalhost%3A8080%2Fcallback&scope=user-top-read+user-read-email"
+            )
+
+    def test_construction_does_no_io(self):
+        with patch("builtins.open") as mock_open_, patch("requests.post") as mock_post, patch(
+            "requests.get"
+        ) as mock_get, patch("webbrowser.open") as mock_webbrowser:
+            client = SpotifyClient("client_id", "client_secret")
+
+        assert client.spotify_auth is not None
+        for mock in (mock_open_, mock_post, mock_get, mock_webbrowser):
+            mock.assert_not_called()
+
+    def test_warmup_resolves_tokens(self, tmp_path):
+        tokens_file = str(tmp_path / "tokens.json")
+        auth = SpotifyAuth("client_id", "client_secret", "http://localhost:8080/callback", tokens_file=tokens_file)
+        auth.store_tokens(fresh_tokens("stored-token"))
+        client = SpotifyClient("client_id", "client_secret", auth=auth)
+
+        with patch("requests.post") as mock_post:
+            assert client.warmup() is client
+
+        mock_post.assert_not_called()
+        assert client.request_manager.headers == {"Authorization": "Bearer stored-token"}
 
     def test_get_access_token(self):
         with patch("requests.post") as mock_post:
@@ -68,3 +95,45 @@ class TestSpotifyAuth:
             new_tokens = auth.refresh_tokens()
 
             assert new_tokens == {"access_token": "new_token"}
+
+    def test_refresh_tokens_records_expiry(self):
+        with patch("requests.post") as mock_post, patch("time.time", return_value=1000.0):
+            mock_post.return_value.json.return_value = {"access_token": "new_token", "expires_in": 3600}
+
+            auth = SpotifyAuth("client_id", "client_secret", "http://localhost:8080/callback")
+            auth.tokens = {"refresh_token": "some_refresh_token"}
+
+            assert auth.refresh_tokens()["expires_at"] == 4600.0
+
+
+class TestSpotifyClientCredentialsAuth:
+    def test_client_is_headless_and_file_free(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        token_response = Mock()
+        token_response.json.return_value = {"access_token": "app_token", "token_type": "Bearer", "expires_in": 3600}
+        api_response = Mock(status_code=200, content=b"{}")
+        api_response.json.return_value = {"ok": True}
+
+        with patch("requests.post", return_value=token_response) as mock_post, patch(
+            "requests.get", return_value=api_response
+        ) as mock_get, patch("webbrowser.open") as mock_webbrowser:
+            client = SpotifyClient.from_client_credentials("client_id", "client_secret")
+            client.request_manager.get("/v1/tracks")
+            client.request_manager.get("/v1/tracks")
+
+        assert mock_post.call_count == 1
+        assert mock_post.call_args.kwargs["data"] == {"grant_type": "client_credentials"}
+        assert mock_get.call_args.kwargs["headers"] == {"Authorization": "Bearer app_token"}
+        mock_webbrowser.assert_not_called()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_renews_without_refresh_token(self):
+        with patch("requests.post") as mock_post:
+            mock_post.return_value.json.side_effect = [
+                {"access_token": "first", "expires_in": 3600},
+                {"access_token": "second", "expires_in": 3600},
+            ]
+            manager = SpotifyRequestManager(SpotifyClientCredentialsAuth("client_id", "client_secret"), "UA")
+            manager._refresh_tokens("Bearer first")
+
+        assert manager.headers == {"Authorization": "Bearer second"}
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks")
+)
+
+import cases  # noqa: E402,F401
+import suite  # noqa: E402
+
+
+class TestBenchmarkSuite:
+    def test_every_case_runs_offline(self):
+        names = [name for name in suite.BENCHMARKS if not name.startswith("import.")]
+
+        report = suite.run(names, scale=0.01, repeat=1)
+
+        assert set(report["results"]) == set(names)
+        assert all(result["min"] > 0 for result in report["results"].values())
+        assert report["meta"]["scale"] == 0.01
+
+    def test_compare_flags_regressions(self, tmp_path):
+        baseline = {
+            "results": {"a": {"min": 1.0}, "b": {"min": 1.0}, "gone": {"min": 1.0}}
+        }
+        current = {
+            "results": {"a": {"min": 1.1}, "b": {"min": 2.0}, "new": {"min": 1.0}}
+        }
+        path = str(tmp_path / "baseline.json")
+        suite.save(baseline, path)
+
+        comparisons = suite.compare(suite.load(path), current)
+
+        assert [c.name for c in comparisons] == ["a", "b", "new"]
+        assert [c.name for c in suite.regressions(comparisons, 1.25)] == ["b"]
+        assert comparisons[2].ratio is None
+        assert "REGRESSION" in suite.format_comparison(comparisons, 1.25)
@@ -0,0 +1,90 @@
+import threading
+
+from conftest import track_ids
+from rebel_rhythms.testing import spotify_id
+from rebel_rhythms.testing.server import ApiError
+
+
+def album_ids(count):
+    return [spotify_id("album", i) for i in range(count)]
+
+
+class TestBulkMutations:
+    def test_save_any_number_of_tracks(self, offline_client, app):
+        ids = track_ids(1234)
+
+        report = offline_client.save_tracks_for_current_user_bulk(ids, max_workers=8)
+
+        assert report.ok
+        assert sorted(report.succeeded) == sorted(ids)
+        assert report.chunks == 25
+        assert app.count("PUT", "/v1/me/tracks") == 25
+        assert all(len(request.ids()) <= 50 for request in app.requests)
+        assert len(app.saved["tracks"]) == 1234
+
+    def test_remove_tracks_and_albums(self, offline_client, app):
+        offline_client.save_albums_bulk(album_ids(60))
+        offline_client.save_tracks_for_current_user_bulk(track_ids(60))
+
+        offline_client.remove_user_saved_albums_bulk(album_ids(30))
+        offline_client.remove_user_saved_tracks_bulk(track_ids(60))
+
+        assert list(app.saved["albums"]) == list(range(30, 60))
+        assert not app.saved["tracks"]
+
+    def test_invalid_and_duplicate_ids(self, offline_client, app):
+        ids = track_ids(3) + ["not-an-id"] + track_ids(2)
+        url = "https://open.spotify.com/track/" + track_ids(1, start=9)[0]
+
+        report = offline_client.save_tracks_for_current_user_bulk(ids + [url])
+
+        assert report.succeeded == track_ids(3) + track_ids(1, start=9)
+        assert list(report.failed) == ["not-an-id"]
+        assert report.chunks == 1
+
+    def test_partial_failures_are_classified(self, offline_client, app):
+        ids = track_ids(150)
+        failing = {
+            ids[50]: ApiError(429, "slow down", retry_after=0),
+            ids[100]: ApiError(400, "bad"),
+        }
+
+        def intercept(request):
+            if request.ids()[0] in failing:
+                raise failing[request.ids()[0]]
+
+        app.intercept = intercept
+
+        report = offline_client.save_tracks_for_current_user_bulk(ids)
+
+        assert report.succeeded == ids[:50]
+        assert sorted(report.retriable) == sorted(ids[50:100])
+        assert sorted(report.failed) == sorted(ids[100:])
+        assert not report.ok
+
+    def test_server_errors_are_retriable(self, offline_client, app):
+        app.save("tracks", range(2))
+        app.faults.queued.append((500, None))
+
+        report = offline_client.remove_user_saved_tracks_bulk(track_ids(2))
+
+        assert sorted(report.retriable) == sorted(track_ids(2))
+
+    def test_concurrency_is_bounded(self, offline_client, app):
+        active = []
+        peak = []
+        lock = threading.Lock()
+        barrier = threading.Event()
+
+        def intercept(request):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            barrier.wait(0.01)
+            with lock:
+                active.pop()
+
+        app.intercept = intercept
+        offline_client.save_tracks_for_current_user_bulk(track_ids(500), max_workers=3)
+
+        assert max(peak) <= 3
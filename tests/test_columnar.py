@@ -0,0 +1,165 @@
+import io
+import os
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from rebel_rhythms import (
+    ParquetWriter,
+    arrow_schema,
+    lookup,
+    record_batch,
+)  # noqa: E402
+from rebel_rhythms.models import (
+    AudioFeaturesObject,
+    SavedTrackObject,
+    Track,
+)  # noqa: E402
+from rebel_rhythms.testing import (
+    FakeSpotifyServer,
+    SyntheticCatalog,
+    spotify_id,
+)  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    with FakeSpotifyServer(
+        tracks=300,
+        albums=20,
+        artists=10,
+        saved_tracks=230,
+        playlists=1,
+        playlist_size=120,
+    ) as server:
+        yield server
+
+
+class TestSchema:
+    def test_derived_from_models(self):
+        schema = arrow_schema(Track)
+
+        assert schema.field("duration_ms").type == pa.int64()
+        assert schema.field("explicit").type == pa.bool_()
+        assert schema.field("artists").type.value_type.field("name").type == pa.string()
+        assert schema.field("album").type.field("images").type == pa.list_(
+            pa.struct(
+                [("height", pa.int64()), ("width", pa.int64()), ("url", pa.string())]
+            )
+        )
+        assert arrow_schema(AudioFeaturesObject).field("tempo").type == pa.float64()
+
+    def test_selected_columns(self):
+        schema = arrow_schema(
+            SavedTrackObject,
+            ["added_at", "track.artists.name", "track.album.images.0.url"],
+        )
+
+        assert schema.names == [
+            "added_at",
+            "track.artists.name",
+            "track.album.images.0.url",
+        ]
+        assert schema.field("track.artists.name").type == pa.list_(pa.string())
+        assert schema.field("track.album.images.0.url").type == pa.string()
+        with pytest.raises(ValueError):
+            arrow_schema(SavedTrackObject, ["track.nope"])
+
+    def test_record_batch_from_raw_items(self):
+        catalog = SyntheticCatalog(tracks=10, albums=2, artists=3)
+        items = [catalog.track(i) for i in range(10)]
+
+        batch = record_batch(items, Track)
+
+        assert batch.num_rows == 10
+        assert (
+            batch.column("artists").to_pylist()[0][0]["name"]
+            == items[0]["artists"][0]["name"]
+        )
+        assert batch.column("id").to_pylist() == [item["id"] for item in items]
+
+
+class TestParquetExport:
+    def test_saved_tracks_in_row_groups(self, server, tmp_path):
+        client = server.client()
+        path = tmp_path / "saved.parquet"
+
+        report = client.export_saved_tracks(path)
+
+        table = pq.read_table(path)
+        assert (report.rows, report.format) == (230, "parquet")
+        assert table.schema == arrow_schema(SavedTrackObject)
+        saved = list(client.get_user_saved_tracks())
+        assert table.column("added_at").to_pylist() == [item.added_at for item in saved]
+        assert (
+            table.column("track").to_pylist()[5]["artists"][0]["id"]
+            == saved[5].track.artists[0].id
+        )
+        assert os.listdir(tmp_path) == ["saved.parquet"]
+
+    def test_row_group_size(self, tmp_path):
+        catalog = SyntheticCatalog(tracks=24, albums=2, artists=2)
+        tracks = [catalog.track(i) for i in range(24)]
+        path = tmp_path / "tracks.parquet"
+
+        with ParquetWriter(
+            path, Track, ["id", "artists.name"], row_group_size=10
+        ) as writer:
+            writer.write_many(tracks[:12])
+            writer.write_many(tracks[12:])
+
+        metadata = pq.ParquetFile(path).metadata
+        assert [
+            metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)
+        ] == [10, 10, 4]
+        table = pq.read_table(path)
+        assert table.column("id").to_pylist() == [track["id"] for track in tracks]
+        assert table.column("artists.name").to_pylist()[7] == [
+            artist["name"] for artist in tracks[7]["artists"]
+        ]
+
+    def test_selected_columns_match_lookup(self):
+        catalog = SyntheticCatalog(tracks=10, albums=2, artists=3)
+        columns = [
+            "added_at",
+            "track.artists.name",
+            "track.album.images.0.url",
+            "track.album.artists.id",
+        ]
+        items = [catalog.saved_item("track", i) for i in range(10)] + [
+            {"added_at": None, "track": None},
+            {"track": {"artists": [{"name": None}, {"name": "x"}]}},
+        ]
+
+        batch = record_batch(items, SavedTrackObject, columns)
+
+        assert batch.to_pylist() == [
+            {column: lookup(item, column) for column in columns} for item in items
+        ]
+
+    def test_playlist_columns_and_catalog_exports(self, server, tmp_path):
+        client = server.client()
+        playlist_id = next(iter(server.app.playlists))
+        ids = [spotify_id("track", i) for i in range(150)]
+
+        client.export_playlist(
+            playlist_id,
+            tmp_path / "items.parquet",
+            columns=["added_at", "track.artists.name"],
+        )
+        client.export_audio_features(ids, tmp_path / "features.parquet")
+        output = io.BytesIO()
+        client.export_tracks(
+            ids[:60], output, format="parquet", columns=["id", "album.name"]
+        )
+
+        items = pq.read_table(tmp_path / "items.parquet")
+        features = pq.read_table(tmp_path / "features.parquet")
+        tracks = pq.read_table(pa.BufferReader(output.getvalue()))
+        assert items.num_rows == 120
+        assert items.schema.field("track.artists.name").type == pa.list_(pa.string())
+        assert features.num_rows == 150
+        assert features.schema == arrow_schema(AudioFeaturesObject)
+        assert tracks.column("id").to_pylist() == ids[:60]
@@ -0,0 +1,185 @@
+import csv
+import gzip
+import io
+import json
+import os
+import stat
+import time
+
+import pytest
+
+from rebel_rhythms import ItemsType, SpotifyClientException, fields_filter, lookup
+from rebel_rhythms.export import PLAYLIST_ITEM_COLUMNS, prefetch
+from rebel_rhythms.testing import FakeSpotifyServer
+
+
+@pytest.fixture
+def server():
+    with FakeSpotifyServer(
+        tracks=300,
+        albums=20,
+        artists=10,
+        saved_tracks=120,
+        playlists=1,
+        playlist_size=250,
+    ) as server:
+        server.app.save("albums", range(15))
+        yield server
+
+
+@pytest.fixture
+def playlist_id(server):
+    return next(iter(server.app.playlists))
+
+
+def read_ndjson(path):
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+class TestLookup:
+    def test_paths_cross_lists_and_index_them(self):
+        item = {
+            "track": {
+                "artists": [{"name": "A"}, {"name": "B"}],
+                "album": {"images": [{"url": "x"}]},
+            }
+        }
+
+        assert lookup(item, "track.artists.name") == ["A", "B"]
+        assert lookup(item, "track.album.images.0.url") == "x"
+        assert lookup(item, "track.album.images.3.url") is None
+        assert lookup(item, "track.missing.name") is None
+
+    def test_fields_filter(self):
+        assert fields_filter(
+            ["added_at", "track.name", "track.artists.name", "track.album.images.0.url"]
+        ) == ("items(added_at,track(name,artists(name),album(images(url)))),next")
+
+
+class TestExport:
+    def test_playlist_to_gzipped_ndjson(self, server, playlist_id, tmp_path):
+        client = server.client()
+        path = tmp_path / "playlist.ndjson.gz"
+
+        report = client.export_playlist(playlist_id, path)
+
+        assert (report.rows, report.pages, report.format) == (250, 3, "ndjson")
+        assert read_ndjson(path) == list(client.get_raw_playlist_items(playlist_id))
+        assert os.listdir(tmp_path) == ["playlist.ndjson.gz"]
+
+    def test_csv_uses_default_columns_and_joins_lists(
+        self, server, playlist_id, tmp_path
+    ):
+        client = server.client()
+        path = tmp_path / "playlist.csv"
+
+        client.export_playlist(playlist_id, str(path))
+
+        with open(path, newline="", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        track = client.get_track(rows[0]["track.id"])
+        assert list(rows[0]) == list(PLAYLIST_ITEM_COLUMNS)
+        assert len(rows) == 250
+        assert rows[0]["track.artists.name"] == "; ".join(
+            artist.name for artist in track.artists
+        )
+        assert rows[0]["track.explicit"] in ("true", "false")
+
+    def test_selected_columns_to_an_open_file(self, server):
+        client = server.client()
+        output = io.StringIO()
+
+        report = client.export_saved_tracks(
+            output, columns=["added_at", "track.name", "track.artists.name"]
+        )
+
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert report.rows == len(lines) == 120
+        assert set(lines[0]) == {"added_at", "track.name", "track.artists.name"}
+        assert isinstance(lines[0]["track.artists.name"], list)
+        assert not output.closed
+
+    def test_gzip_csv_to_binary_file(self, server):
+        client = server.client()
+        output = io.BytesIO()
+
+        client.export_saved_albums(
+            output, format="csv", compress=True, columns=["album.id", "album.name"]
+        )
+
+        rows = list(
+            csv.reader(io.StringIO(gzip.decompress(output.getvalue()).decode("utf-8")))
+        )
+        assert rows[0] == ["album.id", "album.name"]
+        assert len(rows) == 16
+
+    def test_top_items_and_search(self, server, tmp_path):
+        client = server.client()
+
+        top = client.export_top_items(
+            tmp_path / "artists.csv", items_type=ItemsType.ARTISTS
+        )
+        artist = server.app.catalog.simplified_artist(0)["name"]
+        found = client.export_search(
+            f'artist:"{artist}"', "track", tmp_path / "search.ndjson", max_items=20
+        )
+
+        assert top.rows == 10
+        assert found.rows == 20
+        items = read_ndjson(tmp_path / "search.ndjson")
+        assert all(artist in lookup(item, "artists.name") for item in items)
+
+    def test_failed_export_leaves_no_file(self, server, playlist_id, tmp_path):
+        client = server.client()
+        path = tmp_path / "playlist.ndjson"
+        path.write_text("previous backup\n")
+        server.fail_next(404)
+
+        with pytest.raises(SpotifyClientException):
+            client.export_playlist(playlist_id, path)
+
+        assert os.listdir(tmp_path) == ["playlist.ndjson"]
+        assert path.read_text() == "previous backup\n"
+
+    def test_replaced_files_get_the_usual_mode(self, server, playlist_id, tmp_path):
+        client = server.client()
+        umask = os.umask(0o022)
+        try:
+            client.export_playlist(playlist_id, tmp_path / "new.ndjson")
+            existing = tmp_path / "existing.ndjson"
+            existing.write_text("previous backup\n")
+            existing.chmod(0o640)
+            client.export_playlist(playlist_id, existing)
+        finally:
+            os.umask(umask)
+
+        assert stat.S_IMODE(os.stat(tmp_path / "new.ndjson").st_mode) == 0o644
+        assert stat.S_IMODE(os.stat(existing).st_mode) == 0o640
+
+
+class TestPrefetch:
+    def test_stays_a_bounded_number_of_pages_ahead(self):
+        produced = []
+
+        def pages():
+            for i in range(10):
+                produced.append(i)
+                yield [i]
+
+        iterator = prefetch(pages(), depth=2)
+        assert next(iterator) == [0]
+        time.sleep(0.2)
+
+        # One page handed out, two queued and one waiting to be queued.
+        assert len(produced) <= 4
+        assert list(iterator) == [[i] for i in range(1, 10)]
+
+    def test_errors_reach_the_consumer(self):
+        def pages():
+            yield [1]
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            list(prefetch(pages(), depth=1))
@@ -0,0 +1,119 @@
+import pytest
+import requests
+
+from rebel_rhythms import SpotifyClient, SpotifyClientCredentialsAuth
+from rebel_rhythms.custom_exceptions import InternalServerErrorException
+from rebel_rhythms.testing import FakeSpotifyServer, spotify_id
+
+
+@pytest.fixture
+def server():
+    with FakeSpotifyServer(
+        tracks=500, saved_tracks=120, playlists=2, playlist_size=150
+    ) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    return server.client()
+
+
+def track_uri(index):
+    return f"spotify:track:{spotify_id('track', index)}"
+
+
+class TestFakeSpotifyServer:
+    def test_paginates_saved_tracks(self, server, client):
+        saved = list(client.get_user_saved_tracks())
+
+        assert len(saved) == 120
+        assert len({item.track.id for item in saved}) == 120
+        assert server.count("get", "/v1/me/tracks") == 3
+
+    def test_catalog_lookups_and_batch_limits(self, server, client):
+        ids = [spotify_id("track", i) for i in range(50)]
+
+        tracks = client.get_tracks(ids)
+
+        assert [track.id for track in tracks] == ids
+        assert client.get_album(spotify_id("album", 3)).id == spotify_id("album", 3)
+        response = requests.get(
+            f"{server.base_url}/v1/tracks",
+            params={"ids": ",".join(ids + ids[:1])},
+            headers=client.request_manager.headers,
+        )
+        assert response.status_code == 400
+
+    def test_playlist_snapshots_change_on_every_edit(self, server, client):
+        playlist = client.create_playlist("Mix")
+        snapshot = client.get_playlist_snapshot_id(playlist.id)
+
+        client.add_tracks_to_playlist(
+            playlist.id, [track_uri(1), track_uri(2), track_uri(1)]
+        )
+        after_add = client.get_playlist_snapshot_id(playlist.id)
+        client.remove_playlist_items_at_positions(
+            playlist.id, [(track_uri(1), 2)], after_add
+        )
+
+        items = list(client.get_raw_playlist_items(playlist.id))
+        assert [item["track"]["uri"] for item in items] == [track_uri(1), track_uri(2)]
+        assert (
+            len({snapshot, after_add, client.get_playlist_snapshot_id(playlist.id)})
+            == 3
+        )
+
+    def test_retries_after_rate_limit(self, server, client):
+        server.fail_next(429, times=2, retry_after=0.01)
+
+        profile = client.get_current_user_profile()
+
+        assert profile.id == "tester"
+        assert server.count("get", "/v1/me", status=429) == 2
+
+    def test_server_errors_are_retried_for_reads_only(self, server, client):
+        server.fail_next(503)
+        assert client.get_track(spotify_id("track", 0)).id == spotify_id("track", 0)
+
+        server.fail_next(503)
+        with pytest.raises(InternalServerErrorException):
+            client.save_tracks_for_current_user([spotify_id("track", 0)])
+
+    def test_expired_token_is_refreshed_once(self, server, client):
+        client.warmup()
+        server.expire_tokens()
+
+        client.get_current_user_profile()
+        client.get_current_user_profile()
+
+        assert server.count("post", "/api/token") == 1
+        assert server.count("get", "/v1/me", status=401) == 1
+
+    def test_injected_latency(self, server, client):
+        server.inject(latency=0.05)
+
+        elapsed = requests.get(f"{server.base_url}/v1/me").elapsed.total_seconds()
+
+        assert elapsed >= 0.05
+        with pytest.raises(TypeError):
+            server.inject(latncy=1)
+
+    def test_client_credentials_against_token_endpoint(self, server):
+        client = SpotifyClient.from_client_credentials(
+            "client_id",
+            "client_secret",
+            token_url=server.token_url,
+            api_base_url=server.base_url,
+        )
+
+        assert isinstance(client.spotify_auth, SpotifyClientCredentialsAuth)
+        assert client.get_artist(spotify_id("artist", 1)).id == spotify_id("artist", 1)
+        assert server.count("post", "/api/token") == 1
+
+    def test_search_by_isrc(self, server, client):
+        isrc = server.catalog.track(42)["external_ids"]["isrc"]
+
+        results = list(client.search(f"isrc:{isrc}", "track"))
+
+        assert [track.id for track in results] == [spotify_id("track", 42)]
@@ -0,0 +1,45 @@
+import json
+import subprocess
+import sys
+
+import rebel_rhythms
+
+HEAVY_MODULES = [
+    "requests",
+    "pydantic",
+    "webbrowser",
+    "http.server",
+    "rebel_rhythms.models",
+]
+
+
+def loaded_after(code):
+    script = (
+        "import json, sys\n"
+        f"{code}\n"
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+class TestImport:
+    def test_package_import_is_lazy(self):
+        assert loaded_after("import rebel_rhythms") == []
+
+    def test_lightweight_names_stay_light(self):
+        code = (
+            "from rebel_rhythms import ContentType, SpotifyClientException, RateLimiter"
+        )
+        assert loaded_after(code) == []
+
+    def test_client_import_skips_interactive_auth_modules(self):
+        loaded = loaded_after("from rebel_rhythms import SpotifyClient")
+        assert "webbrowser" not in loaded and "http.server" not in loaded
+
+    def test_all_exports_resolve(self):
+        for name in rebel_rhythms.__all__:
+            assert getattr(rebel_rhythms, name) is not None
+        assert rebel_rhythms.normalization.normalize_text("Héllo") == "hello"
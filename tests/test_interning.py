@@ -0,0 +1,96 @@
+import pytest
+from pydantic import ValidationError
+
+from rebel_rhythms import Interner
+from rebel_rhythms.models import ArtistObject, Track, TrackAlbum
+from rebel_rhythms.testing import FakeSpotifyServer, SyntheticCatalog
+
+
+@pytest.fixture
+def server():
+    with FakeSpotifyServer(
+        tracks=400, albums=10, artists=5, playlists=1, playlist_size=400
+    ) as server:
+        yield server
+
+
+@pytest.fixture
+def playlist_id(server):
+    return next(iter(server.app.playlists))
+
+
+class TestInterning:
+    def test_paginated_items_share_artists_and_albums(self, server, playlist_id):
+        client = server.client()
+
+        with client.interning() as interner:
+            items = list(client.get_all_playlist_tracks(playlist_id))
+
+        albums = {id(item.track.album) for item in items}
+        artists = {id(artist) for item in items for artist in item.track.artists}
+        assert len(albums) == 10
+        assert len(artists) == 5
+        assert len({id(item.added_by) for item in items}) == 1
+        assert len({id(item.track.type) for item in items}) == 1
+        assert interner.hits > 0
+
+    def test_table_only_holds_entities_and_enum_strings(self, server, playlist_id):
+        client = server.client()
+
+        with client.interning() as interner:
+            items = list(client.get_all_playlist_tracks(playlist_id))
+
+        # Albums, artists (as track and as album artists) and the one owner.
+        assert interner.stats["objects"] == 10 + 2 * 5 + 1
+        assert interner.stats["strings"] < 20
+        assert len({id(item.track.name) for item in items}) == len(items)
+
+    def test_shared_objects_behave_like_models(self, server, playlist_id):
+        client = server.client()
+        plain = list(client.get_all_playlist_tracks(playlist_id, max_items=20))
+
+        with client.interning():
+            interned = list(client.get_all_playlist_tracks(playlist_id, max_items=20))
+
+        assert interned == plain
+        assert (
+            plain[0].track == interned[0].track and interned[0].track == plain[0].track
+        )
+        assert interned[0].track.album != plain[1].track.album
+        assert [item.model_dump() for item in interned] == [
+            item.model_dump() for item in plain
+        ]
+        assert [item.model_dump_json() for item in interned] == [
+            item.model_dump_json() for item in plain
+        ]
+        album = interned[0].track.album
+        assert isinstance(album, TrackAlbum)
+        with pytest.raises(ValidationError):
+            album.name = "changed"
+        with pytest.raises(TypeError):
+            album.images.append(album.images[0])
+        with pytest.raises(TypeError):
+            album.artists[0] = album.artists[0]
+        assert hash(album) == hash(album.model_copy())
+        assert interned[0].model_copy(deep=True) == plain[0]
+
+    def test_off_outside_the_block(self, server, playlist_id):
+        client = server.client()
+        with client.interning():
+            pass
+
+        items = list(client.get_all_playlist_tracks(playlist_id, max_items=100))
+
+        assert len({id(item.track.album) for item in items}) > 10
+
+    def test_interner_can_be_used_directly(self):
+        catalog = SyntheticCatalog(tracks=20, albums=2, artists=1)
+        interner = Interner()
+
+        tracks = [interner.intern(Track(**catalog.track(i))) for i in range(20)]
+        raw = interner.intern(catalog.track(3))
+
+        assert tracks[0].album is tracks[2].album
+        assert isinstance(tracks[0].artists[0], ArtistObject)
+        assert raw["album"]["type"] is tracks[0].album.type
+        assert interner.stats["objects"] == len(interner)
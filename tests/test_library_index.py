@@ -0,0 +1,160 @@
+import pytest
+
+from rebel_rhythms import JsonFileStateStore, LibraryIndex, LibrarySync, PlaylistMirror
+from rebel_rhythms.testing import FakeSpotifyServer, spotify_id
+
+
+def track(track_id, name, artists, album):
+    return {
+        "id": track_id,
+        "uri": f"spotify:track:{track_id}",
+        "name": name,
+        "artists": [{"name": artist} for artist in artists],
+        "album": {"name": album},
+        "duration_ms": 200000,
+    }
+
+
+@pytest.fixture
+def index():
+    index = LibraryIndex()
+    index.add(track("joga", "Jóga", ["Björk"], "Homogenic"))
+    index.add(track("hoppipolla", "Hoppípolla", ["Sigur Rós"], "Takk..."))
+    index.add(track("karma", "Karma Police", ["Radiohead"], "OK Computer"))
+    index.add(track("airbag", "Airbag", ["Radiohead"], "OK Computer"))
+    index.add(
+        {
+            "track": track(
+                "police", "Every Breath You Take", ["The Police"], "Synchronicity"
+            )
+        }
+    )
+    return index
+
+
+def keys(matches):
+    return [match.track.key for match in matches]
+
+
+class TestSearch:
+    def test_folds_case_and_diacritics(self, index):
+        assert keys(index.search("BJORK joga")) == ["joga"]
+        assert keys(index.search("sigur ros")) == ["hoppipolla"]
+
+    def test_prefix_and_typo_matches(self, index):
+        assert keys(index.search("hoppi")) == ["hoppipolla"]
+        assert keys(index.search("radiohaed karma")) == ["karma"]
+        assert (
+            index.search("radiohaed karma")[0].score
+            < index.search("radiohead karma")[0].score
+            == 0.95
+        )
+
+    def test_title_matches_rank_above_artist_and_album(self, index):
+        matches = index.search("police")
+
+        assert keys(matches) == ["karma", "police"]
+        assert matches[0].score > matches[1].score
+        assert keys(index.search("computer")) == ["karma", "airbag"]
+        assert keys(index.search("police", fields=["artist"])) == ["police"]
+        with pytest.raises(ValueError):
+            index.search("police", fields=["genre"])
+
+    def test_partial_matches_when_no_track_has_every_word(self, index):
+        matches = index.search("airbag nosuchword")
+
+        assert keys(matches) == ["airbag"]
+        assert matches[0].score == 0.5
+        assert index.search("") == [] and index.search("zzzz") == []
+
+    def test_limit_keeps_indexing_order_for_ties(self, index):
+        assert keys(index.search("ok computer", limit=1)) == ["karma"]
+
+    def test_updated_track_is_reindexed(self, index):
+        index.add(
+            track("karma", "Karma Police (Live)", ["Radiohead"], "Live Recordings")
+        )
+
+        assert keys(index.search("live")) == ["karma"]
+        assert keys(index.search("ok computer")) == ["airbag"]
+
+
+class TestSources:
+    def test_track_stays_until_last_source_drops_it(self, index):
+        index.add(
+            track("karma", "Karma Police", ["Radiohead"], "OK Computer"),
+            source="playlist:a",
+        )
+
+        index.remove("karma")
+        assert index.get("karma").sources == ["playlist:a"]
+        assert keys(index.search("karma", source="playlist:a")) == ["karma"]
+        assert index.search("airbag", source="playlist:a") == []
+
+        assert index.drop_source("playlist:a") == 1
+        assert "karma" not in index
+        assert index.search("karma") == []
+
+    def test_source_scoped_search_falls_back_within_the_source(self):
+        index = LibraryIndex()
+        index.add(track("monday", "Blue Monday", ["New Order"], "Power"))
+        index.add(track("sky", "Blue Sky", ["Someone"], "Skies"), source="playlist:p")
+
+        assert keys(index.search("blue monday")) == ["monday"]
+        assert keys(index.search("blue monday", source="playlist:p")) == ["sky"]
+
+    def test_library_sync_and_playlist_mirror(self):
+        with FakeSpotifyServer(tracks=200, albums=20, artists=10) as server:
+            client = server.client()
+            server.app.save("tracks", range(60))
+            playlist = server.app.add_playlist("Mix", range(50, 90))
+            sync = LibrarySync(client, reconcile_every=0)
+            mirror = PlaylistMirror(client)
+            index = LibraryIndex()
+
+            index.apply_library_delta(sync.sync())
+            assert index.apply_playlist(mirror.sync(playlist.id))
+            assert not index.apply_playlist(mirror.sync(playlist.id))
+            assert len(index) == 90
+            assert index.get(spotify_id("track", 55)).sources == [
+                "playlist:" + playlist.id,
+                "saved",
+            ]
+
+            client.remove_user_saved_tracks([spotify_id("track", i) for i in range(10)])
+            client.remove_playlist_items(
+                playlist.id, [f"spotify:track:{spotify_id('track', 85)}"]
+            )
+            index.apply_library_delta(sync.sync())
+            index.apply_playlist(mirror.sync(playlist.id))
+
+            assert len(index) == 79
+            assert spotify_id("track", 3) not in index
+            assert index.get(spotify_id("track", 55)).sources == [
+                "playlist:" + playlist.id,
+                "saved",
+            ]
+            name = server.app.catalog.track(70)["name"]
+            assert spotify_id("track", 70) in keys(index.search(name, limit=100))
+
+
+class TestPersistence:
+    def test_save_and_load(self, index, tmp_path):
+        store = JsonFileStateStore(str(tmp_path))
+        index.remove("airbag")
+        index.add(
+            track("karma", "Karma Police", ["Radiohead"], "OK Computer"),
+            source="playlist:a",
+        )
+
+        index.save(store)
+        loaded = LibraryIndex.load(store)
+
+        assert len(loaded) == len(index) == 4
+        for query in ("bjork", "police", "radiohaed", "comp"):
+            assert loaded.search(query) == index.search(query)
+        assert loaded.get("karma").sources == ["playlist:a", "saved"]
+        assert len(LibraryIndex.load(store, key="missing")) == 0
+
+        loaded.add(track("airbag", "Airbag", ["Radiohead"], "OK Computer"))
+        assert keys(loaded.search("airbag")) == ["airbag"]
@@ -0,0 +1,117 @@
+import pytest
+
+from conftest import track_ids
+from rebel_rhythms import JsonFileStateStore, LibraryKind, LibrarySync, StateStore
+from rebel_rhythms.testing import spotify_id
+
+
+@pytest.fixture
+def library(app):
+    app.save("tracks", range(1000))
+    return app
+
+
+def remote_ids(app):
+    return [spotify_id("track", i) for i in reversed(app.saved["tracks"])]
+
+
+class TestLibrarySync:
+    def test_initial_sync_fetches_everything(self, offline_client, library):
+        delta = LibrarySync(offline_client).sync()
+        assert len(delta.added) == 1000
+        assert delta.requests == 20
+
+    def test_unchanged_library_costs_one_request(self, offline_client, library):
+        sync = LibrarySync(offline_client, reconcile_every=0)
+        sync.sync()
+
+        delta = sync.sync()
+
+        assert delta.added == [] and delta.removed == []
+        assert delta.requests == 1
+
+    def test_new_saves_only(self, offline_client, library):
+        sync = LibrarySync(offline_client, reconcile_every=0)
+        sync.sync()
+        library.save("tracks", range(1000, 1003))
+
+        delta = sync.sync()
+
+        assert [item["track"]["id"] for item in delta.added] == remote_ids(library)[:3]
+        assert delta.requests == 1
+        assert sync.item_ids() == remote_ids(library)
+        assert sync.high_water_mark() == next(
+            reversed(library.saved["tracks"].values())
+        )
+
+    def test_resaved_item_moves_to_top(self, offline_client, library):
+        sync = LibrarySync(offline_client, reconcile_every=0)
+        sync.sync()
+        library.save("tracks", [10])
+
+        delta = sync.sync()
+
+        assert len(delta.added) == 1 and not delta.reconciled
+        assert sync.item_ids() == remote_ids(library)
+
+    def test_removals_are_located_by_bisection(self, offline_client, library):
+        sync = LibrarySync(offline_client, reconcile_every=0)
+        sync.sync()
+        for i in (3, 500, 501, 998):
+            del library.saved["tracks"][i]
+        library.save("tracks", [2000])
+
+        delta = sync.sync()
+
+        assert delta.reconciled and not delta.full_resync
+        assert sorted(delta.removed) == [
+            track_ids(1, start=i)[0] for i in (3, 500, 501, 998)
+        ]
+        assert len(delta.added) == 1
+        assert delta.requests < 15
+        assert sync.item_ids() == remote_ids(library)
+
+    def test_periodic_sample_catches_compensating_changes(self, offline_client, app):
+        # A single page, so the random sample always covers the change.
+        app.save("tracks", range(50))
+        sync = LibrarySync(offline_client, reconcile_every=2)
+        sync.sync()
+        # Swap the order of two old entries; totals stay the same.
+        newest_first = list(reversed(app.saved["tracks"]))
+        app.saved["tracks"][newest_first[10]] = "x"
+        app.saved["tracks"][newest_first[11]] = "y"
+
+        delta = sync.sync()
+
+        assert delta.reconciled and delta.full_resync
+        assert [e for e in sync._load_state()["items"]][10][1] == "x"
+
+    def test_state_persists_across_instances(self, offline_client, library, tmp_path):
+        LibrarySync(offline_client, store=JsonFileStateStore(str(tmp_path))).sync()
+
+        delta = LibrarySync(
+            offline_client, store=JsonFileStateStore(str(tmp_path)), reconcile_every=0
+        ).sync()
+
+        assert delta.requests == 1
+
+    def test_saved_albums(self, offline_client, app):
+        app.save("albums", [1])
+        sync = LibrarySync(offline_client, LibraryKind.ALBUMS)
+
+        album_id = spotify_id("album", 1)
+        assert [item["album"]["id"] for item in sync.sync().added] == [album_id]
+        del app.saved["albums"][1]
+        assert sync.sync().removed == [album_id]
+
+    def test_invalid_kind(self, offline_client):
+        with pytest.raises(ValueError):
+            LibrarySync(offline_client, kind="tracks")
+
+    def test_incomplete_state_store_fails_on_creation(self):
+        class GetOnlyStore(StateStore):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            GetOnlyStore()
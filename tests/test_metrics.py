@@ -0,0 +1,142 @@
+import pytest
+import requests
+
+from rebel_rhythms import MetricsRegistry, RequestHook, endpoint_template
+from rebel_rhythms.testing import FakeSpotifyServer, spotify_id
+
+
+@pytest.fixture
+def server():
+    with FakeSpotifyServer(tracks=200, saved_tracks=60) as server:
+        yield server
+
+
+class Recorder(RequestHook):
+    def __init__(self):
+        self.events = []
+
+    def before_request(self, info):
+        self.events.append(("before", info.template, info.attempt))
+
+    def after_response(self, info, response, elapsed):
+        self.events.append(("after", info.template, response.status_code))
+
+    def on_retry(self, info, reason, delay):
+        self.events.append(("retry", reason))
+
+
+class TestEndpointTemplate:
+    @pytest.mark.parametrize(
+        "endpoint, template",
+        [
+            (
+                "/v1/playlists/37i9dQZF1DWZtGWF9Ltb0N/tracks",
+                "/v1/playlists/{id}/tracks",
+            ),
+            ("/v1/users/spotify/playlists", "/v1/users/{user_id}/playlists"),
+            ("/v1/browse/categories/toplists", "/v1/browse/categories/{category_id}"),
+            ("/v1/me/tracks?offset=50", "/v1/me/tracks"),
+            (
+                "/v1/recommendations/available-genre-seeds",
+                "/v1/recommendations/available-genre-seeds",
+            ),
+        ],
+    )
+    def test_ids_become_placeholders(self, endpoint, template):
+        assert endpoint_template(endpoint) == template
+
+
+class TestHooks:
+    def test_hooks_see_every_send(self, server):
+        client = server.client()
+        recorder = client.request_manager.add_hook(Recorder())
+        server.fail_next(429, retry_after=0.01)
+
+        client.get_track(spotify_id("track", 1))
+
+        assert recorder.events == [
+            ("before", "/v1/tracks/{id}", 0),
+            ("after", "/v1/tracks/{id}", 429),
+            ("retry", "rate_limited"),
+            ("before", "/v1/tracks/{id}", 1),
+            ("after", "/v1/tracks/{id}", 200),
+        ]
+
+        client.request_manager.remove_hook(recorder)
+        client.get_track(spotify_id("track", 1))
+        assert len(recorder.events) == 5
+
+
+class TestRequestMetrics:
+    def test_counts_requests_latency_and_bytes(self, server):
+        client = server.client()
+        metrics = client.enable_metrics()
+
+        list(client.get_user_saved_tracks())
+        server.fail_next(503)
+        client.get_track(spotify_id("track", 3))
+
+        assert (
+            metrics.requests.value(method="get", endpoint="/v1/me/tracks", status="200")
+            == 2
+        )
+        assert metrics.latency.count(method="get", endpoint="/v1/me/tracks") == 2
+        assert metrics.response_bytes.value(method="get", endpoint="/v1/me/tracks") > 0
+        assert (
+            metrics.retries.value(
+                method="get", endpoint="/v1/tracks/{id}", reason="server_error"
+            )
+            == 1
+        )
+        assert (
+            metrics.requests.value(
+                method="get", endpoint="/v1/tracks/{id}", status="503"
+            )
+            == 1
+        )
+
+    def test_counts_token_refreshes_and_cache_lookups(self, server):
+        client = server.client()
+        metrics = client.enable_metrics()
+        client.warmup()
+        server.expire_tokens()
+
+        client.get_current_user_profile()
+        client.request_manager.notify_cache(
+            f"/v1/tracks/{spotify_id('track', 1)}", hit=True
+        )
+
+        assert metrics.token_refreshes.value() == 1
+        assert metrics.cache.value(endpoint="/v1/tracks/{id}", result="hit") == 1
+
+    def test_prometheus_text_format(self):
+        registry = MetricsRegistry()
+        registry.counter("jobs_total", "Jobs.", ("queue",)).inc(queue='a"b')
+        registry.histogram("wait_seconds", "Wait.", buckets=(0.1, 1)).observe(0.5)
+
+        assert registry.render() == (
+            "# HELP jobs_total Jobs.\n"
+            "# TYPE jobs_total counter\n"
+            'jobs_total{queue="a\\"b"} 1\n'
+            "# HELP wait_seconds Wait.\n"
+            "# TYPE wait_seconds histogram\n"
+            'wait_seconds_bucket{le="0.1"} 0\n'
+            'wait_seconds_bucket{le="1"} 1\n'
+            'wait_seconds_bucket{le="+Inf"} 1\n'
+            "wait_seconds_sum 0.5\n"
+            "wait_seconds_count 1\n"
+        )
+
+    def test_serves_metrics_over_http(self, server):
+        client = server.client()
+        metrics = client.enable_metrics()
+        client.get_current_user_profile()
+
+        with metrics.serve() as endpoint:
+            response = requests.get(endpoint.url)
+
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert (
+            'spotify_requests_total{method="get",endpoint="/v1/me",status="200"} 1'
+            in response.text
+        )
@@ -0,0 +1,82 @@
+import pytest
+
+from rebel_rhythms.models import ArtistObject, SimplifiedAlbumObject, Track
+from rebel_rhythms.testing import FakeSpotifyServer
+
+
+@pytest.fixture
+def server():
+    with FakeSpotifyServer(tracks=600, albums=80, artists=40) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    return server.client()
+
+
+def ids(items):
+    return [item.id for item in items]
+
+
+class TestMultiSearch:
+    def test_one_request_per_page_across_types(self, server, client):
+        expected = {
+            t: ids(client.search("golden", t)) for t in ("track", "artist", "album")
+        }
+        before = server.count("get", "/v1/search")
+
+        results = client.multi_search("golden", ["track", "artist", "album"]).collect()
+
+        assert {t: ids(items) for t, items in results.items()} == expected
+        assert isinstance(results["artist"][0], ArtistObject)
+        assert isinstance(results["album"][0], SimplifiedAlbumObject)
+        # 140 tracks need 3 pages; artists and albums fit in the first one.
+        assert server.count("get", "/v1/search") - before == 3
+
+    def test_exhausted_types_drop_out_of_later_requests(self, server, client):
+        search = client.multi_search("golden", ["track", "album"])
+        requested = []
+        get = client.request_manager.get
+
+        def recording_get(endpoint, **kwargs):
+            requested.append(kwargs["params"]["type"])
+            return get(endpoint, **kwargs)
+
+        client.request_manager.get = recording_get
+        tracks = list(search["track"])
+        albums = list(search["album"])
+
+        assert requested == ["track,album", "track", "track"]
+        assert len(tracks) == 140
+        assert len(albums) == 22
+        assert all(isinstance(track, Track) for track in tracks)
+
+    def test_per_type_max_items(self, client):
+        search = client.multi_search(
+            "golden", ["track", "artist"], max_items={"track": 60, "artist": 2}
+        )
+
+        tracks = list(search["track"])
+        artists = list(search["artist"])
+
+        assert (len(tracks), len(artists)) == (60, 2)
+        assert search.requests == 2
+        assert search.totals == {"track": 140, "artist": 6}
+
+    def test_closing_a_generator_stops_fetching_its_type(self, client):
+        search = client.multi_search("golden", ["track", "album"], max_items=100)
+        tracks = search["track"]
+        next(tracks)
+
+        tracks.close()
+
+        assert len(list(search["album"])) == 22
+        assert search.exhausted
+        assert search.requests == 1
+
+    def test_invalid_types(self, client):
+        with pytest.raises(ValueError):
+            client.multi_search("golden", ["track", "show"])
+        with pytest.raises(ValueError):
+            client.multi_search("golden", ["track"], max_items={"album": 3})
@@ -0,0 +1,174 @@
+from typing import Any, Dict
+
+import pytest
+
+from conftest import uris
+from rebel_rhythms.normalization import fuzzy_track_key, normalize_isrc, normalize_title
+from rebel_rhythms import PlaylistChangedException
+from rebel_rhythms.playlist_dedupe import (
+    DEDUPE_FIELDS,
+    DuplicateIndex,
+    track_identity_keys,
+)
+from rebel_rhythms.testing import SyntheticCatalog
+
+CATALOG = SyntheticCatalog()
+
+
+def track(index, **overrides):
+    return {**CATALOG.track(index), **overrides}
+
+
+def insert(playlist, index, position):
+    """Change the playlist behind the client's back."""
+    playlist.entries.insert(position, (index, "2021-01-01T00:00:00Z"))
+    playlist.commit()
+
+
+class TestNormalization:
+    def test_normalize_isrc(self):
+        assert normalize_isrc("us-aaa-20-00001") == "USAAA2000001"
+        assert normalize_isrc(" USAAA2000001 ") == "USAAA2000001"
+        assert normalize_isrc("not an isrc") is None
+        assert normalize_isrc(None) is None
+
+    def test_normalize_title_strips_decorations(self):
+        assert normalize_title("Héroes (2017 Remaster)") == "heroes"
+        assert normalize_title("Song - Remastered 2009") == "song"
+        assert normalize_title("Song [feat. Someone]") == "song"
+        assert normalize_title("Song (Live)") == "song live"
+
+    def test_fuzzy_key_requires_title_and_artist(self):
+        assert fuzzy_track_key("Song", ["Artist"]) == fuzzy_track_key(
+            "song!", ["ARTIST"]
+        )
+        assert fuzzy_track_key("Song", []) is None
+
+
+class TestDuplicateIndex:
+    def test_isrc_matches_re_release(self):
+        index = DuplicateIndex(fuzzy=False)
+        original = track(1)
+        isrc = original["external_ids"]["isrc"]
+        re_release = track(2, external_ids={"isrc": f"{isrc[:5]}-{isrc[5:]}".lower()})
+        assert index.add(original) is False
+        assert index.add(re_release) is True
+
+    def test_same_name_different_recording_is_not_duplicate_without_fuzzy(self):
+        index = DuplicateIndex(fuzzy=False)
+        assert index.add(track(1, name="Intro")) is False
+        assert index.add(track(2, name="Intro")) is False
+
+    def test_fuzzy_fallback(self):
+        index = DuplicateIndex()
+        first = track(1, external_ids={})
+        second = track(2, external_ids={}, name=f"{first['name']} - 2011 Remaster")
+        second["artists"] = first["artists"]
+        assert index.add(first) is False
+        assert index.add(second) is True
+
+    def test_fuzzy_match_with_conflicting_isrcs_is_kept(self):
+        index = DuplicateIndex()
+        first = track(1, name="Intro", external_ids={"isrc": "GBBKS0900001"})
+        second = track(2, name="Intro", external_ids={"isrc": "GBBKS1200099"})
+        second["artists"] = first["artists"]
+        without_isrc = track(3, name="Intro", external_ids={})
+        without_isrc["artists"] = first["artists"]
+
+        assert index.add(first) is False
+        assert index.add(second) is False
+        assert index.add(without_isrc) is True
+
+    def test_local_tracks_keyed_by_uri(self):
+        local: Dict[str, Any] = {
+            "id": None,
+            "uri": "spotify:local:a:b:c:1",
+            "name": "x",
+            "artists": [],
+        }
+        assert track_identity_keys(local) == ["uri:spotify:local:a:b:c:1"]
+
+
+class TestPlaylistDedupe:
+    def test_removes_only_later_occurrences(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [1, 2, 1, 3, 1, 2])
+
+        report = offline_client.remove_duplicate_tracks(playlist.id)
+
+        assert playlist.tracks == [1, 2, 3]
+        assert report.removed == 3
+        assert report.scanned == 6
+        assert report.duplicates == {uris(1)[0]: [2, 4], uris(2)[0]: [5]}
+        assert report.snapshot_id == playlist.snapshot_id
+
+    def test_deletes_in_batches_of_100(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [1] * 250)
+
+        offline_client.remove_duplicate_tracks(playlist.id)
+
+        assert playlist.tracks == [1]
+        deletes = [r.json() for r in app.requests if r.method == "DELETE"]
+        assert [len(d["tracks"][0]["positions"]) for d in deletes] == [100, 100, 49]
+
+    def test_dry_run_does_not_write(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [1, 1])
+
+        report = offline_client.remove_duplicate_tracks(playlist.id, dry_run=True)
+
+        assert report.removed == 1
+        assert len(playlist.entries) == 2
+        assert app.count("DELETE") == 0
+
+    def test_dedupe_across_playlists(self, offline_client, app):
+        first = app.add_playlist("Mix", [1, 2])
+        second = app.add_playlist("Other", [2, 3, 1])
+
+        reports = offline_client.remove_duplicates_across_playlists(
+            [first.id, second.id]
+        )
+
+        assert first.tracks == [1, 2]
+        assert second.tracks == [3]
+        assert [report.removed for report in reports] == [0, 2]
+
+    def test_relinked_tracks_are_removed_by_original_uri(self, offline_client, app):
+        app.relink(9, 1)
+        playlist = app.add_playlist("Mix", [1, 9])
+
+        report = offline_client.remove_duplicate_tracks(playlist.id)
+
+        assert report.duplicates == {uris(9)[0]: [1]}
+        assert playlist.tracks == [1]
+
+    def test_uses_fields_projection(self, offline_client, app):
+        playlist = app.add_playlist("Mix", range(150))
+        offline_client.remove_duplicate_tracks(playlist.id)
+        reads = [r.params for r in app.requests if r.method == "GET"]
+        assert reads[0]["fields"] == f"snapshot_id,tracks({DEDUPE_FIELDS})"
+        assert reads[1]["fields"] == DEDUPE_FIELDS and reads[1]["offset"] == "100"
+
+    def test_rereads_when_playlist_changes_during_read(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [*range(150), 0])
+
+        def change_once(request):
+            if request.path.endswith("/tracks") and len(playlist.entries) == 151:
+                insert(playlist, 1, position=0)
+
+        app.intercept = change_once
+        report = offline_client.remove_duplicate_tracks(playlist.id)
+
+        assert report.scanned == 152
+        # The track inserted at the front is now the first occurrence.
+        assert playlist.tracks == [1, 0, *range(2, 150)]
+
+    def test_gives_up_on_a_playlist_that_keeps_changing(self, offline_client, app):
+        playlist = app.add_playlist("Mix", range(150))
+
+        def change(request):
+            if request.path.endswith("/tracks"):
+                insert(playlist, 1, position=len(playlist.entries))
+
+        app.intercept = change
+        with pytest.raises(PlaylistChangedException):
+            offline_client.remove_duplicate_tracks(playlist.id)
+        assert app.count("DELETE") == 0
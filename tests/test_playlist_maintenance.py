@@ -0,0 +1,115 @@
+import pytest
+
+from rebel_rhythms import (
+    Deduplicate,
+    RemoveUnplayable,
+    Shuffle,
+    SortBy,
+    TrimToLength,
+)
+
+
+def writes(app):
+    return sum(app.count(method) for method in ("POST", "PUT", "DELETE"))
+
+
+class TestPlaylistMaintenance:
+    def test_combined_passes_read_once_and_write_once(self, offline_client, app):
+        app.catalog.change_track(4, is_playable=False)
+        playlist = app.add_playlist("Mix", [1, 4, 2, 1, 3, 2])
+
+        report = offline_client.maintain_playlist(
+            playlist.id, [RemoveUnplayable(), Deduplicate(), TrimToLength(2)]
+        )
+
+        assert playlist.tracks == [1, 2]
+        assert report.scanned == 6 and report.kept == 2 and report.removed == 4
+        assert app.count("GET") == 1
+        assert writes(app) == 1
+
+    def test_remove_unplayable_tracks(self, offline_client, app):
+        app.catalog.change_track(
+            2, is_local=True, is_playable=False, id=None, uri="spotify:local:a:b:c:1"
+        )
+        app.catalog.change_track(3, is_playable=None)
+        app.catalog.change_track(4, is_playable=False)
+        playlist = app.add_playlist("Mix", [1, 4, 2, 3])
+
+        offline_client.remove_unplayable_tracks(playlist.id)
+
+        assert playlist.tracks == [1, 2, 3]
+
+    def test_shuffle_is_seeded_and_cheap(self, offline_client, app):
+        playlist = app.add_playlist("Mix", range(250))
+
+        report = offline_client.shuffle_playlist(playlist.id, seed=7)
+
+        assert sorted(playlist.tracks) == list(range(250))
+        assert playlist.tracks != list(range(250))
+        assert writes(app) == report.plan.request_count == 3
+
+    def test_shuffle_keeps_unavailable_items(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [0, 1, 2, None, 3, 4, 5])
+        original = list(playlist.entries)
+
+        report = offline_client.shuffle_playlist(playlist.id, seed=3)
+
+        assert report.plan.replace_with is None and report.plan.moves
+        assert sorted(playlist.entries, key=original.index) == original
+        assert playlist.entries != original
+
+    def test_unavailable_items_survive_deduplicate(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [1, None, 2, 1, None])
+
+        offline_client.maintain_playlist(playlist.id, [Deduplicate()])
+
+        assert playlist.tracks == [1, None, 2, None]
+
+    def test_sort_by_attribute(self, offline_client, app):
+        for index, popularity in enumerate([5, 90, None, 40]):
+            app.catalog.change_track(index, popularity=popularity)
+        playlist = app.add_playlist("Mix", range(4))
+
+        offline_client.maintain_playlist(playlist.id, [SortBy("popularity")])
+
+        assert playlist.tracks == [0, 3, 1, 2]
+
+    def test_trim_keeps_newest(self, offline_client, app):
+        playlist = app.add_playlist("Mix", range(3))
+        original = list(playlist.entries)
+
+        def added_at(entries):
+            for entry in entries:
+                entry.added_at = f"2020-01-0{entry.position + 1}"
+            return entries
+
+        offline_client.maintain_playlist(
+            playlist.id, [added_at, TrimToLength(2, keep_newest=True)]
+        )
+
+        assert playlist.entries == original[1:]
+
+    def test_dry_run(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [1, 1])
+
+        report = offline_client.maintain_playlist(
+            playlist.id, [Deduplicate()], dry_run=True
+        )
+
+        assert report.plan.dry_run and report.kept == 1
+        assert len(playlist.entries) == 2
+        assert writes(app) == 0
+
+    def test_without_replace_uses_positional_writes(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [1, 2, 1])
+
+        offline_client.maintain_playlist(
+            playlist.id, [Deduplicate()], allow_replace=False
+        )
+
+        assert playlist.tracks == [1, 2]
+        assert app.count("DELETE") == 1 and app.count("PUT") == 0
+
+    def test_invalid_sort_key(self):
+        with pytest.raises(ValueError):
+            SortBy("nope")
@@ -0,0 +1,88 @@
+import pytest
+
+from conftest import uris
+from rebel_rhythms import (
+    JsonFileStateStore,
+    MemoryStateStore,
+    PlaylistMirror,
+    PlaylistTrackObject,
+)
+
+PLAYLIST_ID = "37i9dQZF1DWZtGWF9Ltb0N"
+
+
+class TestPlaylistMirror:
+    def test_unchanged_snapshot_skips_item_fetch(self, offline_client, app):
+        playlist = app.add_playlist("Mix", range(120))
+        mirror = PlaylistMirror(offline_client)
+
+        first = mirror.sync(playlist.id)
+        requests_after_first = len(app.requests)
+        second = mirror.sync(playlist.id)
+
+        assert first.refreshed and not second.refreshed
+        assert len(second.items) == 120
+        assert len(app.requests) == requests_after_first + 1
+        assert app.requests[-1].params["fields"] == "snapshot_id"
+
+    def test_reports_cache_lookups(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [1])
+        metrics = offline_client.enable_metrics()
+        mirror = PlaylistMirror(offline_client)
+
+        mirror.sync(playlist.id)
+        mirror.sync(playlist.id)
+
+        endpoint = "/v1/playlists/{id}/tracks"
+        assert metrics.cache.value(endpoint=endpoint, result="miss") == 1
+        assert metrics.cache.value(endpoint=endpoint, result="hit") == 1
+
+    def test_changed_snapshot_refetches(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [1])
+        mirror = PlaylistMirror(offline_client)
+        mirror.sync(playlist.id)
+
+        offline_client.add_tracks_to_playlist(playlist.id, uris(2))
+        synced = mirror.sync(playlist.id)
+
+        assert synced.refreshed
+        assert synced.snapshot_id == playlist.snapshot_id
+        assert [item["track"]["uri"] for item in synced.items] == uris(1, 2)
+
+    def test_listing_snapshots_cost_no_extra_requests(self, offline_client, app):
+        app.add_playlist("Mix", [1])
+        app.add_playlist("Other", [2])
+        mirror = PlaylistMirror(offline_client)
+        list(mirror.sync_current_user_playlists())
+        app.requests.clear()
+
+        synced = list(mirror.sync_current_user_playlists())
+
+        assert [m.refreshed for m in synced] == [False, False]
+        assert [request.path for request in app.requests] == ["/v1/me/playlists"]
+
+    def test_projection_changes_invalidate_mirror(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [1])
+        store = MemoryStateStore()
+        PlaylistMirror(offline_client, store).sync(playlist.id)
+        mirror = PlaylistMirror(offline_client, store, fields="items(track(uri))")
+
+        assert mirror.get(playlist.id) is None
+        assert mirror.sync(playlist.id).refreshed
+
+    def test_persists_to_json_store(self, offline_client, app, tmp_path):
+        playlist = app.add_playlist("Mix", [1])
+        PlaylistMirror(offline_client, JsonFileStateStore(str(tmp_path))).sync(
+            playlist.id
+        )
+
+        reloaded = PlaylistMirror(offline_client, JsonFileStateStore(str(tmp_path)))
+        tracks = list(reloaded.tracks(playlist.id))
+
+        assert isinstance(tracks[0], PlaylistTrackObject)
+        assert not reloaded.sync(playlist.id).refreshed
+
+    def test_projected_mirror_has_no_models(self, offline_client):
+        mirror = PlaylistMirror(offline_client, fields="items(track(uri))")
+        with pytest.raises(ValueError):
+            mirror.tracks(PLAYLIST_ID)
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from conftest import uris
+from rebel_rhythms.playlist_sync import PlaylistSynchronizer, plan_playlist_changes
+from rebel_rhythms.testing.server import ApiError
+
+
+def writes(app):
+    return sum(app.count(method) for method in ("POST", "PUT", "DELETE"))
+
+
+class TestPlanPlaylistChanges:
+    def test_identical_lists_need_no_changes(self):
+        assert plan_playlist_changes(uris(1, 2, 3), uris(1, 2, 3)) == ([], [], [])
+
+    def test_multiset_diff_keeps_first_occurrences(self):
+        changes = plan_playlist_changes(uris(1, 1, 2), uris(1, 2))
+        assert changes is not None
+        removals, moves, inserts = changes
+        assert removals == [(uris(1)[0], 1)]
+        assert moves == [] and inserts == []
+
+    def test_contiguous_block_moves_in_one_call(self):
+        changes = plan_playlist_changes(uris(1, 2, 3, 4, 5), uris(4, 5, 1, 2, 3))
+        assert changes is not None
+        _, moves, _ = changes
+        assert len(moves) == 1
+
+    def test_gives_up_over_budget(self):
+        current = uris(*range(50))
+        desired = list(reversed(current))
+        assert plan_playlist_changes(current, desired, max_requests=1) is None
+
+
+class TestSyncPlaylist:
+    @pytest.mark.parametrize("seed", range(20))
+    def test_randomized_sync_reaches_target(self, offline_client, app, seed):
+        rng = random.Random(seed)
+        current = [rng.randrange(30) for _ in range(rng.randrange(40))]
+        playlist = app.add_playlist("Mix", current)
+        desired = [rng.randrange(30) for _ in range(rng.randrange(40))]
+
+        offline_client.sync_playlist(playlist.id, uris(*desired))
+
+        assert playlist.tracks == desired
+
+    def test_small_change_costs_few_requests(self, offline_client, app):
+        playlist = app.add_playlist("Mix", range(1000))
+        desired = [i for i in range(1000) if i % 10 != 7][:-5]
+        desired[100:100] = [5001, 5002]
+        desired += [5003, 5004, 5005]
+        desired[10], desired[500] = desired[500], desired[10]
+
+        plan = offline_client.sync_playlist(playlist.id, uris(*desired))
+
+        assert playlist.tracks == desired
+        assert writes(app) == plan.request_count <= 6
+        assert app.count("GET") == 11
+
+    def test_dry_run_reports_plan_without_writing(self, offline_client, app):
+        playlist = app.add_playlist("Mix", range(150))
+
+        plan = offline_client.sync_playlist(
+            playlist.id, uris(*range(1, 150), 500), dry_run=True
+        )
+
+        assert plan.dry_run
+        assert plan.removals == [(uris(0)[0], 0)]
+        assert [insert.model_dump() for insert in plan.inserts] == [
+            {"position": 149, "uris": uris(500)}
+        ]
+        assert playlist.tracks == list(range(150))
+        assert writes(app) == 0
+
+    def test_full_reorder_falls_back_to_replace(self, offline_client, app):
+        playlist = app.add_playlist("Mix", range(150))
+        desired = uris(*reversed(range(150)))
+
+        plan = offline_client.sync_playlist(playlist.id, desired)
+
+        assert plan.replace_with == desired
+        assert playlist.tracks == list(reversed(range(150)))
+        assert writes(app) == 2
+
+    def test_failed_replace_reports_progress_and_resumes(self, offline_client, app):
+        playlist = app.add_playlist("Mix", range(250))
+        desired = list(reversed(range(250)))
+        appends = []
+
+        def fail_from_second_append(request):
+            if request.method == "POST":
+                appends.append(request)
+                if len(appends) >= 2:
+                    raise ApiError(429, "Too many requests", retry_after=0)
+
+        app.intercept = fail_from_second_append
+        result = offline_client.sync_playlist(playlist.id, uris(*desired))
+
+        assert not result.complete
+        assert result.replaced == 200
+        assert result.error == "The app has exceeded its rate limits."
+        assert playlist.tracks == desired[:200]
+        assert result.snapshot_id == playlist.snapshot_id
+
+        app.intercept = None
+        resumed = PlaylistSynchronizer(offline_client).apply(result)
+
+        assert resumed.complete and resumed.error is None
+        assert playlist.tracks == desired
+
+    def test_noop_sync_does_not_write(self, offline_client, app):
+        playlist = app.add_playlist("Mix", [1])
+        plan = offline_client.sync_playlist(playlist.id, uris(1))
+        assert plan.is_noop
+        assert writes(app) == 0
@@ -0,0 +1,130 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from rebel_rhythms import CallProfiler
+from rebel_rhythms.models import SpotifyModel
+from rebel_rhythms.testing import FakeSpotifyServer, spotify_id
+
+
+@pytest.fixture
+def server():
+    with FakeSpotifyServer(tracks=300, playlists=1, playlist_size=250) as server:
+        yield server
+
+
+@pytest.fixture
+def playlist_id(server):
+    return next(iter(server.app.playlists))
+
+
+@pytest.fixture
+def client(server):
+    client = server.client()
+    yield client
+    client.disable_profiling()
+
+
+def by_name(nodes):
+    return {node["name"]: node for node in nodes}
+
+
+class TestCallProfiler:
+    def test_breaks_down_time_per_call(self, client, playlist_id):
+        profiler = client.enable_profiling()
+
+        assert len(list(client.get_all_playlist_tracks(playlist_id))) == 250
+        client.get_tracks([spotify_id("track", i) for i in range(5)])
+
+        calls = by_name(profiler.to_dict()["calls"])
+        playlist = calls["SpotifyClient.get_all_playlist_tracks"]
+        assert playlist["calls"] == 1
+        # Iterating the generator is charged to the call that returned it.
+        assert playlist["categories"]["network"]["count"] == 5
+        assert playlist["categories"]["decode"]["count"] == 5
+        assert playlist["categories"]["model"]["count"] == 250
+        tracks = calls["SpotifyClient.get_tracks"]
+        assert tracks["categories"]["validation"]["count"] == 1
+        assert tracks["categories"]["model"]["count"] == 5
+        breakdown = (
+            sum(c["time"] for c in playlist["categories"].values()) + playlist["own"]
+        )
+        assert breakdown == pytest.approx(playlist["total"])
+
+    def test_nested_client_calls_become_children(self, client, playlist_id):
+        profiler = client.enable_profiling()
+
+        client.remove_duplicate_tracks(playlist_id, dry_run=True)
+
+        dedupe = by_name(profiler.to_dict()["calls"])[
+            "SpotifyClient.remove_duplicate_tracks"
+        ]
+        read = by_name(dedupe["children"])["SpotifyClient.get_raw_playlist_snapshot"]
+        assert "SpotifyClient.get_playlist_snapshot_id" in by_name(read["children"])
+        assert dedupe["categories"]["network"]["count"] == 0
+        assert "SpotifyClient.remove_duplicate_tracks" in profiler.report()
+        json.dumps(profiler.to_dict())
+
+    def test_sampling(self, client):
+        profiler = client.enable_profiling(sample_rate=0)
+
+        client.get_current_user_profile()
+
+        assert profiler.to_dict()["calls"] == []
+
+    def test_profiling_is_scoped_to_the_client(self, server, client):
+        other = server.client()
+        profiler = client.enable_profiling()
+
+        assert other.get_track(spotify_id("track", 1)).id == spotify_id("track", 1)
+        client.disable_profiling()
+        client.get_track(spotify_id("track", 2))
+
+        assert profiler.to_dict()["calls"] == []
+        assert (
+            client.request_manager.profiler is None
+            and other.request_manager.profiler is None
+        )
+        assert "get_track" not in vars(client)
+
+    def test_model_timing_is_removed_with_the_last_profiler(self, server, client):
+        other = server.client()
+        client.enable_profiling()
+        other.enable_profiling()
+
+        client.disable_profiling()
+        assert SpotifyModel.__init__ is not BaseModel.__init__
+        other.disable_profiling()
+
+        assert SpotifyModel.__init__ is BaseModel.__init__
+
+    def test_returned_generators_forward_throw_and_close(self):
+        class Source:
+            request_manager = SimpleNamespace(profiler=None)
+
+            def __init__(self):
+                self.closed = False
+
+            def numbers(self):
+                try:
+                    for i in range(10):
+                        try:
+                            yield i
+                        except ValueError:
+                            yield "recovered"
+                finally:
+                    self.closed = True
+
+        source = Source()
+        profiler = CallProfiler().attach(source)
+        numbers = source.numbers()
+
+        assert next(numbers) == 0
+        assert numbers.send(None) == 1
+        assert numbers.throw(ValueError()) == "recovered"
+        numbers.close()
+
+        assert source.closed
+        assert by_name(profiler.to_dict()["calls"])["Source.numbers"]["calls"] == 1
@@ -1,13 +1,26 @@
+import threading
+import time
+
 import pytest
 from unittest.mock import MagicMock
 from requests.exceptions import Timeout
-from rebel_rhythms import SpotifyRequestManager, SpotifyClientException, UnauthorizedException
+from conftest import fresh_tokens
+from rebel_rhythms import (
+    InternalServerErrorException,
+    RateLimiter,
+    RateLimitException,
+    SpotifyAuth,
+    SpotifyRequestManager,
+    SpotifyClientException,
+    UnauthorizedException,
+)
 
 
 # Create a fixture for an instance of SpotifyRequestManager
 @pytest.fixture
 def spotify_manager(mocker):
     mock_auth = mocker.MagicMock()
+    mock_auth.load_tokens.return_value = fresh_tokens()
     mock_market = "UA"
     return SpotifyRequestManager(mock_auth, mock_market)
 
@@ -71,3 +84,190 @@ def test_unauthorized_exception(mocker, spotify_manager):
 
     with pytest.raises(UnauthorizedException):
         spotify_manager._request("get", "/some/endpoint")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_clock(spotify_manager):
+    clock = FakeClock()
+    spotify_manager.rate_limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+    return clock
+
+
+# Test that 429 responses are retried after Retry-After and pause the shared limiter
+def test_rate_limited_request_is_retried(mocker, spotify_manager, fake_clock):
+    limited = MagicMock(status_code=429, headers={"Retry-After": "2"})
+    ok = MagicMock(status_code=200, content=b"{}", headers={})
+    ok.json.return_value = {"data": "value"}
+    mocker.patch("requests.get", side_effect=[limited, ok])
+
+    assert spotify_manager.get("/some/endpoint") == {"data": "value"}
+    assert fake_clock.slept == [2.0]
+
+
+# Test that retries give up after max_retries and surface Retry-After
+def test_rate_limit_exception_after_retries(mocker, spotify_manager, fake_clock):
+    spotify_manager.max_retries = 1
+    limited = MagicMock(status_code=429, headers={"Retry-After": "3"})
+    mocker.patch("requests.get", return_value=limited)
+
+    with pytest.raises(RateLimitException) as error:
+        spotify_manager.get("/some/endpoint")
+    assert error.value.retry_after == 3.0
+
+
+# Test that server errors are retried for reads only
+def test_server_errors_retried_for_reads_only(mocker, spotify_manager):
+    mocker.patch("time.sleep")
+    unavailable = MagicMock(status_code=503, headers={})
+    get = mocker.patch("requests.get", return_value=unavailable)
+    post = mocker.patch("requests.post", return_value=unavailable)
+
+    with pytest.raises(InternalServerErrorException):
+        spotify_manager.get("/some/endpoint")
+    with pytest.raises(InternalServerErrorException):
+        spotify_manager.post("/some/endpoint")
+
+    assert get.call_count == 1 + spotify_manager.max_retries
+    assert post.call_count == 1
+
+
+# Test the token bucket spacing and pause handling
+def test_rate_limiter_token_bucket():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2, burst=1, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+    limiter.acquire()
+    limiter.pause(5)
+    limiter.acquire()
+
+    assert clock.slept == [0.5, 5.0]
+
+
+def manager_with_tokens(mocker, tokens, **kwargs):
+    auth = mocker.MagicMock()
+    auth.load_tokens.return_value = tokens
+    auth.refresh_tokens.return_value = {"access_token": "new-token", "expires_in": 3600}
+    return SpotifyRequestManager(auth, "UA", **kwargs)
+
+
+def ok_response():
+    response = MagicMock(status_code=200, content=b"{}", headers={})
+    response.json.return_value = {}
+    return response
+
+
+# Test that a still-valid token is not refreshed on construction or use
+def test_valid_token_is_not_refreshed(mocker):
+    manager = manager_with_tokens(mocker, fresh_tokens())
+    mocker.patch("requests.get", return_value=ok_response())
+
+    manager.get("/some/endpoint")
+
+    manager.spotify_auth.refresh_tokens.assert_not_called()
+
+
+# Test that tokens stored without an expiry are refreshed once, lazily
+def test_legacy_token_refreshed_once(mocker):
+    tokens = {"access_token": "old-token", "refresh_token": "refresh-token"}
+    manager = manager_with_tokens(mocker, tokens)
+    manager.spotify_auth.refresh_tokens.return_value = fresh_tokens("new-token")
+    manager.spotify_auth.refresh_tokens.assert_not_called()
+    get = mocker.patch("requests.get", return_value=ok_response())
+
+    manager.get("/some/endpoint")
+    manager.get("/some/endpoint")
+
+    manager.spotify_auth.refresh_tokens.assert_called_once()
+    assert get.call_args.kwargs["headers"] == {"Authorization": "Bearer new-token"}
+
+
+# Test that a token inside the refresh leeway is refreshed before the request
+def test_token_refreshed_shortly_before_expiry(mocker):
+    manager = manager_with_tokens(mocker, fresh_tokens(expires_in=120))
+    manager.spotify_auth.refresh_tokens.return_value = fresh_tokens("new-token")
+    mocker.patch("requests.get", return_value=ok_response())
+
+    manager.get("/some/endpoint")
+    manager.spotify_auth.refresh_tokens.assert_not_called()
+
+    manager._clock = lambda: time.time() + 61
+    manager.get("/some/endpoint")
+    manager.spotify_auth.refresh_tokens.assert_called_once()
+    manager.spotify_auth.store_tokens.assert_called_once()
+
+
+# Test that the request after a 401 refresh carries the new token
+def test_retry_after_401_uses_new_token(mocker):
+    manager = manager_with_tokens(mocker, fresh_tokens("old-token"))
+    unauthorized = MagicMock(status_code=401, headers={})
+    get = mocker.patch("requests.get", side_effect=[unauthorized, ok_response()])
+
+    manager.get("/some/endpoint")
+
+    headers = [c.kwargs["headers"]["Authorization"] for c in get.call_args_list]
+    assert headers == ["Bearer old-token", "Bearer new-token"]
+
+
+# Test that background refresh renews the token without a request
+def test_background_refresh(mocker):
+    refreshed = threading.Event()
+    manager = manager_with_tokens(
+        mocker, fresh_tokens(expires_in=60.5), background_refresh=True
+    )
+    manager.spotify_auth.store_tokens.side_effect = lambda tokens: refreshed.set()
+    manager.warmup()
+    manager.spotify_auth.refresh_tokens.assert_not_called()
+
+    assert refreshed.wait(5)
+    manager.cancel_refresh()
+    assert manager.headers == {"Authorization": "Bearer new-token"}
+
+
+# Test that concurrent 401s trigger a single refresh
+def test_concurrent_401s_refresh_once(mocker):
+    manager = manager_with_tokens(mocker, fresh_tokens("old-token"))
+    barrier = threading.Barrier(8)
+
+    def send(url, headers=None, **kwargs):
+        if headers["Authorization"] == "Bearer old-token":
+            barrier.wait(5)
+            return MagicMock(status_code=401, headers={})
+        return ok_response()
+
+    mocker.patch("requests.get", side_effect=send)
+    threads = [threading.Thread(target=manager.get, args=("/some/endpoint",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    manager.spotify_auth.refresh_tokens.assert_called_once()
+
+
+# Test that a token refreshed by another process is picked up instead of refreshing again
+def test_refresh_adopts_tokens_from_other_process(mocker, tmp_path):
+    auth = SpotifyAuth("id", "secret", "http://localhost/callback", tokens_file=str(tmp_path / "tokens.json"))
+    auth.store_tokens(fresh_tokens("old-token"))
+    manager = SpotifyRequestManager(auth, "UA")
+    refresh = mocker.patch.object(auth, "refresh_tokens")
+    SpotifyAuth("id", "secret", "http://localhost/callback", tokens_file=auth.tokens_file).store_tokens(
+        fresh_tokens("other-process-token")
+    )
+
+    manager._refresh_tokens("Bearer old-token")
+
+    refresh.assert_not_called()
+    assert manager.headers == {"Authorization": "Bearer other-process-token"}
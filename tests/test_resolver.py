@@ -0,0 +1,169 @@
+import threading
+from typing import Dict, List, Tuple
+
+import pytest
+
+from rebel_rhythms.resolver import TrackQuery, TrackResolver, score_candidate
+from rebel_rhythms.state_store import MemoryStateStore
+from rebel_rhythms.testing import FakeSpotifyServer
+
+
+@pytest.fixture
+def server():
+    with FakeSpotifyServer(tracks=400, albums=40, artists=20) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    return server.client()
+
+
+def row(track, **changes):
+    return {"artist": track["artists"][0]["name"], "title": track["name"], **changes}
+
+
+class TestScoring:
+    def test_title_decorations_and_guests_do_not_matter(self):
+        track = {
+            "name": "Karma Police",
+            "artists": [{"name": "Radiohead"}],
+            "duration_ms": 264000,
+        }
+        exact = TrackQuery(artist="Radiohead", title="Karma Police", duration_ms=264000)
+        decorated = TrackQuery(
+            artist="Radiohead feat. Someone",
+            title="Karma Police - Remastered",
+            duration_ms=265000,
+        )
+        wrong = TrackQuery(artist="Portishead", title="Roads")
+
+        assert score_candidate(exact, track) == 1
+        assert score_candidate(decorated, track) > 0.9
+        assert score_candidate(wrong, track) < 0.5
+        assert decorated.artists == ["Radiohead", "Someone"]
+
+
+class TestResolveTracks:
+    def test_isrc_first_then_field_search(self, server, client):
+        catalog = server.app.catalog
+        rows = [
+            ("", "", catalog.track(3)["external_ids"]["isrc"].lower()),
+            row(catalog.track(7), title=catalog.track(7)["name"] + " (2011 Remaster)"),
+            row(
+                catalog.track(9), artist=catalog.track(9)["artists"][0]["name"].upper()
+            ),
+        ]
+
+        results = list(client.resolve_tracks(rows))
+
+        assert [r.track_id for r in results] == [
+            catalog.track(i)["id"] for i in (3, 7, 9)
+        ]
+        assert [r.matched_by for r in results] == ["isrc", "fields", "fields"]
+        assert all(r.resolved and r.confidence >= 0.75 for r in results)
+
+    def test_duration_picks_between_equal_titles(self, server, client):
+        catalog = server.app.catalog
+        tracks = [catalog.track(i) for i in range(400)]
+        by_key: Dict[Tuple[str, str], List[dict]] = {}
+        for track in tracks:
+            by_key.setdefault((track["artists"][0]["name"], track["name"]), []).append(
+                track
+            )
+        duplicates = next((found for found in by_key.values() if len(found) > 1), None)
+        if duplicates is None:
+            pytest.skip("catalog has no duplicate titles")
+
+        results = list(
+            client.resolve_tracks(
+                [row(t, duration_ms=t["duration_ms"]) for t in duplicates]
+            )
+        )
+
+        assert [r.track_id for r in results] == [t["id"] for t in duplicates]
+
+    def test_unresolved_rows_report_confidence(self, client):
+        results = list(
+            client.resolve_tracks(
+                [("Nobody", "Nothing At All"), ("", "", "not an isrc")]
+            )
+        )
+
+        assert [r.uri for r in results] == [None, None]
+        assert all(r.confidence < 0.75 and r.error is None for r in results)
+
+    def test_unresolved_rows_are_not_cached(self, server, client):
+        store = MemoryStateStore()
+        rows = [("Nobody", "Nothing At All")]
+        list(client.resolve_tracks(rows, store=store))
+        before = server.count("get", "/v1/search")
+
+        results = list(client.resolve_tracks(rows, store=store))
+
+        assert server.count("get", "/v1/search") > before
+        assert not results[0].cached
+
+    def test_order_and_cache(self, server, client):
+        catalog = server.app.catalog
+        rows = [row(catalog.track(i % 30)) for i in range(120)]
+        before = server.count("get", "/v1/search")
+        metrics = client.enable_metrics()
+
+        results = list(client.resolve_tracks(rows, max_workers=6))
+
+        assert [r.index for r in results] == list(range(120))
+        assert [r.track_id for r in results] == [
+            catalog.track(i % 30)["id"] for i in range(120)
+        ]
+        assert server.count("get", "/v1/search") - before == 30
+        assert sum(not r.cached for r in results) == 30
+        assert metrics.cache.value(endpoint="/v1/search", result="miss") == 30
+        assert metrics.cache.value(endpoint="/v1/search", result="hit") == 90
+
+    def test_store_persists_matches(self, server, client):
+        catalog = server.app.catalog
+        store = MemoryStateStore()
+        rows = [row(catalog.track(i)) for i in range(10)]
+        list(client.resolve_tracks(rows, store=store))
+        before = server.count("get", "/v1/search")
+
+        results = list(client.resolve_tracks(rows, store=store))
+
+        assert server.count("get", "/v1/search") == before
+        assert all(r.cached and r.resolved for r in results)
+
+    def test_errors_are_reported_per_row(self, server, client):
+        catalog = server.app.catalog
+        resolver = TrackResolver(client, max_workers=1)
+        server.fail_next(404)
+
+        results = list(resolver.resolve([row(catalog.track(1)), row(catalog.track(2))]))
+
+        assert results[0].error and results[0].uri is None
+        assert results[1].track_id == catalog.track(2)["id"]
+
+    def test_malformed_rows_are_reported_per_row(self, server, client):
+        catalog = server.app.catalog
+        rows = [row(catalog.track(1), duration_ms="abc"), None, row(catalog.track(2))]
+
+        results = list(client.resolve_tracks(rows))
+
+        assert [r.index for r in results] == [0, 1, 2]
+        assert all(r.error and r.query is None and r.uri is None for r in results[:2])
+        assert results[2].track_id == catalog.track(2)["id"]
+
+    def test_lazy_rows_are_consumed_in_a_bounded_window(self, server, client):
+        catalog = server.app.catalog
+        consumed = []
+
+        def rows():
+            for i in range(200):
+                consumed.append(threading.get_ident())
+                yield row(catalog.track(i))
+
+        results = client.resolve_tracks(rows(), max_workers=2)
+        next(results)
+        results.close()
+
+        assert len(consumed) <= 2 * 4 + 1
@@ -0,0 +1,138 @@
+import os
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from conftest import fresh_tokens
+from rebel_rhythms import (
+    EnvTokenStore,
+    FileTokenStore,
+    MemoryTokenStore,
+    SpotifyAuth,
+    SpotifyRequestManager,
+    SQLiteTokenStore,
+    TokenStore,
+)
+
+
+class TestTokenStores:
+    def test_memory_store_copies(self):
+        store = MemoryTokenStore()
+        assert store.load() is None
+        tokens = {"access_token": "a"}
+        store.save(tokens)
+        tokens["access_token"] = "changed"
+        assert store.load() == {"access_token": "a"}
+
+    def test_file_store_roundtrip(self, tmp_path):
+        store = FileTokenStore(str(tmp_path / "tokens.json"))
+        assert store.load() is None
+        store.save({"access_token": "a"})
+        with store.lock():
+            assert store.load() == {"access_token": "a"}
+
+    def test_file_lock_times_out(self, tmp_path):
+        holder = FileTokenStore(str(tmp_path / "tokens.json"))
+        waiter = FileTokenStore(str(tmp_path / "tokens.json"), timeout=0.05)
+        with holder.lock():
+            with pytest.raises(TimeoutError):
+                with waiter.lock():
+                    pass
+        with waiter.lock():
+            pass
+
+    def test_sqlite_store_keeps_users_apart(self, tmp_path):
+        alice = SQLiteTokenStore(str(tmp_path / "tokens.db"), "alice")
+        bob = alice.for_user("bob")
+        alice.save({"access_token": "a"})
+        bob.save({"access_token": "b"})
+        alice.save({"access_token": "a2"})
+
+        assert alice.load() == {"access_token": "a2"}
+        assert bob.load() == {"access_token": "b"}
+        assert alice.for_user("carol").load() is None
+
+    def test_sqlite_lock_serializes_read_modify_write(self, tmp_path):
+        path = str(tmp_path / "tokens.db")
+        SQLiteTokenStore(path, "shared").save({"count": 0})
+
+        def increment():
+            store = SQLiteTokenStore(path, "shared")
+            for _ in range(10):
+                with store.lock():
+                    store.save({"count": store.load()["count"] + 1})
+
+        threads = [threading.Thread(target=increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert SQLiteTokenStore(path, "shared").load() == {"count": 40}
+
+    def test_env_store_is_read_only(self):
+        env = {
+            "SPOTIFY_ACCESS_TOKEN": "a",
+            "SPOTIFY_REFRESH_TOKEN": "r",
+            "SPOTIFY_TOKEN_EXPIRES_AT": "123.5",
+        }
+        with patch.dict(os.environ, env, clear=True):
+            store = EnvTokenStore()
+            assert store.load() == {
+                "access_token": "a",
+                "refresh_token": "r",
+                "expires_at": 123.5,
+            }
+            store.save({"access_token": "b", "refresh_token": "r"})
+            assert store.load()["access_token"] == "b"
+            assert os.environ["SPOTIFY_ACCESS_TOKEN"] == "a"
+
+    def test_env_store_empty(self):
+        with patch.dict(os.environ, {}, clear=True):
+            assert EnvTokenStore().load() is None
+
+    def test_incomplete_store_fails_on_creation(self):
+        class LoadOnlyStore(TokenStore):
+            def load(self):
+                return None
+
+        with pytest.raises(TypeError):
+            LoadOnlyStore()
+
+
+class TestTokenStoreInjection:
+    def test_refresh_writes_to_injected_store(self, tmp_path):
+        store = SQLiteTokenStore(str(tmp_path / "tokens.db"), "alice")
+        store.save(fresh_tokens("old-token", expires_in=0))
+        auth = SpotifyAuth(
+            "id", "secret", "http://localhost/callback", token_store=store
+        )
+
+        with patch.object(
+            auth, "refresh_tokens", return_value=fresh_tokens("new-token")
+        ):
+            manager = SpotifyRequestManager(auth, "UA")
+            manager._refresh_tokens(manager.headers["Authorization"])
+
+        assert store.load()["access_token"] == "new-token"
+        assert manager.headers == {"Authorization": "Bearer new-token"}
+
+    def test_custom_store(self):
+        class DictStore(TokenStore):
+            def __init__(self):
+                self.saved = []
+
+            def load(self):
+                return self.saved[-1] if self.saved else fresh_tokens("custom-token")
+
+            def save(self, tokens):
+                self.saved.append(tokens)
+
+        auth = SpotifyAuth(
+            "id", "secret", "http://localhost/callback", token_store=DictStore()
+        )
+        manager = SpotifyRequestManager(auth, "UA")
+
+        assert manager.headers == {"Authorization": "Bearer custom-token"}
+        assert auth.tokens_file is None
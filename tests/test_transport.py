@@ -0,0 +1,121 @@
+import gzip
+import json
+from typing import List
+
+import pytest
+
+from rebel_rhythms import (
+    CassetteMissException,
+    MemoryTokenStore,
+    RecordingTransport,
+    ReplayTransport,
+    SpotifyClient,
+    Transport,
+)
+from rebel_rhythms.testing import FakeSpotifyServer, spotify_id
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    path = str(tmp_path / "library.json.gz")
+    with FakeSpotifyServer(tracks=200, saved_tracks=120) as server:
+        with RecordingTransport(path) as recorder:
+            client = server.client(transport=recorder)
+            client.get_current_user_profile()
+            list(client.get_user_saved_tracks())
+            server.fail_next(429, retry_after=0.02)
+            client.get_track(spotify_id("track", 7))
+            token = client.request_manager.tokens["access_token"]
+    return path, token
+
+
+def replay_client(transport):
+    return SpotifyClient(
+        "client_id",
+        "client_secret",
+        token_store=MemoryTokenStore({"access_token": "replay", "expires_at": 1e12}),
+        transport=transport,
+    )
+
+
+class TestRecordReplay:
+    def test_replays_without_the_server(self, cassette):
+        path, _ = cassette
+        client = replay_client(ReplayTransport(path))
+
+        assert client.get_current_user_profile().id == "tester"
+        assert len(list(client.get_user_saved_tracks())) == 120
+        assert client.get_track(spotify_id("track", 7)).id == spotify_id("track", 7)
+
+    def test_tokens_are_redacted(self, cassette):
+        path, token = cassette
+        with gzip.open(path, "rt") as file:
+            text = file.read()
+
+        assert token not in text
+        assert "Authorization" not in text and "authorization" not in text
+
+    def test_unrecorded_request_raises(self, cassette):
+        client = replay_client(ReplayTransport(cassette[0]))
+
+        with pytest.raises(CassetteMissException):
+            client.get_track(spotify_id("track", 8))
+
+    def test_time_compression_scales_latency_and_retry_after(self, cassette):
+        sleeps: List[float] = []
+        transport = ReplayTransport(cassette[0], time_scale=0.5, sleep=sleeps.append)
+        response = transport.send(
+            "get",
+            "http://localhost/v1/tracks/" + spotify_id("track", 7),
+            params={"market": "UA"},
+        )
+
+        assert response.status_code == 429
+        assert float(response.headers["Retry-After"]) == pytest.approx(0.01)
+        assert sleeps and all(delay >= 0 for delay in sleeps)
+
+    def test_memory_speed_by_default(self, cassette):
+        sleeps: List[float] = []
+        client = replay_client(ReplayTransport(cassette[0], sleep=sleeps.append))
+
+        list(client.get_user_saved_tracks())
+
+        assert sleeps == []
+
+    def test_repeated_requests_replay_in_order(self, tmp_path):
+        path = str(tmp_path / "cassette.json")
+        interactions = [
+            {
+                "request": {
+                    "method": "get",
+                    "url": "https://api.spotify.com/v1/me",
+                    "params": {},
+                },
+                "response": {
+                    "status": 200,
+                    "headers": {},
+                    "body": json.dumps({"n": n}),
+                    "elapsed": 0,
+                },
+            }
+            for n in (1, 2)
+        ]
+        with open(path, "w") as file:
+            json.dump({"version": 1, "interactions": interactions}, file)
+        transport = ReplayTransport(path)
+
+        replies = [
+            transport.send("get", "https://api.spotify.com/v1/me").json()["n"]
+            for _ in range(3)
+        ]
+
+        assert replies == [1, 2, 2]
+
+
+class TestTransport:
+    def test_transport_without_send_fails_on_creation(self):
+        class NoSend(Transport):
+            pass
+
+        with pytest.raises(TypeError):
+            NoSend()
@@ -1,6 +1,9 @@
 import pytest
 from rebel_rhythms.validators import (
     check_list_limit,
+    parse_spotify_ids,
+    split_fields,
+    split_spotify_ids,
     validate_track_uris,
     validate_id_or_url,
     ContentType,
@@ -94,3 +97,72 @@ def test_validate_id_or_url(content_type, method_name):
         invalid_list_input = ["1234567890123456789012", "invalid"]
         with pytest.raises(ValueError, match=rf"Invalid ID or URL: {re.escape(str(invalid_list_input))}"):
             getattr(obj, method_name)(invalid_list_input)
+
+
+# Test that keyword arguments and defaults are checked too
+def test_check_list_limit_keyword_and_default():
+    @check_list_limit("my_list", 1)
+    def limited_func(prefix, my_list=None):
+        return my_list
+
+    assert limited_func("p") is None
+    with pytest.raises(ValueError):
+        limited_func("p", my_list=[1, 2])
+    with pytest.raises(ValueError):
+        limited_func("p", [1, 2])
+
+
+# Test that a missing reference names the argument instead of failing with NameError
+def test_validate_id_or_url_missing_argument():
+    with pytest.raises(TypeError, match="'ids'"):
+        MockClass().mock_method_track_single(None)
+
+
+# Test the batch parser on IDs, URLs and URIs
+def test_parse_spotify_ids():
+    track_id = "1234567890123456789012"
+    refs = [
+        track_id,
+        f"https://open.spotify.com/track/{track_id}?si=abc",
+        f"spotify:track:{track_id}",
+        "invalid",
+        f"spotify:album:{track_id}",
+        None,
+    ]
+
+    ids, invalid = split_spotify_ids(refs, ContentType.TRACK)
+
+    assert ids == [track_id] * 3
+    assert invalid == ["invalid", f"spotify:album:{track_id}", None]
+    assert parse_spotify_ids(["some_user", "spotify:user:other-user"], ContentType.USER) == [
+        "some_user",
+        "other-user",
+    ]
+    with pytest.raises(ValueError, match="Invalid ID or URL: invalid"):
+        parse_spotify_ids(refs, ContentType.TRACK)
+
+
+# Test that only top-level names of a fields filter are returned
+def test_split_fields():
+    assert split_fields("items(track(uri,linked_from(uri))),next") == ["items", "next"]
+    assert split_fields("items(track(next_release)),total") == ["items", "total"]
+
+
+# Signature analysis happens at decoration time only. Per-call overhead and
+# batch throughput are tracked by the `validators.*` benchmarks.
+def test_decorators_do_not_inspect_per_call(mocker):
+    @check_list_limit("ids", 50)
+    @validate_id_or_url(ContentType.TRACK, multiple=True)
+    def decorated(self, ids):
+        return ids
+
+    signature = mocker.patch("inspect.signature", side_effect=AssertionError("inspected per call"))
+    assert decorated(None, ["1234567890123456789012"]) == ["1234567890123456789012"]
+    ids = ["1234567890123456789012"] * 50
+    assert decorated(None, ids) == ids
+    signature.assert_not_called()
+
+
+def test_batch_parser_handles_large_inputs():
+    refs = ["%022d" % i for i in range(100_000)]
+    assert parse_spotify_ids(refs, ContentType.TRACK) == refs
@@ -0,0 +1,84 @@
+import pytest
+
+from conftest import track_ids
+from rebel_rhythms.testing import spotify_id
+from rebel_rhythms.testing.server import ApiError
+
+ARTIST_ID = "0TnOYISbd1XYRBk9myaseg"
+
+
+class TestWriteBehindQueue:
+    def test_coalesces_into_batches(self, offline_client, app):
+        queue = offline_client.enable_write_behind(flush_interval=60)
+        futures = [queue.save_tracks(track_id) for track_id in track_ids(40)]
+        futures.append(queue.save_tracks(track_ids(40)))
+
+        queue.flush()
+
+        assert app.count("PUT", "/v1/me/tracks") == 1
+        assert len(app.saved["tracks"]) == 40
+        assert futures[0].result(timeout=1).succeeded == track_ids(1)
+        assert sorted(futures[-1].result(timeout=1).succeeded) == sorted(track_ids(40))
+        queue.close()
+
+    def test_last_operation_per_id_wins(self, offline_client, app):
+        app.save("tracks", [1])
+        queue = offline_client.enable_write_behind(flush_interval=60)
+        saved = queue.save_tracks(track_ids(3))
+        removed = queue.remove_tracks(track_ids(1, start=1))
+
+        queue.close()
+
+        # Saving track 1 changed nothing, so removing it must still be sent.
+        assert sorted(app.saved["tracks"]) == [0, 2]
+        assert saved.result(timeout=1).cancelled == track_ids(1, start=1)
+        assert sorted(saved.result().succeeded) == sorted(
+            [track_ids(3)[0], track_ids(3)[2]]
+        )
+        assert removed.result(timeout=1).succeeded == track_ids(1, start=1)
+        assert app.count("DELETE") == 1
+
+    def test_full_batch_flushes_without_waiting(self, offline_client, app):
+        queue = offline_client.enable_write_behind(max_batch_size=50, flush_interval=60)
+
+        future = queue.save_albums([spotify_id("album", i) for i in range(50)])
+
+        assert future.result(timeout=5).ok
+        assert len(app.saved["albums"]) == 50
+        queue.close()
+
+    def test_timer_flushes_stragglers(self, offline_client, app):
+        queue = offline_client.enable_write_behind(flush_interval=0.01)
+
+        future = queue.follow_artists(ARTIST_ID)
+
+        assert future.result(timeout=5).succeeded == [ARTIST_ID]
+        assert app.following["artist"] == {ARTIST_ID}
+        queue.close()
+
+    def test_failures_resolve_futures(self, offline_client, app):
+        def intercept(request):
+            raise ApiError(400, "bad")
+
+        app.intercept = intercept
+        queue = offline_client.enable_write_behind(flush_interval=60)
+
+        future = queue.follow_users("some_user")
+        queue.close()
+
+        assert "bad" in future.result(timeout=1).failed["some_user"]
+
+    def test_closed_queue_rejects_operations(self, offline_client, app):
+        queue = offline_client.enable_write_behind()
+        queue.close()
+        with pytest.raises(RuntimeError):
+            queue.save_tracks(track_ids(1))
+
+
+class TestFollowing:
+    def test_follow_and_unfollow(self, offline_client, app):
+        offline_client.follow_artists([ARTIST_ID])
+        offline_client.follow_users("some_user")
+        offline_client.unfollow_artists(ARTIST_ID)
+
+        assert app.following == {"artist": set(), "user": {"some_user"}}